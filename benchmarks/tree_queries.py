@@ -0,0 +1,137 @@
+"""
+Compares lookups of descendants and ancestors of task by recursive CTE, materialized path and closure table.
+
+Runs against database configured by the same POSTGRES_* variables as the app. Everything is created in separate
+schema which is dropped at the end, so tables of the app are not touched:
+
+    python -m benchmarks.tree_queries --trees 20 --fanout 8 --depth 5
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import text, insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncConnection
+
+from src.infra.configs import DBConfig
+from src.infra.db.closure import enable_task_closure
+from src.infra.db.tables import metadata, tasks, users
+
+SCHEMA = "tree_benchmark"
+
+QUERIES = {
+    "descendants": {
+        "recursive cte": """
+            WITH RECURSIVE subtasks AS (
+                SELECT id FROM tasks WHERE id = :task_id
+                UNION ALL
+                SELECT t.id FROM tasks t INNER JOIN subtasks s ON t.parent_id = s.id
+            )
+            SELECT id FROM subtasks WHERE id != :task_id
+        """,
+        "path": """
+            SELECT id FROM tasks
+            WHERE path >= (SELECT path || id || '.' FROM tasks WHERE id = :task_id)
+              AND path < (SELECT path || id || '/' FROM tasks WHERE id = :task_id)
+        """,
+        "closure": "SELECT descendant_id FROM task_closure WHERE ancestor_id = :task_id AND depth > 0",
+    },
+    "ancestors": {
+        "recursive cte": """
+            WITH RECURSIVE parents AS (
+                SELECT id, parent_id FROM tasks WHERE id = :task_id
+                UNION ALL
+                SELECT t.id, t.parent_id FROM tasks t INNER JOIN parents p ON t.id = p.parent_id
+            )
+            SELECT id FROM parents WHERE id != :task_id
+        """,
+        "path": """
+            SELECT id FROM tasks
+            WHERE id = ANY(string_to_array(rtrim((SELECT path FROM tasks WHERE id = :task_id), '.'), '.')::int[])
+        """,
+        "closure": "SELECT ancestor_id FROM task_closure WHERE descendant_id = :task_id AND depth > 0",
+    }
+}
+
+
+async def fill(conn: AsyncConnection, trees: int, fanout: int, depth: int) -> dict[int, list[int]]:
+    """Creates trees and returns ids of tasks by their level"""
+    now = datetime.now(timezone.utc)
+    await conn.execute(insert(users).values(id=1, tg_name="benchmark"))
+    levels: dict[int, list[int]] = {level: [] for level in range(1, depth + 1)}
+    rows: list[dict] = []
+    next_id = 1
+
+    def add(parent_id, path, level):
+        nonlocal next_id
+        task_id, next_id = next_id, next_id + 1
+        levels[level].append(task_id)
+        rows.append({
+            "id": task_id,
+            "title": "task",
+            "description": "",
+            "deadline": now,
+            "creation_date": now,
+            "user_id": 1,
+            "parent_id": parent_id,
+            "path": path
+        })
+        if level < depth:
+            for _ in range(fanout):
+                add(task_id, f"{path}{task_id}.", level + 1)
+
+    for _ in range(trees):
+        add(None, "", 1)
+    # parents go before children, closure trigger needs them
+    for i in range(0, len(rows), 5000):
+        await conn.execute(insert(tasks), rows[i:i + 5000])
+    await conn.execute(text("ANALYZE"))
+    return levels
+
+
+async def measure(conn: AsyncConnection, query: str, task_ids: list[int]) -> tuple[float, int]:
+    rows = 0
+    start = time.perf_counter()
+    for task_id in task_ids:
+        rows += len((await conn.execute(text(query), {"task_id": task_id})).all())
+    return (time.perf_counter() - start) / len(task_ids) * 1000, rows // len(task_ids)
+
+
+async def main(trees: int, fanout: int, depth: int, samples: int) -> None:
+    engine = create_async_engine(DBConfig().conn_url)  # type: ignore
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+            await conn.execute(text(f"SET search_path TO {SCHEMA}"))
+            await conn.run_sync(metadata.create_all)
+            await enable_task_closure(conn)
+            levels = await fill(conn, trees, fanout, depth)
+            await conn.commit()
+            print(f"{sum(map(len, levels.values()))} tasks in {trees} trees, fanout {fanout}, depth {depth}")
+            print(f"{'lookup':<28}{'storage':<16}{'avg ms':>10}{'rows':>8}")
+            for level in (1, 2, depth):
+                sample = random.sample(levels[level], min(samples, len(levels[level])))
+                for lookup, queries in QUERIES.items():
+                    if (lookup == "descendants" and level == depth) or (lookup == "ancestors" and level == 1):
+                        continue
+                    for storage, query in queries.items():
+                        await measure(conn, query, sample[:5])  # warm up
+                        avg, rows = await measure(conn, query, sample)
+                        print(f"{lookup + ' of level ' + str(level):<28}{storage:<16}{avg:>10.3f}{rows:>8}")
+            await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            await conn.commit()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trees", type=int, default=20)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=5)
+    parser.add_argument("--samples", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.trees, args.fanout, args.depth, args.samples))
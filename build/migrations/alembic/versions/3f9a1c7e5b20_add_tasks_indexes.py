@@ -0,0 +1,52 @@
+"""add tasks indexes
+
+Revision ID: 3f9a1c7e5b20
+Revises: ed5ce9680b7d
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c7e5b20'
+down_revision: Union[str, Sequence[str], None] = 'ed5ce9680b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can not run inside transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_user_id_active_roots', 'tasks',
+            ['user_id', sa.text('creation_date DESC'), sa.text('id DESC')],
+            postgresql_where=sa.text('parent_id IS NULL AND pass_date IS NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.create_index(
+            'ix_tasks_user_id_finished_roots', 'tasks',
+            ['user_id', sa.text('creation_date DESC'), sa.text('id DESC')],
+            postgresql_where=sa.text('parent_id IS NULL AND pass_date IS NOT NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.create_index(
+            'ix_tasks_parent_id_creation_date', 'tasks',
+            ['parent_id', sa.text('creation_date DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_parent_id_creation_date', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_id_finished_roots', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_user_id_active_roots', table_name='tasks', postgresql_concurrently=True)
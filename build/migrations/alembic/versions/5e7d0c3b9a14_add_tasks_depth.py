@@ -0,0 +1,37 @@
+"""add tasks depth
+
+Revision ID: 5e7d0c3b9a14
+Revises: b41c9e07d2a6
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e7d0c3b9a14'
+down_revision: Union[str, Sequence[str], None] = 'b41c9e07d2a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('depth', sa.Integer(), server_default='1', nullable=False))
+    op.execute("UPDATE tasks SET depth = length(path) - length(replace(path, '.', '')) + 1 WHERE path != ''")
+    # upper bound is MAX_DEPTH of src/domain/services/task.py. It is copied, not imported, so that this revision
+    # keeps creating the same schema: changing MAX_DEPTH needs new revision recreating ck_tasks_depth_range
+    op.create_check_constraint('ck_tasks_depth_range', 'tasks', 'depth BETWEEN 1 AND 5')
+    op.create_check_constraint(
+        'ck_tasks_depth_path', 'tasks', "depth = length(path) - length(replace(path, '.', '')) + 1"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ck_tasks_depth_path', 'tasks', type_='check')
+    op.drop_constraint('ck_tasks_depth_range', 'tasks', type_='check')
+    op.drop_column('tasks', 'depth')
@@ -0,0 +1,46 @@
+"""add tasks path
+
+Revision ID: 8d2e4b6a1f03
+Revises: 3f9a1c7e5b20
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4b6a1f03'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c7e5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('path', sa.String(collation='C'), server_default='', nullable=False))
+    op.execute(
+        """
+        WITH RECURSIVE tree AS (
+            SELECT id, ''::text COLLATE "C" AS path
+            FROM tasks
+            WHERE parent_id IS NULL
+            UNION ALL
+            SELECT t.id, tree.path || tree.id || '.'
+            FROM tasks t
+            INNER JOIN tree ON t.parent_id = tree.id
+        )
+        UPDATE tasks SET path = tree.path FROM tree WHERE tasks.id = tree.id AND tree.path != ''
+        """
+    )
+    with op.get_context().autocommit_block():
+        op.create_index('ix_tasks_path', 'tasks', ['path'], postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_path', table_name='tasks', postgresql_concurrently=True)
+    op.drop_column('tasks', 'path')
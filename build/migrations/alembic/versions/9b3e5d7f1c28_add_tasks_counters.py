@@ -0,0 +1,125 @@
+"""add tasks counters
+
+Revision ID: 9b3e5d7f1c28
+Revises: c6a8f2d14e37
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e5d7f1c28'
+down_revision: Union[str, Sequence[str], None] = 'c6a8f2d14e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('open_children', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('tasks', sa.Column('descendants', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('tasks', sa.Column('finished_descendants', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        """
+        WITH alive AS (
+            SELECT parent_id, path, pass_date FROM tasks WHERE deleted_at IS NULL
+        ),
+        totals AS (
+            SELECT ancestor_id AS id, count(*) AS descendants, count(pass_date) AS finished_descendants
+            FROM alive, unnest(string_to_array(rtrim(path, '.'), '.')::int[]) AS ancestor_id
+            WHERE path != ''
+            GROUP BY ancestor_id
+        ),
+        open AS (
+            SELECT parent_id AS id, count(*) AS open_children
+            FROM alive
+            WHERE parent_id IS NOT NULL AND pass_date IS NULL
+            GROUP BY parent_id
+        )
+        UPDATE tasks
+        SET open_children = coalesce(counters.open_children, 0),
+            descendants = coalesce(counters.descendants, 0),
+            finished_descendants = coalesce(counters.finished_descendants, 0)
+        FROM (SELECT * FROM totals FULL JOIN open USING (id)) counters
+        WHERE tasks.id = counters.id
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION maintain_task_counters() RETURNS trigger AS $$
+        DECLARE
+            changes text;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                changes := 'SELECT path, parent_id, pass_date, deleted_at, 1 AS sign FROM new_rows';
+            ELSIF TG_OP = 'DELETE' THEN
+                changes := 'SELECT path, parent_id, pass_date, deleted_at, -1 AS sign FROM old_rows';
+            ELSE
+                -- updates of counters themselves by this function stop here
+                IF NOT EXISTS (
+                    SELECT 1 FROM new_rows n JOIN old_rows o USING (id)
+                    WHERE n.pass_date IS DISTINCT FROM o.pass_date OR n.deleted_at IS DISTINCT FROM o.deleted_at
+                ) THEN
+                    RETURN NULL;
+                END IF;
+                changes := 'SELECT path, parent_id, pass_date, deleted_at, 1 AS sign FROM new_rows '
+                    || 'UNION ALL SELECT path, parent_id, pass_date, deleted_at, -1 FROM old_rows';
+            END IF;
+            EXECUTE 'WITH changes AS (' || changes || ')' || $sql$,
+                deltas AS (
+                    SELECT unnest(string_to_array(rtrim(path, '.'), '.')::int[]) AS id, sign AS total,
+                        CASE WHEN pass_date IS NULL THEN 0 ELSE sign END AS finished, 0 AS open
+                    FROM changes
+                    WHERE deleted_at IS NULL AND path != ''
+                    UNION ALL
+                    SELECT parent_id, 0, 0, sign
+                    FROM changes
+                    WHERE deleted_at IS NULL AND pass_date IS NULL AND parent_id IS NOT NULL
+                )
+                UPDATE tasks
+                SET descendants = descendants + d.total,
+                    finished_descendants = finished_descendants + d.finished,
+                    open_children = open_children + d.open
+                FROM (
+                    SELECT id, sum(total) AS total, sum(finished) AS finished, sum(open) AS open
+                    FROM deltas
+                    GROUP BY id
+                    HAVING sum(total) != 0 OR sum(finished) != 0 OR sum(open) != 0
+                ) d
+                WHERE tasks.id = d.id
+            $sql$;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_counters_insert AFTER INSERT ON tasks
+        REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_counters()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_counters_update AFTER UPDATE ON tasks
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_counters()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_counters_delete AFTER DELETE ON tasks
+        REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_counters()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION IF EXISTS maintain_task_counters() CASCADE")
+    op.drop_column('tasks', 'finished_descendants')
+    op.drop_column('tasks', 'descendants')
+    op.drop_column('tasks', 'open_children')
@@ -0,0 +1,58 @@
+"""maintain task closure on demand
+
+Revision ID: a7d3e1b5c942
+Revises: e2a7c4f9b613
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e1b5c942'
+down_revision: Union[str, Sequence[str], None] = 'e2a7c4f9b613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # closure is maintained only for closure storage, python -m src.infra.db.closure enables it again
+    op.execute("DROP TRIGGER IF EXISTS tasks_closure_insert ON tasks")
+    op.execute("DROP TRIGGER IF EXISTS tasks_closure_update ON tasks")
+    op.execute("TRUNCATE task_closure")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS tasks_closure_insert ON tasks")
+    op.execute("DROP TRIGGER IF EXISTS tasks_closure_update ON tasks")
+    op.execute("TRUNCATE task_closure")
+    op.execute(
+        """
+        CREATE TRIGGER tasks_closure_insert AFTER INSERT ON tasks
+        FOR EACH ROW EXECUTE FUNCTION maintain_task_closure()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_closure_update AFTER UPDATE OF parent_id ON tasks
+        FOR EACH ROW WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id) EXECUTE FUNCTION maintain_task_closure()
+        """
+    )
+    op.execute(
+        """
+        WITH RECURSIVE closure AS (
+            SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth
+            FROM tasks
+            UNION ALL
+            SELECT closure.ancestor_id, t.id, closure.depth + 1
+            FROM tasks t
+            INNER JOIN closure ON t.parent_id = closure.descendant_id
+        )
+        INSERT INTO task_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth FROM closure
+        """
+    )
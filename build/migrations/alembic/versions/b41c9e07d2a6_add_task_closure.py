@@ -0,0 +1,89 @@
+"""add task closure
+
+Revision ID: b41c9e07d2a6
+Revises: 8d2e4b6a1f03
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41c9e07d2a6'
+down_revision: Union[str, Sequence[str], None] = '8d2e4b6a1f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'task_closure',
+        sa.Column('ancestor_id', sa.Integer(), nullable=False),
+        sa.Column('descendant_id', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['ancestor_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['descendant_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_task_closure_descendant_id', 'task_closure', ['descendant_id', 'depth'])
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION maintain_task_closure() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                -- detach subtree of moved task from its old ancestors
+                DELETE FROM task_closure
+                WHERE descendant_id IN (SELECT descendant_id FROM task_closure WHERE ancestor_id = NEW.id)
+                  AND ancestor_id IN (SELECT ancestor_id FROM task_closure WHERE descendant_id = NEW.id AND depth > 0);
+            ELSE
+                INSERT INTO task_closure (ancestor_id, descendant_id, depth) VALUES (NEW.id, NEW.id, 0);
+            END IF;
+            IF NEW.parent_id IS NOT NULL THEN
+                -- attach subtree to ancestors of new parent
+                INSERT INTO task_closure (ancestor_id, descendant_id, depth)
+                SELECT sup.ancestor_id, sub.descendant_id, sup.depth + sub.depth + 1
+                FROM task_closure sup, task_closure sub
+                WHERE sup.descendant_id = NEW.parent_id AND sub.ancestor_id = NEW.id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_closure_insert AFTER INSERT ON tasks
+        FOR EACH ROW EXECUTE FUNCTION maintain_task_closure()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_closure_update AFTER UPDATE OF parent_id ON tasks
+        FOR EACH ROW WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id) EXECUTE FUNCTION maintain_task_closure()
+        """
+    )
+    op.execute(
+        """
+        WITH RECURSIVE closure AS (
+            SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth
+            FROM tasks
+            UNION ALL
+            SELECT closure.ancestor_id, t.id, closure.depth + 1
+            FROM tasks t
+            INNER JOIN closure ON t.parent_id = closure.descendant_id
+        )
+        INSERT INTO task_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, descendant_id, depth FROM closure
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION IF EXISTS maintain_task_closure() CASCADE")
+    op.drop_index('ix_task_closure_descendant_id', table_name='task_closure')
+    op.drop_table('task_closure')
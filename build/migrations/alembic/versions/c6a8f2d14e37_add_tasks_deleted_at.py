@@ -0,0 +1,39 @@
+"""add tasks deleted_at
+
+Revision ID: c6a8f2d14e37
+Revises: 5e7d0c3b9a14
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6a8f2d14e37'
+down_revision: Union[str, Sequence[str], None] = '5e7d0c3b9a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_tombstones',
+            'tasks',
+            [sa.text('depth DESC'), 'id'],
+            postgresql_where=sa.text('deleted_at IS NOT NULL'),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_tombstones', table_name='tasks', postgresql_concurrently=True)
+    op.drop_column('tasks', 'deleted_at')
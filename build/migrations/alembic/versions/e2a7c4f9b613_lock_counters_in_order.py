@@ -0,0 +1,139 @@
+"""lock counters of ancestors in order
+
+Revision ID: e2a7c4f9b613
+Revises: 9b3e5d7f1c28
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c4f9b613'
+down_revision: Union[str, Sequence[str], None] = '9b3e5d7f1c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION maintain_task_counters() RETURNS trigger AS $$
+        DECLARE
+            changes text;
+            ids int[];
+            total_deltas int[];
+            finished_deltas int[];
+            open_deltas int[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                changes := 'SELECT path, parent_id, pass_date, deleted_at, 1 AS sign FROM new_rows';
+            ELSIF TG_OP = 'DELETE' THEN
+                changes := 'SELECT path, parent_id, pass_date, deleted_at, -1 AS sign FROM old_rows';
+            ELSE
+                -- updates of counters themselves by this function stop here
+                IF NOT EXISTS (
+                    SELECT 1 FROM new_rows n JOIN old_rows o USING (id)
+                    WHERE n.pass_date IS DISTINCT FROM o.pass_date OR n.deleted_at IS DISTINCT FROM o.deleted_at
+                ) THEN
+                    RETURN NULL;
+                END IF;
+                changes := 'SELECT path, parent_id, pass_date, deleted_at, 1 AS sign FROM new_rows '
+                    || 'UNION ALL SELECT path, parent_id, pass_date, deleted_at, -1 FROM old_rows';
+            END IF;
+            EXECUTE 'WITH changes AS (' || changes || ')' || $sql$,
+                deltas AS (
+                    SELECT unnest(string_to_array(rtrim(path, '.'), '.')::int[]) AS id, sign AS total,
+                        CASE WHEN pass_date IS NULL THEN 0 ELSE sign END AS finished, 0 AS open
+                    FROM changes
+                    WHERE deleted_at IS NULL AND path != ''
+                    UNION ALL
+                    SELECT parent_id, 0, 0, sign
+                    FROM changes
+                    WHERE deleted_at IS NULL AND pass_date IS NULL AND parent_id IS NOT NULL
+                ),
+                sums AS (
+                    SELECT id, sum(total)::int AS total, sum(finished)::int AS finished, sum(open)::int AS open
+                    FROM deltas
+                    GROUP BY id
+                    HAVING sum(total) != 0 OR sum(finished) != 0 OR sum(open) != 0
+                )
+                SELECT array_agg(id ORDER BY id DESC), array_agg(total ORDER BY id DESC),
+                    array_agg(finished ORDER BY id DESC), array_agg(open ORDER BY id DESC)
+                FROM sums
+            $sql$ INTO ids, total_deltas, finished_deltas, open_deltas;
+            IF ids IS NULL THEN
+                RETURN NULL;
+            END IF;
+            -- rows are locked in fixed order before update, so concurrent statements do not deadlock on common ancestors.
+            -- Deepest first: ancestor is inserted before its descendants and so has smaller id, while rows of subtree
+            -- changed by statement itself are already locked. Lock is the one taken by UPDATE, so that inserts of
+            -- children (foreign key checks) are not blocked
+            PERFORM 1 FROM tasks WHERE id = ANY(ids) ORDER BY id DESC FOR NO KEY UPDATE;
+            UPDATE tasks
+            SET descendants = descendants + d.total,
+                finished_descendants = finished_descendants + d.finished,
+                open_children = open_children + d.open
+            FROM unnest(ids, total_deltas, finished_deltas, open_deltas) AS d(id, total, finished, open)
+            WHERE tasks.id = d.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION maintain_task_counters() RETURNS trigger AS $$
+        DECLARE
+            changes text;
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                changes := 'SELECT path, parent_id, pass_date, deleted_at, 1 AS sign FROM new_rows';
+            ELSIF TG_OP = 'DELETE' THEN
+                changes := 'SELECT path, parent_id, pass_date, deleted_at, -1 AS sign FROM old_rows';
+            ELSE
+                -- updates of counters themselves by this function stop here
+                IF NOT EXISTS (
+                    SELECT 1 FROM new_rows n JOIN old_rows o USING (id)
+                    WHERE n.pass_date IS DISTINCT FROM o.pass_date OR n.deleted_at IS DISTINCT FROM o.deleted_at
+                ) THEN
+                    RETURN NULL;
+                END IF;
+                changes := 'SELECT path, parent_id, pass_date, deleted_at, 1 AS sign FROM new_rows '
+                    || 'UNION ALL SELECT path, parent_id, pass_date, deleted_at, -1 FROM old_rows';
+            END IF;
+            EXECUTE 'WITH changes AS (' || changes || ')' || $sql$,
+                deltas AS (
+                    SELECT unnest(string_to_array(rtrim(path, '.'), '.')::int[]) AS id, sign AS total,
+                        CASE WHEN pass_date IS NULL THEN 0 ELSE sign END AS finished, 0 AS open
+                    FROM changes
+                    WHERE deleted_at IS NULL AND path != ''
+                    UNION ALL
+                    SELECT parent_id, 0, 0, sign
+                    FROM changes
+                    WHERE deleted_at IS NULL AND pass_date IS NULL AND parent_id IS NOT NULL
+                )
+                UPDATE tasks
+                SET descendants = descendants + d.total,
+                    finished_descendants = finished_descendants + d.finished,
+                    open_children = open_children + d.open
+                FROM (
+                    SELECT id, sum(total) AS total, sum(finished) AS finished, sum(open) AS open
+                    FROM deltas
+                    GROUP BY id
+                    HAVING sum(total) != 0 OR sum(finished) != 0 OR sum(open) != 0
+                ) d
+                WHERE tasks.id = d.id
+            $sql$;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
@@ -1,14 +1,23 @@
-from contextlib import asynccontextmanager
+import asyncio
+from typing import Optional
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI, APIRouter, Request
 from fastapi.responses import JSONResponse
 from dishka.integrations.fastapi import setup_dishka
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
 from sqlalchemy.orm import registry, relationship, column_property
 
 from src.domain.entities import User, Task
 from src.domain.exc import HandledError
 from src.interfaces.http import *
 from src.infra.db.tables import tasks, users
+from src.infra.db.tree import set_task_path
+from src.infra.db.closure import check_task_closure
+from src.infra.db.purge import TombstonePurger
+from src.infra.cache import PgInvalidationBus
+from src.infra.configs import DBConfig
 from src.container import container
 from src.logger import logger
 
@@ -32,15 +41,28 @@ def map_tables():
         "parent": relationship(Task, back_populates="subtasks", lazy='raise', uselist=False, remote_side=[tasks.c.id])
     })
     mapper_registry.configure()
+    event.listen(Task, "before_insert", set_task_path)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     map_tables()
     setup_routers(app)
+    db_config = await container.get(DBConfig)
+    await check_task_closure(await container.get(AsyncEngine), db_config)
+    workers = []
+    if db_config.deferred_task_deletion:
+        workers.append(asyncio.create_task((await container.get(TombstonePurger)).run()))
+    bus = await container.get(Optional[PgInvalidationBus])  # type: ignore
+    if bus is not None:
+        workers.append(asyncio.create_task(bus.run()))
     logger.info("Tracker backend is ready. Starting...")
     yield
     logger.info("Tracker backend shitdown")
+    for worker in workers:
+        worker.cancel()
+        with suppress(asyncio.CancelledError):
+            await worker
     await container.close()
 
 
@@ -60,4 +82,5 @@ def setup_routers(app: FastAPI):
     api_router = APIRouter(prefix="/api/v1")
     api_router.include_router(task_router)
     api_router.include_router(auth_router)
+    api_router.include_router(metrics_router)
     app.include_router(api_router)
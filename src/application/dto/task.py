@@ -1,4 +1,5 @@
-from typing import Optional
+import base64
+from typing import Optional, Self
 from datetime import datetime
 
 from pydantic import BaseModel, ConfigDict
@@ -22,6 +23,9 @@ class TaskPreviewDTO(BaseModel):
     id: int
     title: str
     parent_id: Optional[int] = None
+    # progress of subtree
+    descendants: int = 0
+    finished_descendants: int = 0
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -38,6 +42,8 @@ class TaskViewDTO(BaseModel):
     deadline: datetime
     pass_date: Optional[datetime] = None
     parent_id: Optional[int] = None
+    descendants: int = 0
+    finished_descendants: int = 0
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -46,6 +52,30 @@ class PaginatedTasksDTO(BaseModel):
     prev_page: Optional[int]
     next_page: Optional[int]
     tasks: list[TaskPreviewDTO]
+    prev_cursor: Optional[str] = None
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    # total is not exact, list is longer
+    total_capped: bool = False
+
+
+class TaskCursor(BaseModel):
+    """Position in list of tasks ordered by (creation_date, id) descending. Passed to client as opaque string"""
+    creation_date: datetime
+    id: int
+    backward: bool = False
+
+    @classmethod
+    def from_task(cls, task: Task, backward: bool = False) -> Self:
+        return cls(creation_date=task.creation_date, id=task.id, backward=backward)
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.model_dump_json().encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> Self:
+        """Raises ValueError if cursor malformed"""
+        return cls.model_validate_json(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
 
 
 class DeleteResponseDTO(BaseModel):
@@ -0,0 +1,31 @@
+from typing import Protocol, Optional
+
+from src.application.dto.task import PaginatedTasksDTO
+
+
+class CacheUnavailableError(Exception):
+    """Deletion could not be done, so deleted value may still be served"""
+
+
+class CacheInterface(Protocol):
+    """
+    Key-value storage of serialized values. Implementation may be shared by several processes, so values are
+    copied on both set and get. Unavailable backend behaves as empty cache on get and set, but delete raises
+    CacheUnavailableError: lost deletion would leave stale value.
+    """
+
+    async def get(self, key: str) -> Optional[bytes]: ...
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None: ...
+    async def delete(self, key: str) -> None: ...
+
+
+class TaskListCacheInterface(Protocol):
+    """
+    Cache of task list pages per user. Generation of user must be taken before page is read from db and page
+    is stored under it, so after invalidate() pages read before write are never served.
+    """
+
+    async def generation(self, user_id: int) -> str: ...
+    async def get(self, user_id: int, generation: str, key: tuple) -> Optional[PaginatedTasksDTO]: ...
+    async def set(self, user_id: int, generation: str, key: tuple, page: PaginatedTasksDTO) -> None: ...
+    async def invalidate(self, user_id: int) -> None: ...
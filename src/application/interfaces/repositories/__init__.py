@@ -1,2 +1,2 @@
-from .task import TaskRepositoryInterface
+from .task import TaskRepositoryInterface, TOTAL_COUNT_LIMIT
 from .user import UserRepositoryInterface
@@ -1,33 +1,105 @@
-from typing import Protocol, Optional, Literal
+from typing import Protocol, Optional, Literal, AsyncIterator
+from datetime import datetime
 
 from src.domain.entities.tasks import Task
+from src.domain.services import DeadlineBounds
 
 
+# totals of larger lists are not counted exactly: at most TOTAL_COUNT_LIMIT + 1 tasks are counted, so that capped
+# total can be told from exact one
+TOTAL_COUNT_LIMIT = 10000
+
 class TaskRepositoryInterface(Protocol):
     async def get_by_id(self, task_id: int) -> Optional[Task]: ...
 
+    async def get_owner_id(self, task_id: int) -> Optional[int]: ...
+
+    async def get_user_and_owner_ids(self, tg_name: str, task_id: int) -> Optional[tuple[int, Optional[int]]]:
+        """
+        Resolves user by telegram name and owner of the task at once. Returns None if user not found,
+        owner id is None if task not found
+        """
+
     async def get_with_parents(self, task_id: int) -> Task: ...
 
     async def get_with_parent_and_subs(self, task_id: int) -> Task: ...
 
+    async def get_deadline_bounds(self, task_id: int) -> DeadlineBounds:
+        """Deadline of parent and the latest deadline in subtree of task, computed without loading the tree"""
+
     async def get_tasks(
         self,
         user_id: int,
         status: Literal["active", "finished"],
         page: int = 1,
-        size: int = 5
-    ) -> tuple[int, int, list[Task]]: ...
+        size: int = 5,
+        include_total: bool = False
+    ) -> tuple[int, int, list[Task], Optional[int]]: ...
 
     async def get_subtasks(
         self,
         parent_id: int,
         status: Literal["active", "finished"],
         page: int = 1,
-        size: int = 5
-    ) -> tuple[int, int, list[Task]]: ...
+        size: int = 5,
+        include_total: bool = False
+    ) -> tuple[int, int, list[Task], Optional[int]]: ...
+
+    async def get_tasks_by_cursor(
+        self,
+        user_id: int,
+        status: Literal["active", "finished"],
+        key: Optional[tuple[datetime, int]] = None,
+        backward: bool = False,
+        size: int = 5,
+        include_total: bool = False
+    ) -> tuple[bool, bool, list[Task], Optional[int]]:
+        """
+        Returns page of root tasks following (or preceding if backward) the task with (creation_date, id) key
+        in descending order, whether there are tasks before and after the page and total number of matching tasks
+        if include_total (counted up to TOTAL_COUNT_LIMIT + 1)
+        """
+
+    async def get_subtasks_by_cursor(
+        self,
+        parent_id: int,
+        status: Literal["active", "finished"],
+        key: Optional[tuple[datetime, int]] = None,
+        backward: bool = False,
+        size: int = 5,
+        include_total: bool = False
+    ) -> tuple[bool, bool, list[Task], Optional[int]]: ...
+
+    def stream_tasks(
+        self,
+        user_id: int,
+        status: Literal["active", "finished"],
+        limit: Optional[int] = None
+    ) -> AsyncIterator[Task]:
+        """Yields root tasks in the same order as pages do, fetching them from db by batches"""
+
+    def stream_subtasks(
+        self,
+        parent_id: int,
+        status: Literal["active", "finished"],
+        limit: Optional[int] = None
+    ) -> AsyncIterator[Task]: ...
 
     async def get_all_subtask_ids(self, task_id: int) -> list[int]: ...
 
     async def get_task_tree(self, from_task_id: int) -> Task: ...
 
-    async def delete_task(self, task_id: int) -> None: ...
+    async def finish_subtree(self, task_id: int) -> list[int]:
+        """
+        Marks the task and its unfinished descendants done by single statement and returns ids of marked tasks.
+        Nothing is marked if the task itself is already finished
+        """
+
+    async def delete_task(self, task_id: int) -> list[int]:
+        """Deletes task with its subtree by single statement, returns ids of deleted descendants from top to bottom"""
+
+    async def tombstone_task(self, task_id: int) -> list[int]:
+        """
+        Hides task with its subtree from all queries leaving rows to be purged later. Returns ids of hidden
+        descendants like delete_task
+        """
@@ -5,4 +5,8 @@ from src.domain.entities.users import User
 
 class UserRepositoryInterface(Protocol):
     async def get_by_tg_name(self, tg_name: str) -> Optional[User]: ...
+    async def get_id_by_tg_name(self, tg_name: str) -> Optional[int]: ...
     async def count_by_tg_name(self, tg_name: str) -> int: ...
+
+    async def remember(self, user: User) -> None:
+        """Notify repository about just persisted user so that following lookups may be served without db"""
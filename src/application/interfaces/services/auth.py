@@ -3,4 +3,8 @@ from typing import Protocol, Optional
 
 class AuthenticationServiceInterface(Protocol):
     def get_tg_name_from_token(self, token: str) -> str: ...
+
+    def get_user_id_from_token(self, token: str) -> Optional[int]:
+        """Returns user id carried by token if service trusts it, otherwise None and user should be looked up by tg_name"""
+
     def decode(self, token: str) -> dict: ...
@@ -1,4 +1,4 @@
-from typing import Self, Protocol, TypeVar
+from typing import Self, Protocol, TypeVar, Optional, Callable, Awaitable
 
 
 class HasId(Protocol):
@@ -12,6 +12,7 @@ class UoWInterface(Protocol):
     """
     UoW that manages transaction starting when enter the context. Management of transaction going on automatically
     that mean commit will be called after exit from context or rollback if exception will be raised inside context.
+    Implementation may defer commit to the end of request, then it is done by close().
     """
 
     async def __aenter__(self) -> Self: ...
@@ -21,5 +22,25 @@ class UoWInterface(Protocol):
     def save(self, *ents: DomainEnt) -> None: ...
     async def commit(self) -> None: ...
     async def rollback(self) -> None: ...
+    async def close(self, exc: Optional[BaseException] = None) -> None: ...
     async def flush(self) -> None: ...
     def in_transaction(self) -> bool: ...
+
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Registers callback called once after current transaction is committed. Dropped on rollback"""
+
+
+class ReadOnlyUoWInterface(Protocol):
+    """
+    UoW for use cases that only read. Implementation is free to skip explicit transaction, so nothing
+    can be saved through it.
+    """
+
+    async def __aenter__(self) -> Self: ...
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> bool: ...
+
+    def in_transaction(self) -> bool: ...
+
+    def holding_transaction(self) -> "ReadOnlyUoWInterface":
+        """Returns UoW over the same connection whose block keeps one transaction open, e.g. for server side cursor"""
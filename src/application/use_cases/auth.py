@@ -1,7 +1,7 @@
 from typing import Optional
 
 from src.domain.entities import User
-from src.application.interfaces.uow import UoWInterface
+from src.application.interfaces.uow import UoWInterface, ReadOnlyUoWInterface
 from src.domain.types import AuthenticatedUserId, AuthenticatedOwnerId
 from src.application.interfaces.repositories import UserRepositoryInterface, TaskRepositoryInterface
 from src.application.interfaces.services import AuthenticationServiceInterface
@@ -17,6 +17,7 @@ __all__ = [
     "RegisterUser",
     "AuthenticateUser",
     "AuthenticateTaskOwner",
+    "AuthenticateUserAsTaskOwner",
     "CheckUserExists"
 ]
 
@@ -37,12 +38,13 @@ class RegisterUser:
                 raise UserExistsError("User with this telegram name already exists")
             registered = User(dto.tg_name)
             uow.save(registered)
+        await self._user_repo.remember(registered)
 
 
 class CheckUserExists:
     def __init__(
         self,
-        uow: UoWInterface,
+        uow: ReadOnlyUoWInterface,
         user_repo: UserRepositoryInterface,
     ):
         self._uow = uow
@@ -56,7 +58,7 @@ class CheckUserExists:
 class AuthenticateUser:
     def __init__(
         self,
-        uow: UoWInterface,
+        uow: ReadOnlyUoWInterface,
         user_repo: UserRepositoryInterface,
         auth_service: AuthenticationServiceInterface
     ):
@@ -67,18 +69,21 @@ class AuthenticateUser:
     async def execute(self, token: Optional[str]):
         if not token:
             raise UndefinedUserError("Unauthorized", status=401)
+        user_id = self._auth_service.get_user_id_from_token(token)
+        if user_id is not None:
+            return AuthenticatedUserId(user_id)
         tg_name = self._auth_service.get_tg_name_from_token(token)
         async with self._uow:
-            user = await self._user_repo.get_by_tg_name(tg_name)
-            if not user:
+            user_id = await self._user_repo.get_id_by_tg_name(tg_name)
+            if user_id is None:
                 raise UndefinedUserError("Unauthorized", status=401)
-        return AuthenticatedUserId(user.id)  # type: ignore
+        return AuthenticatedUserId(user_id)
 
 
 class AuthenticateTaskOwner:
     def __init__(
         self,
-        uow: UoWInterface,
+        uow: ReadOnlyUoWInterface,
         task_repo: TaskRepositoryInterface
     ):
         self._uow = uow
@@ -92,3 +97,36 @@ class AuthenticateTaskOwner:
             if task.user_id != user_id:
                 raise HasNoAccessError("User has no access the task", status=403)
         return AuthenticatedOwnerId(user_id)
+
+
+class AuthenticateUserAsTaskOwner:
+    """Authenticates user by token and checks access to the task within single transaction"""
+
+    def __init__(
+        self,
+        uow: ReadOnlyUoWInterface,
+        task_repo: TaskRepositoryInterface,
+        auth_service: AuthenticationServiceInterface
+    ):
+        self._uow = uow
+        self._task_repo = task_repo
+        self._auth_service = auth_service
+
+    async def execute(self, token: Optional[str], task_id: int):
+        if not token:
+            raise UndefinedUserError("Unauthorized", status=401)
+        user_id = self._auth_service.get_user_id_from_token(token)
+        async with self._uow:
+            if user_id is None:
+                tg_name = self._auth_service.get_tg_name_from_token(token)
+                ids = await self._task_repo.get_user_and_owner_ids(tg_name, task_id)
+                if ids is None:
+                    raise UndefinedUserError("Unauthorized", status=401)
+                user_id, owner_id = ids
+            else:
+                owner_id = await self._task_repo.get_owner_id(task_id)
+        if owner_id is None:
+            raise UndefinedTaskError("Unable to find task", status=404)
+        if owner_id != user_id:
+            raise HasNoAccessError("User has no access the task", status=403)
+        return AuthenticatedOwnerId(user_id)  # type: ignore
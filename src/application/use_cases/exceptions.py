@@ -19,3 +19,11 @@ class HasNoAccessError(ApplicationError):
 
 class TaskAlreadyFinishedError(ApplicationError):
     pass
+
+
+class InvalidCursorError(ApplicationError):
+    pass
+
+
+class PageSizeLimitError(ApplicationError):
+    pass
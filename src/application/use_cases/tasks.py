@@ -1,20 +1,32 @@
-from typing import Literal
+from functools import partial
+from typing import Literal, Optional, AsyncIterator, Awaitable, Callable
 
 from src.domain.entities import Task
 from src.domain.services import TaskProducerService, TaskPlannerManagerService
-from src.application.interfaces.uow import UoWInterface
-from src.application.interfaces.repositories import TaskRepositoryInterface
+from src.application.interfaces.uow import UoWInterface, ReadOnlyUoWInterface
+from src.application.interfaces.repositories import TaskRepositoryInterface, TOTAL_COUNT_LIMIT
+from src.application.interfaces.cache import TaskListCacheInterface
 from src.application.dto.task import (
     TaskCreateDTO,
-    TaskUpdateDTO
+    TaskUpdateDTO,
+    TaskPreviewDTO,
+    PaginatedTasksDTO,
+    TaskCursor
+)
+from src.domain.types import AuthenticatedUserId, AuthenticatedOwnerId, MaxPageSize, DeferredDeletion
+from .exceptions import (
+    UndefinedTaskError,
+    TaskAlreadyFinishedError,
+    InvalidCursorError,
+    PageSizeLimitError
 )
-from src.domain.types import AuthenticatedUserId
-from .exceptions import UndefinedTaskError, TaskAlreadyFinishedError
 
 __all__ = [
     "ShowTask",
     "ShowSubtasks",
     "ShowTasks",
+    "StreamSubtasks",
+    "StreamTasks",
     "CreateTask",
     "UpdateTask",
     "DeleteTask",
@@ -35,42 +47,225 @@ class BaseTaskUseCase:
         self._task_repo = task_repo
 
 
-class ShowTask(BaseTaskUseCase):
+class BaseChangeTaskUseCase(BaseTaskUseCase):
+    """Cached list pages of owner are invalidated only after commit, otherwise they could be cached again before it"""
+
+    def __init__(
+        self,
+        uow: UoWInterface,
+        task_repo: TaskRepositoryInterface,
+        cache: TaskListCacheInterface
+    ):
+        super().__init__(uow, task_repo)
+        self._cache = cache
+
+    def _invalidate_lists(self, user_id: int) -> None:
+        self._uow.after_commit(partial(self._cache.invalidate, user_id))
+
+
+class BaseReadTaskUseCase:
+    def __init__(
+        self,
+        uow: ReadOnlyUoWInterface,
+        task_repo: TaskRepositoryInterface
+    ):
+        self._uow = uow
+        self._task_repo = task_repo
+
+
+class ShowTask(BaseReadTaskUseCase):
     async def execute(self, task_id: int):
         async with self._uow:
             return await self._task_repo.get_by_id(task_id)
 
 
-class ShowSubtasks(BaseTaskUseCase):
+class BasePaginateTasksUseCase(BaseReadTaskUseCase):
+    """
+    Pages are addressed either by number (offset) or by cursor (keyset). Both modes return cursors, so client
+    can switch to cursors from any numbered page. Pages are cached per owner until owner changes any task
+    """
+
+    def __init__(
+        self,
+        uow: ReadOnlyUoWInterface,
+        task_repo: TaskRepositoryInterface,
+        max_page_size: MaxPageSize,
+        cache: TaskListCacheInterface
+    ):
+        super().__init__(uow, task_repo)
+        self._max_page_size = max_page_size
+        self._cache = cache
+
+    async def _cached(
+        self,
+        user_id: int,
+        key: tuple,
+        load: Callable[[], Awaitable[PaginatedTasksDTO]]
+    ) -> PaginatedTasksDTO:
+        generation = await self._cache.generation(user_id)
+        page = await self._cache.get(user_id, generation, key)
+        if page is None:
+            page = await load()
+            await self._cache.set(user_id, generation, key, page)
+        return page
+
+    def _check_size(self, size: int) -> None:
+        if size > self._max_page_size:
+            raise PageSizeLimitError(f"Page size must not exceed {self._max_page_size}, use streaming to get more")
+
+    def _decode_cursor(self, cursor: str) -> TaskCursor:
+        try:
+            return TaskCursor.decode(cursor)
+        except ValueError:
+            raise InvalidCursorError("Invalid cursor")
+
+    def _build_page(
+        self,
+        tasks: list[Task],
+        has_prev: bool,
+        has_next: bool,
+        total: Optional[int],
+        prev_page: int = 0,
+        next_page: int = 0
+    ) -> PaginatedTasksDTO:
+        capped = total is not None and total > TOTAL_COUNT_LIMIT
+        return PaginatedTasksDTO(
+            total=TOTAL_COUNT_LIMIT if capped else total,
+            total_capped=capped,
+            tasks=[TaskPreviewDTO.model_validate(task) for task in tasks],
+            prev_page=prev_page,
+            next_page=next_page,
+            prev_cursor=TaskCursor.from_task(tasks[0], backward=True).encode() if has_prev and tasks else None,
+            next_cursor=TaskCursor.from_task(tasks[-1]).encode() if has_next and tasks else None
+        )
+
+
+class ShowSubtasks(BasePaginateTasksUseCase):
     async def execute(
         self,
+        user_id: AuthenticatedOwnerId,
         status: Literal["active", "finished"],
         parent_id: int,
         page: int = 1,
         size: int = 5,
-    ) -> tuple[int, int, list[Task]]:  # type: ignore
+        cursor: Optional[str] = None,
+        include_total: bool = False
+    ) -> PaginatedTasksDTO:
+        self._check_size(size)
+        return await self._cached(
+            user_id,
+            ("subtasks", parent_id, status, page, size, cursor, include_total),
+            lambda: self._load(status, parent_id, page, size, cursor, include_total)
+        )
+
+    async def _load(
+        self,
+        status: Literal["active", "finished"],
+        parent_id: int,
+        page: int,
+        size: int,
+        cursor: Optional[str],
+        include_total: bool
+    ) -> PaginatedTasksDTO:
+        if cursor is None:
+            async with self._uow:
+                prev_page, next_page, tasks, total = await self._task_repo.get_subtasks(
+                    parent_id, status, page=page, size=size, include_total=include_total
+                )
+            return self._build_page(tasks, bool(prev_page), bool(next_page), total, prev_page, next_page)
+        position = self._decode_cursor(cursor)
         async with self._uow:
-            return await self._task_repo.get_subtasks(parent_id, status, page=page, size=size)
+            has_prev, has_next, tasks, total = await self._task_repo.get_subtasks_by_cursor(
+                parent_id,
+                status,
+                key=(position.creation_date, position.id),
+                backward=position.backward,
+                size=size,
+                include_total=include_total
+            )
+        return self._build_page(tasks, has_prev, has_next, total)
 
 
-class ShowTasks(BaseTaskUseCase):
+class ShowTasks(BasePaginateTasksUseCase):
     async def execute(
         self,
         user_id: AuthenticatedUserId,
         status: Literal["active", "finished"],
         page: int = 1,
-        size: int = 5
-    ) -> tuple[int, int, list[Task]]:  # type: ignore
+        size: int = 5,
+        cursor: Optional[str] = None,
+        include_total: bool = False
+    ) -> PaginatedTasksDTO:
+        self._check_size(size)
+        return await self._cached(
+            user_id,
+            ("tasks", status, page, size, cursor, include_total),
+            lambda: self._load(user_id, status, page, size, cursor, include_total)
+        )
+
+    async def _load(
+        self,
+        user_id: AuthenticatedUserId,
+        status: Literal["active", "finished"],
+        page: int,
+        size: int,
+        cursor: Optional[str],
+        include_total: bool
+    ) -> PaginatedTasksDTO:
+        if cursor is None:
+            async with self._uow:
+                prev_page, next_page, tasks, total = await self._task_repo.get_tasks(
+                    user_id, status, page=page, size=size, include_total=include_total
+                )
+            return self._build_page(tasks, bool(prev_page), bool(next_page), total, prev_page, next_page)
+        position = self._decode_cursor(cursor)
         async with self._uow:
-            return await self._task_repo.get_tasks(user_id, status, page=page, size=size)
+            has_prev, has_next, tasks, total = await self._task_repo.get_tasks_by_cursor(
+                user_id,
+                status,
+                key=(position.creation_date, position.id),
+                backward=position.backward,
+                size=size,
+                include_total=include_total
+            )
+        return self._build_page(tasks, has_prev, has_next, total)
+
 
+class StreamSubtasks(BaseReadTaskUseCase):
+    """Server side cursor lives only inside transaction, so it is held open until the whole stream is read"""
 
-class CreateTask(BaseTaskUseCase):
+    async def execute(
+        self,
+        status: Literal["active", "finished"],
+        parent_id: int,
+        limit: Optional[int] = None
+    ) -> AsyncIterator[TaskPreviewDTO]:
+        async with self._uow.holding_transaction():
+            async for task in self._task_repo.stream_subtasks(parent_id, status, limit=limit):
+                yield TaskPreviewDTO.model_validate(task)
+
+
+class StreamTasks(BaseReadTaskUseCase):
+    """Server side cursor lives only inside transaction, so it is held open until the whole stream is read"""
+
+    async def execute(
+        self,
+        user_id: AuthenticatedUserId,
+        status: Literal["active", "finished"],
+        limit: Optional[int] = None
+    ) -> AsyncIterator[TaskPreviewDTO]:
+        async with self._uow.holding_transaction():
+            async for task in self._task_repo.stream_tasks(user_id, status, limit=limit):
+                yield TaskPreviewDTO.model_validate(task)
+
+
+class CreateTask(BaseChangeTaskUseCase):
     async def execute(self, user_id: AuthenticatedUserId, dto: TaskCreateDTO):
         async with self._uow as uow:
             parent = None
             if dto.parent_id:
-                parent = await self._task_repo.get_with_parents(dto.parent_id)
+                # depth is stored, so parent row alone is enough for validation
+                parent = await self._task_repo.get_by_id(dto.parent_id)
                 if not parent:
                     raise UndefinedTaskError("Unable to bind to unexistent parent task")
             manager = TaskProducerService()
@@ -82,59 +277,77 @@ class CreateTask(BaseTaskUseCase):
                 parent,
             )
             uow.save(created)
+            self._invalidate_lists(user_id)
         return created
 
 
-class UpdateTask(BaseTaskUseCase):
+class UpdateTask(BaseChangeTaskUseCase):
     async def execute(self, task_id: int, dto: TaskUpdateDTO):
         async with self._uow:
-            task = await self._task_repo.get_with_parent_and_subs(task_id)
+            task = await self._task_repo.get_by_id(task_id)
+            self._invalidate_lists(task.user_id)
             if dto.title:
                 task.title = dto.title
             if dto.description:
                 task.description = dto.description
             if dto.deadline:
-                manager = TaskPlannerManagerService(task)
+                bounds = await self._task_repo.get_deadline_bounds(task_id)
+                manager = TaskPlannerManagerService(task, bounds)
                 manager.set_deadline(dto.deadline)
         return task
 
 
-class DeleteTask(BaseTaskUseCase):
-    async def execute(self, task_id: int):
+class DeleteTask(BaseChangeTaskUseCase):
+    """In deferred mode subtree is only hidden, rows are purged later in background by small batches"""
+
+    def __init__(
+        self,
+        uow: UoWInterface,
+        task_repo: TaskRepositoryInterface,
+        cache: TaskListCacheInterface,
+        deferred: DeferredDeletion
+    ):
+        super().__init__(uow, task_repo, cache)
+        self._deferred = deferred
+
+    async def execute(self, user_id: AuthenticatedOwnerId, task_id: int):
         async with self._uow:
-            subs_ids = await self._task_repo.get_all_subtask_ids(task_id)
-            await self._task_repo.delete_task(task_id)
-            return subs_ids
+            self._invalidate_lists(user_id)
+            if self._deferred:
+                return await self._task_repo.tombstone_task(task_id)
+            return await self._task_repo.delete_task(task_id)
 
 
-class FinishTask(BaseTaskUseCase):
+class FinishTask(BaseChangeTaskUseCase):
     async def execute(self, task_id: int):
         async with self._uow:
-            task = await self._task_repo.get_task_tree(task_id)
+            task = await self._task_repo.get_by_id(task_id)
             if task.is_done:
                 raise TaskAlreadyFinishedError("Task already finished")
-            task.mark_as_done()
+            self._invalidate_lists(task.user_id)
+            # counters of subtree are stored in task row, so subtasks are not loaded
+            task.mark_as_done(task.finished_descendants < task.descendants)
 
 
-class CheckTaskActive(BaseTaskUseCase):
+class CheckTaskActive(BaseReadTaskUseCase):
     async def execute(self, task_id: int):
         async with self._uow:
             task = await self._task_repo.get_by_id(task_id)
             return not task.is_done
 
 
-class ShowParentId(BaseTaskUseCase):
+class ShowParentId(BaseReadTaskUseCase):
     async def execute(self, task_id: int):
         async with self._uow:
             task = await self._task_repo.get_by_id(task_id)
             return task.parent_id
 
 
-class ForceFinishTask(BaseTaskUseCase):
-    async def execute(self, task_id: int):
+class ForceFinishTask(BaseChangeTaskUseCase):
+    async def execute(self, user_id: AuthenticatedOwnerId, task_id: int):
         async with self._uow:
-            task = await self._task_repo.get_task_tree(task_id)
-            if task.is_done:
+            self._invalidate_lists(user_id)
+            finished = await self._task_repo.finish_subtree(task_id)
+            if task_id not in finished:
                 raise TaskAlreadyFinishedError("Task already finished")
-            task.force_mark_as_done()
-            return task.get_subs_ids()
+            return [finished_id for finished_id in finished if finished_id != task_id]
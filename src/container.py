@@ -1,4 +1,6 @@
-from typing import AsyncGenerator
+from functools import partial
+from uuid import uuid4
+from typing import AsyncGenerator, AsyncIterator, Optional
 
 from dishka import Provider, provide, Scope, make_async_container
 from dishka.integrations.fastapi import FastapiProvider
@@ -9,41 +11,100 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine
 )
 from fastapi import Request
+from redis.asyncio import Redis
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
 
 from src.application.use_cases import *
 from src.application.interfaces.repositories import *
 from src.application.interfaces.services import *
-from src.application.interfaces.uow import UoWInterface
+from src.application.interfaces.uow import UoWInterface, ReadOnlyUoWInterface
+from src.application.interfaces.cache import CacheInterface, TaskListCacheInterface
 from src.infra.configs import (
     DBConfig,
     AppConfig
 )
 from src.infra.repository import *
 from src.infra.services import *
-from src.infra.uow import AlchemyUoW
-from src.domain.types import AuthenticatedUserId, AuthenticatedOwnerId
+from src.infra.cache import (
+    LRUCache,
+    MemoryCache,
+    RedisCache,
+    TwoTierCache,
+    PgInvalidationBus,
+    listener_dsn,
+    TaskListCache
+)
+from src.infra.metrics import metrics, Distribution
+from src.infra.uow import AlchemyUoW, AlchemyReadOnlyUoW
+from src.infra.db.routing import RoutingSession, PrimaryPins
+from src.infra.db.pool import InstrumentedPool
+from src.infra.db.purge import TombstonePurger
+from src.infra.services.exceptions import JWTUnauthorizedError
+from src.domain.types import AuthenticatedUserId, AuthenticatedOwnerId, MaxPageSize, DeferredDeletion
 
 
 class DBProvider(Provider):
     scope = Scope.APP
 
+    def __init__(self):
+        super().__init__()
+        self._transactions = Distribution()
+        metrics.register("transactions_per_request", self._transactions.stats)
+
     @provide
     def get_db_conf(self) -> DBConfig:
         return DBConfig()  # type: ignore
 
     @provide
     def get_engine(self, config: DBConfig) -> AsyncEngine:
-        return create_async_engine(config.conn_url)
+        return self._create_engine(config.conn_url, config, "db_pool")
 
     @provide
-    def get_sessionmaker(self, engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    def get_sessionmaker(self, engine: AsyncEngine, config: DBConfig) -> async_sessionmaker[AsyncSession]:
+        replicas = [
+            self._create_engine(url, config, f"db_pool_replica_{i}").sync_engine
+            for i, url in enumerate(config.replica_urls)
+        ]
         return async_sessionmaker(
             engine,
             expire_on_commit=False,
             autoflush=False,
-            autobegin=False
+            autobegin=False,
+            sync_session_class=RoutingSession,
+            replicas=replicas
         )
 
+    @provide
+    def get_primary_pins(self, config: DBConfig, cache: CacheInterface) -> PrimaryPins:
+        return PrimaryPins(cache, config.read_your_writes_window)
+
+    @provide
+    def get_deferred_deletion(self, config: DBConfig) -> DeferredDeletion:
+        return DeferredDeletion(config.deferred_task_deletion)
+
+    @provide
+    def get_tombstone_purger(
+        self,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        config: DBConfig
+    ) -> TombstonePurger:
+        purger = TombstonePurger(sessionmaker, config.purge_batch_size, config.purge_interval)
+        metrics.register("task_purge", purger.stats)
+        return purger
+
+    @provide
+    def get_invalidation_bus(
+        self,
+        engine: AsyncEngine,
+        config: DBConfig,
+        conf: AppConfig
+    ) -> Optional[PgInvalidationBus]:
+        # listener dsn is validated only when bus is enabled
+        if not conf.cache_invalidation_bus:
+            return None
+        return PgInvalidationBus(engine, listener_dsn(config, conf))
+
     @provide(scope=Scope.REQUEST)
     async def get_session(
         self,
@@ -56,13 +117,123 @@ class DBProvider(Provider):
                 await session.close()
 
     @provide(scope=Scope.REQUEST)
-    def get_uow(self, session: AsyncSession) -> UoWInterface:
-        return AlchemyUoW(session)
+    async def get_uow(
+        self,
+        session: AsyncSession,
+        config: DBConfig,
+        r: Request,
+        auth_service: AuthenticationServiceInterface,
+        pins: PrimaryPins
+    ) -> AsyncIterator[UoWInterface]:
+        on_commit = None
+        if config.replica_urls:
+            client = self._get_client(r, auth_service)
+            if client:
+                on_commit = partial(pins.pin, client)
+        uow = AlchemyUoW(session, request_scoped=config.request_transaction, on_commit=on_commit)
+        if config.request_transaction:
+            # closed by UoWRoute before response is sent
+            r.state.deferred_uow = uow
+        exc: Optional[BaseException] = yield uow
+        await uow.close(exc)
+        self._transactions.observe(uow.transactions)
 
+    @provide(scope=Scope.REQUEST)
+    async def get_read_only_uow(
+        self,
+        session: AsyncSession,
+        config: DBConfig,
+        r: Request,
+        auth_service: AuthenticationServiceInterface,
+        pins: PrimaryPins
+    ) -> ReadOnlyUoWInterface:
+        use_replica = False
+        if config.replica_urls:
+            # who wrote recently reads from primary until replicas catch up
+            client = self._get_client(r, auth_service)
+            use_replica = not (client and await pins.is_pinned(client))
+        return AlchemyReadOnlyUoW(session, use_replica=use_replica)
 
-repo_provider = Provider(scope=Scope.REQUEST)
-repo_provider.provide(AlchemyTaskRepository, provides=TaskRepositoryInterface)
-repo_provider.provide(AlchemyUserRepository, provides=UserRepositoryInterface)
+    @staticmethod
+    def _create_engine(url: str, config: DBConfig, metrics_name: str) -> AsyncEngine:
+        connect_args: dict = {
+            "statement_cache_size": config.statement_cache_size,
+            "command_timeout": config.command_timeout
+        }
+        if config.pgbouncer:
+            # pgbouncer in transaction mode may serve next statement by other server connection,
+            # so named prepared statements must be neither cached nor reused
+            connect_args.update(
+                statement_cache_size=0,
+                prepared_statement_cache_size=0,
+                prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__"
+            )
+        engine = create_async_engine(
+            url,
+            poolclass=InstrumentedPool,
+            pool_size=config.pool_size,
+            max_overflow=config.max_overflow,
+            pool_timeout=config.pool_timeout,
+            pool_pre_ping=config.pool_pre_ping,
+            pool_recycle=config.pool_recycle,
+            connect_args=connect_args
+        )
+        metrics.register(metrics_name, lambda: engine.pool.stats())  # type: ignore
+        return engine
+
+    @staticmethod
+    def _get_client(r: Request, auth_service: AuthenticationServiceInterface) -> Optional[str]:
+        token = r.cookies.get("token")
+        if not token:
+            return None
+        try:
+            return auth_service.get_tg_name_from_token(token)
+        except JWTUnauthorizedError:
+            return None
+
+
+class RepoProvider(Provider):
+    scope = Scope.REQUEST
+
+    @provide
+    def get_task_repo(self, session: AsyncSession, config: DBConfig) -> TaskRepositoryInterface:
+        if config.task_tree_storage == "closure":
+            return ClosureTaskRepository(session)
+        return AlchemyTaskRepository(session)
+
+    @provide(scope=Scope.APP)
+    async def get_cache(
+        self,
+        conf: AppConfig,
+        bus: Optional[PgInvalidationBus]
+    ) -> AsyncIterator[CacheInterface]:
+        cache: TwoTierCache | RedisCache
+        # entries of Redis are shared by all workers and nodes
+        shared = RedisCache(
+            # one immediate retry replaces connection closed by server, longer waits are cut by backoff of RedisCache
+            Redis.from_url(conf.cache_url, socket_timeout=1, socket_connect_timeout=1, retry=Retry(NoBackoff(), 1))
+        ) if conf.cache_url else None
+        if shared is not None and bus is None:
+            # local copies could not be evicted by writes of other workers
+            cache = shared
+        else:
+            local = MemoryCache(conf.cache_size, ttl=conf.local_cache_ttl)
+            cache = TwoTierCache(local, shared, bus)
+            if bus is not None:
+                metrics.register("cache_bus", bus.stats)
+        metrics.register("cache", cache.stats)
+        yield cache
+        await cache.close()
+
+    @provide
+    def get_user_repo(self, session: AsyncSession, cache: CacheInterface, conf: AppConfig) -> UserRepositoryInterface:
+        return CachedUserRepository(AlchemyUserRepository(session), cache, ttl=conf.identity_cache_ttl)
+
+    @provide(scope=Scope.APP)
+    def get_task_list_cache(self, cache: CacheInterface, conf: AppConfig) -> TaskListCacheInterface:
+        task_list_cache = TaskListCache(cache, ttl=conf.task_list_cache_ttl)
+        metrics.register("task_list_cache", task_list_cache.stats)
+        return task_list_cache
 
 
 class ServiceProvider(Provider):
@@ -72,9 +243,15 @@ class ServiceProvider(Provider):
     def get_app_conf(self) -> AppConfig:
         return AppConfig()  # type: ignore
 
-    @provide
+    @provide(scope=Scope.APP)
     def get_auth_service(self, conf: AppConfig) -> AuthenticationServiceInterface:
-        return JWTAuthenticationService(conf.secret)
+        cache: LRUCache[bytes, dict] = LRUCache(conf.token_cache_size)
+        metrics.register("token_cache", cache.stats)
+        return JWTAuthenticationService(conf.secret, cache, trust_uid=conf.stateless_auth)
+
+    @provide(scope=Scope.APP)
+    def get_max_page_size(self, conf: AppConfig) -> MaxPageSize:
+        return MaxPageSize(conf.max_page_size)
 
 
 use_case_provider = Provider(scope=Scope.REQUEST)
@@ -87,12 +264,15 @@ use_case_provider.provide_all(
     ShowTask,
     ShowTasks,
     ShowSubtasks,
+    StreamTasks,
+    StreamSubtasks,
     CreateTask,
     UpdateTask,
     DeleteTask,
     FinishTask,
     ForceFinishTask,
-    AuthenticateTaskOwner
+    AuthenticateTaskOwner,
+    AuthenticateUserAsTaskOwner
 )
 
 
@@ -107,15 +287,14 @@ class AuthProvider(Provider):
     async def auth_owner(
         self,
         r: Request,
-        use_case: AuthenticateTaskOwner,
-        user_id: AuthenticatedUserId
+        use_case: AuthenticateUserAsTaskOwner
     ) -> AuthenticatedOwnerId:
-        return await use_case.execute(int(r.path_params.get("task_id")), user_id)  # type: ignore
+        return await use_case.execute(r.cookies.get("token"), int(r.path_params.get("task_id")))  # type: ignore
 
 
 container = make_async_container(
     DBProvider(),
-    repo_provider,
+    RepoProvider(),
     ServiceProvider(),
     use_case_provider,
     AuthProvider(),
@@ -21,6 +21,16 @@ class Task:
     parent: Optional["Task"] = None
     parent_id: Optional[int] = field(default=None, init=False)
     subtasks: list['Task'] = field(default_factory=list, init=False)
+    # level in tree starting from 1 for root, fixed at creation as tasks are never moved between parents
+    depth: int = field(default=1, init=False)
+    # kept by storage: unfinished children, all descendants and finished ones
+    open_children: int = field(default=0, init=False)
+    descendants: int = field(default=0, init=False)
+    finished_descendants: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        if self.parent is not None:
+            self.depth = self.parent.get_depth() + 1
 
     @property
     def deadline(self):
@@ -51,19 +61,25 @@ class Task:
         for sub in self.subtasks:
             sub.force_mark_as_done()
 
-    def mark_as_done(self):
+    def mark_as_done(self, has_unfinished_subtasks: Optional[bool] = None):
+        """Subtasks are walked unless it is already known whether any of them is unfinished"""
+        if has_unfinished_subtasks is None:
+            has_unfinished_subtasks = self._has_unfinished_subtasks()
+        if has_unfinished_subtasks:
+            raise UnfinishedTaskError("Unable finish task while subtasks not fininshed")
+        self._pass_date = datetime.now(timezone.utc)
+
+    def _has_unfinished_subtasks(self) -> bool:
         queue = deque(self.subtasks)
         while queue:
             current = queue.popleft()
             if not current.is_done:
-                raise UnfinishedTaskError("Unable finish task while subtasks not fininshed")
+                return True
             queue.extend(current.subtasks)
-        self._pass_date = datetime.now(timezone.utc)
+        return False
 
     def get_depth(self) -> int:
-        if self.parent is None:
-            return 1
-        return self.parent.get_depth() + 1
+        return self.depth
 
     def get_subs_ids(self) -> list[int]:
         subs_ids = []
@@ -1 +1 @@
-from .task import TaskPlannerManagerService, TaskProducerService, MAX_DEPTH
+from .task import TaskPlannerManagerService, TaskProducerService, DeadlineBounds, MAX_DEPTH
@@ -2,6 +2,7 @@ from src.logger import logger
 from datetime import datetime, timezone
 from typing import Optional
 from collections import deque
+from dataclasses import dataclass
 
 from src.domain.entities import Task
 from src.domain.services.exceptions import (
@@ -10,9 +11,17 @@ from src.domain.services.exceptions import (
     ParentFinishedError
 )
 
+# checked by db too (ck_tasks_depth_range), changing it needs migration recreating the constraint
 MAX_DEPTH = 5
 
 
+@dataclass(frozen=True)
+class DeadlineBounds:
+    """Deadline of parent of task and the latest deadline among its descendants, None if there are no such tasks"""
+    parent_deadline: Optional[datetime] = None
+    latest_subtask_deadline: Optional[datetime] = None
+
+
 class BaseTaskManagerService:
     def _validate_deadline(self, to_set: datetime):
         if datetime.now(timezone.utc) >= to_set.astimezone(timezone.utc):
@@ -50,10 +59,19 @@ class TaskProducerService(BaseTaskManagerService):
 
 
 class TaskPlannerManagerService(BaseTaskManagerService):
-    def __init__(self, task: Task):
+    """Validates new deadline against given bounds if any, otherwise against loaded parent and subtasks"""
+
+    def __init__(self, task: Task, bounds: Optional[DeadlineBounds] = None):
         self._task = task
+        self._bounds = bounds
 
     def _validate_subs_deadlines(self, new_deadline: datetime):
+        if self._bounds is not None:
+            latest = self._bounds.latest_subtask_deadline
+            if latest is not None and latest > new_deadline:
+                raise InvalidDeadlineError(
+                    "Deadline of creating task cannot be earlier than deadline of subtasks")
+            return
         queue: deque[Task] = deque(self._task.subtasks)
         while queue:
             current = queue.popleft()
@@ -63,10 +81,13 @@ class TaskPlannerManagerService(BaseTaskManagerService):
             queue.extend(current.subtasks)
 
     def _validate_parent_deadline(self, new_deadline: datetime):
-        if self._task.parent:
-            if self._task.parent.deadline < new_deadline:  # type: ignore
-                raise InvalidDeadlineError(
-                    "Deadline of creating task cannot be later than deadline of parent task")
+        if self._bounds is not None:
+            parent_deadline = self._bounds.parent_deadline
+        else:
+            parent_deadline = self._task.parent.deadline if self._task.parent else None  # type: ignore
+        if parent_deadline is not None and parent_deadline < new_deadline:
+            raise InvalidDeadlineError(
+                "Deadline of creating task cannot be later than deadline of parent task")
 
     def _validate_deadline(self, to_set: datetime):
         super()._validate_deadline(to_set)
@@ -3,3 +3,5 @@ from typing import NewType
 
 AuthenticatedUserId = NewType("AuthenticatedUserId", int)
 AuthenticatedOwnerId = NewType("AuthenticatedOwnerId", int)
+MaxPageSize = NewType("MaxPageSize", int)
+DeferredDeletion = NewType("DeferredDeletion", bool)
@@ -0,0 +1,6 @@
+from .lru import LRUCache
+from .memory import MemoryCache
+from .redis import RedisCache
+from .bus import PgInvalidationBus, listener_dsn
+from .two_tier import TwoTierCache
+from .task_list import TaskListCache
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Optional, Callable
+
+import asyncpg
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.infra.configs import DBConfig, AppConfig
+from src.logger import logger
+
+
+def listener_dsn(db_config: DBConfig, app_config: AppConfig) -> str:
+    """
+    LISTEN through PgBouncer in transaction mode is bound to arbitrary server connection and is never notified,
+    while pings still succeed. So behind PgBouncer direct connection must be given explicitly.
+    """
+    if app_config.cache_bus_url:
+        return app_config.cache_bus_url
+    if db_config.pgbouncer and app_config.cache_invalidation_bus:
+        raise ValueError("CACHE_BUS_URL with direct connection to Postgres is required to listen behind PgBouncer")
+    return db_config.formatted_conn_url
+
+
+class PgInvalidationBus:
+    """
+    Broadcasts deleted cache keys to all workers by Postgres NOTIFY. Every worker listens on own dedicated
+    connection, LISTEN needs session so dsn must not point to PgBouncer in transaction mode. Notifications sent
+    while listener was disconnected are lost, so subscribers are reset on every connect.
+    """
+
+    channel = "cache_invalidation"
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        dsn: str,
+        check_interval: float = 5,
+        reconnect_interval: float = 1
+    ):
+        self._engine = engine
+        self._dsn = dsn
+        self._check_interval = check_interval
+        self._reconnect_interval = reconnect_interval
+        self._subscribers: list[tuple[Callable[[str], None], Callable[[], None]]] = []
+        self._connection: Optional[asyncpg.Connection] = None
+        self.published = 0
+        self.received = 0
+        self.connects = 0
+
+    def subscribe(self, on_key: Callable[[str], None], on_reset: Callable[[], None]) -> None:
+        self._subscribers.append((on_key, on_reset))
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def publish(self, key: str) -> None:
+        # pooled connection of app is enough to notify, it is delivered on commit
+        async with self._engine.connect() as connection:
+            await connection.execute(select(func.pg_notify(self.channel, key)))
+            await connection.commit()
+        self.published += 1
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except Exception as e:
+                logger.warning(f"Cache invalidation bus disconnected: {e!r}")
+            await asyncio.sleep(self._reconnect_interval)
+
+    async def _listen(self) -> None:
+        connection = await asyncpg.connect(self._dsn)
+        lost = asyncio.Event()
+        connection.add_termination_listener(lambda _: lost.set())
+        try:
+            await connection.add_listener(self.channel, self._on_notification)
+            self._connection = connection
+            self.connects += 1
+            for _, on_reset in self._subscribers:
+                on_reset()
+            while not lost.is_set():
+                try:
+                    await asyncio.wait_for(lost.wait(), self._check_interval)
+                except asyncio.TimeoutError:
+                    # idle connection does not notice lost server by itself
+                    await asyncio.wait_for(connection.execute("SELECT 1"), self._check_interval)
+            raise ConnectionError("listener connection closed")
+        finally:
+            self._connection = None
+            connection.terminate()
+
+    def _on_notification(self, connection, pid: int, channel: str, key: str) -> None:
+        self.received += 1
+        for on_key, _ in self._subscribers:
+            on_key(key)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "connects": self.connects,
+            "published": self.published,
+            "received": self.received
+        }
@@ -0,0 +1,86 @@
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, TypeVar, Callable
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Bounded in-process cache. Least recently used entry is evicted when maxsize is reached.
+    Every entry may have its own expiration moment (unix timestamp), ttl is applied as upper bound for all entries.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        clock: Optional[Callable[[], float]] = None
+    ):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[V, Optional[float]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _now(self) -> float:
+        return self._clock() if self._clock else time.time()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: K):
+        return self._lookup(key) is not None
+
+    def _lookup(self, key: K) -> Optional[tuple[V, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at = entry[1]
+        if expires_at is not None and expires_at <= self._now():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._lookup(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return entry[0]
+
+    def get_with_expiration(self, key: K) -> tuple[Optional[V], Optional[float]]:
+        value = self.get(key)
+        if value is None:
+            return None, None
+        return value, self._data[key][1]
+
+    def set(self, key: K, value: V, expires_at: Optional[float] = None) -> None:
+        if self._ttl is not None:
+            ttl_expires_at = self._now() + self._ttl
+            expires_at = ttl_expires_at if expires_at is None else min(expires_at, ttl_expires_at)
+        if expires_at is not None and expires_at <= self._now():
+            self._data.pop(key, None)
+            return
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self._maxsize
+        }
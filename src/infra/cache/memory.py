@@ -0,0 +1,46 @@
+import time
+from typing import Optional, Callable
+
+from src.application.interfaces.cache import CacheInterface
+from .lru import LRUCache
+
+
+class MemoryCache(CacheInterface):
+    """
+    Cache of single process. Values are bytes, so they are effectively copied like in shared backend.
+    ttl bounds lifetime of all entries, including ones set without own ttl.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        clock: Optional[Callable[[], float]] = None
+    ):
+        self._clock = clock or time.time
+        self._lru: LRUCache[str, bytes] = LRUCache(maxsize, ttl=ttl, clock=self._clock)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._lru.get(key)
+
+    async def get_with_ttl(self, key: str) -> tuple[Optional[bytes], Optional[float]]:
+        value, expires_at = self._lru.get_with_expiration(key)
+        return value, None if expires_at is None else expires_at - self._clock()
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self._lru.set(key, value, expires_at=None if ttl is None else self._clock() + ttl)
+
+    async def delete(self, key: str) -> None:
+        self.evict(key)
+
+    def evict(self, key: str) -> None:
+        self._lru.delete(key)
+
+    def clear(self) -> None:
+        self._lru.clear()
+
+    async def close(self) -> None:
+        return None
+
+    def stats(self) -> dict[str, int]:
+        return self._lru.stats()
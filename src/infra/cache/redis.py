@@ -0,0 +1,88 @@
+import time
+from typing import Optional, Any, Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.application.interfaces.cache import CacheInterface, CacheUnavailableError
+from src.logger import logger
+
+
+class RedisCache(CacheInterface):
+    """
+    Cache shared by all workers and nodes using the same Redis. Failed reads and writes are logged and not raised:
+    while Redis is unavailable every read is a miss and requests are served from db. Failed delete raises
+    CacheUnavailableError, as lost deletion would leave stale value. After failure Redis is not contacted for
+    backoff seconds, so requests do not wait for its timeout.
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        prefix: str = "tracker:",
+        backoff: float = 1.0,
+        clock: Optional[Callable[[], float]] = None
+    ):
+        self._client = client
+        self._prefix = prefix
+        self._backoff = backoff
+        self._clock = clock or time.monotonic
+        self._retry_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.skipped = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value, _ = await self.get_with_ttl(key)
+        return value
+
+    async def get_with_ttl(self, key: str) -> tuple[Optional[bytes], Optional[float]]:
+        """Returns value with its remaining ttl in seconds (None if value does not expire) by one round trip"""
+        key = self._prefix + key
+        try:
+            value, pttl = await self._call(
+                "GET", lambda: self._client.pipeline(transaction=False).get(key).pttl(key).execute(), key
+            )
+        except CacheUnavailableError:
+            value, pttl = None, None
+        if value is None:
+            self.misses += 1
+            return None, None
+        self.hits += 1
+        # -1 means no expiration, -2 that key expired right after GET
+        return value, None if pttl == -1 else max(pttl, 0) / 1000
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if ttl is not None and ttl <= 0:
+            return
+        key = self._prefix + key
+        try:
+            await self._call(
+                "SET", lambda: self._client.set(key, value, px=None if ttl is None else max(int(ttl * 1000), 1)), key
+            )
+        except CacheUnavailableError:
+            pass
+
+    async def delete(self, key: str) -> None:
+        key = self._prefix + key
+        await self._call("DEL", lambda: self._client.delete(key), key)
+
+    async def _call(self, name: str, command: Callable[[], Any], key: str) -> Any:
+        wait = self._retry_at - self._clock()
+        if wait > 0:
+            self.skipped += 1
+            raise CacheUnavailableError(f"Cache server failed recently, next attempt in {wait:.2f}s")
+        try:
+            return await command()
+        except (RedisError, OSError) as e:
+            self.errors += 1
+            self._retry_at = self._clock() + self._backoff
+            logger.warning(f"Cache command {name} {key} failed: {e!r}")
+            raise CacheUnavailableError(f"Cache command {name} failed") from e
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors, "skipped": self.skipped}
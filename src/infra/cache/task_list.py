@@ -0,0 +1,82 @@
+import asyncio
+from uuid import uuid4
+from typing import Optional
+
+from src.application.interfaces.cache import CacheInterface, TaskListCacheInterface, CacheUnavailableError
+from src.application.dto.task import PaginatedTasksDTO
+from src.logger import logger
+
+# lists are neither read from cache nor stored while their invalidation is pending
+UNCACHED = ""
+
+
+class TaskListCache(TaskListCacheInterface):
+    """
+    Pages are kept in given cache, so with shared backend invalidation done by one worker is seen by all of them.
+    Invalidation deletes generation of user and the next read starts new random one, pages of the old one are
+    just left to expire. Generation lost by eviction or expiration is replaced the same way.
+    Failed deletion of generation is retried with backoff, then kept pending: it is retried on every following
+    access and until it succeeds lists of the user are not served from cache by this worker.
+    """
+
+    def __init__(self, cache: CacheInterface, ttl: Optional[float] = None, retries: int = 2, retry_delay: float = 0.05):
+        self._cache = cache
+        self._ttl = ttl
+        self._retries = retries
+        self._retry_delay = retry_delay
+        self._pending: set[int] = set()
+        self.failed_invalidations = 0
+
+    async def generation(self, user_id: int) -> str:
+        await self._retry_pending()
+        if user_id in self._pending:
+            return UNCACHED
+        generation = await self._cache.get(self._generation_key(user_id))
+        if generation is not None:
+            return generation.decode()
+        new_generation = uuid4().hex
+        await self._cache.set(self._generation_key(user_id), new_generation.encode(), self._ttl)
+        return new_generation
+
+    async def get(self, user_id: int, generation: str, key: tuple) -> Optional[PaginatedTasksDTO]:
+        if generation == UNCACHED:
+            return None
+        page = await self._cache.get(self._page_key(user_id, generation, key))
+        return None if page is None else PaginatedTasksDTO.model_validate_json(page)
+
+    async def set(self, user_id: int, generation: str, key: tuple, page: PaginatedTasksDTO) -> None:
+        if generation == UNCACHED:
+            return
+        await self._cache.set(self._page_key(user_id, generation, key), page.model_dump_json().encode(), self._ttl)
+
+    async def invalidate(self, user_id: int) -> None:
+        for attempt in range(self._retries + 1):
+            if attempt:
+                await asyncio.sleep(self._retry_delay * 2 ** (attempt - 1))
+            try:
+                await self._cache.delete(self._generation_key(user_id))
+            except CacheUnavailableError as e:
+                error = e
+            else:
+                self._pending.discard(user_id)
+                return
+        self._pending.add(user_id)
+        self.failed_invalidations += 1
+        logger.error(f"Unable to invalidate task lists of user {user_id}, kept pending: {error!r}")
+
+    async def _retry_pending(self) -> None:
+        for user_id in list(self._pending):
+            try:
+                await self._cache.delete(self._generation_key(user_id))
+            except CacheUnavailableError:
+                return
+            self._pending.discard(user_id)
+
+    def stats(self) -> dict[str, int]:
+        return {"failed_invalidations": self.failed_invalidations, "pending_invalidations": len(self._pending)}
+
+    def _generation_key(self, user_id: int) -> str:
+        return f"task_lists:{user_id}"
+
+    def _page_key(self, user_id: int, generation: str, key: tuple) -> str:
+        return f"task_lists:{user_id}:{generation}:{':'.join(map(str, key))}"
@@ -0,0 +1,90 @@
+from typing import Optional
+
+from src.application.interfaces.cache import CacheInterface
+from src.logger import logger
+from .memory import MemoryCache
+from .redis import RedisCache
+from .bus import PgInvalidationBus
+
+
+class TwoTierCache(CacheInterface):
+    """
+    Local cache of process in front of optional shared one. Deleted keys are broadcast by bus and every worker
+    evicts them from own local cache. While bus is disconnected evictions could be missed, so local cache is
+    bypassed. Value read from shared cache is copied to local one with its remaining ttl, so copy never outlives
+    original even if broadcast of its deletion is lost. It is not copied at all if anything was evicted during the
+    read, otherwise value deleted meanwhile could stay in local cache.
+    """
+
+    def __init__(
+        self,
+        local: MemoryCache,
+        shared: Optional[RedisCache] = None,
+        bus: Optional[PgInvalidationBus] = None
+    ):
+        self._local = local
+        self._shared = shared
+        self._bus = bus
+        self._evictions = 0
+        self.bypassed = 0
+        self.publish_errors = 0
+        if bus is not None:
+            bus.subscribe(self._evict, self._reset)
+
+    def _use_local(self) -> bool:
+        if self._bus is None or self._bus.connected:
+            return True
+        self.bypassed += 1
+        return False
+
+    async def get(self, key: str) -> Optional[bytes]:
+        use_local = self._use_local()
+        if use_local:
+            value = await self._local.get(key)
+            if value is not None:
+                return value
+        if self._shared is None:
+            return None
+        evictions = self._evictions
+        value, ttl = await self._shared.get_with_ttl(key)
+        if value is not None and use_local and evictions == self._evictions:
+            await self._local.set(key, value, ttl)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if self._use_local():
+            await self._local.set(key, value, ttl)
+        if self._shared is not None:
+            await self._shared.set(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self._evict(key)
+        try:
+            if self._shared is not None:
+                await self._shared.delete(key)
+        finally:
+            # local copies of other workers are evicted even if shared value could not be deleted
+            if self._bus is not None:
+                try:
+                    await self._bus.publish(key)
+                except Exception as e:
+                    self.publish_errors += 1
+                    logger.error(f"Unable to broadcast eviction of cache key {key}: {e!r}")
+
+    def _evict(self, key: str) -> None:
+        self._evictions += 1
+        self._local.evict(key)
+
+    def _reset(self) -> None:
+        self._evictions += 1
+        self._local.clear()
+
+    async def close(self) -> None:
+        if self._shared is not None:
+            await self._shared.close()
+
+    def stats(self) -> dict:
+        stats = {"local": self._local.stats(), "bypassed": self.bypassed, "publish_errors": self.publish_errors}
+        if self._shared is not None:
+            stats["shared"] = self._shared.stats()
+        return stats
@@ -1,3 +1,5 @@
+from typing import Optional, Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -6,6 +8,21 @@ class DBConfig(BaseSettings):
     postgres_db: str
     postgres_password: str
     postgres_host: str
+    request_transaction: bool = False
+    replica_urls: list[str] = []
+    read_your_writes_window: float = 5
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_pre_ping: bool = False
+    pool_recycle: int = -1
+    statement_cache_size: int = 100
+    command_timeout: Optional[float] = None
+    pgbouncer: bool = False
+    task_tree_storage: Literal["path", "closure"] = "path"
+    deferred_task_deletion: bool = False
+    purge_batch_size: int = 500
+    purge_interval: float = 5
 
     @property
     def conn_url(self):
@@ -18,3 +35,14 @@ class DBConfig(BaseSettings):
 
 class AppConfig(BaseSettings):
     secret: str
+    stateless_auth: bool = False
+    token_cache_size: int = 1024
+    cache_url: Optional[str] = None
+    cache_size: int = 8192
+    local_cache_ttl: Optional[float] = None
+    cache_invalidation_bus: bool = False
+    cache_bus_url: Optional[str] = None
+    identity_cache_ttl: int = 3600
+    max_page_size: int = 100
+    task_list_cache_ttl: int = 60
+    metrics_token: Optional[str] = None
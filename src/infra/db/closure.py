@@ -0,0 +1,72 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+
+from src.infra.configs import DBConfig
+from src.infra.db.tables.task_closure import CLOSURE_INSERT_TRIGGER, CLOSURE_UPDATE_TRIGGER, FILL_CLOSURE
+from src.logger import logger
+
+
+async def task_closure_enabled(conn: AsyncConnection) -> bool:
+    """Whether task_closure is maintained by triggers"""
+    return bool(await conn.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = 'tasks'::regclass AND tgname = 'tasks_closure_insert')"
+    )))
+
+
+async def enable_task_closure(conn: AsyncConnection) -> bool:
+    """Installs closure triggers and fills task_closure from parent links. Returns False if already enabled"""
+    # tasks are neither inserted nor moved until closure is filled
+    await conn.execute(text("LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE"))
+    if await task_closure_enabled(conn):
+        return False
+    for statement in (CLOSURE_INSERT_TRIGGER, CLOSURE_UPDATE_TRIGGER, FILL_CLOSURE):
+        await conn.execute(text(statement))
+    return True
+
+
+async def disable_task_closure(conn: AsyncConnection) -> bool:
+    """Drops closure triggers and empties task_closure. Returns False if already disabled"""
+    await conn.execute(text("LOCK TABLE tasks IN SHARE ROW EXCLUSIVE MODE"))
+    if not await task_closure_enabled(conn):
+        return False
+    for statement in (
+        "DROP TRIGGER tasks_closure_insert ON tasks",
+        "DROP TRIGGER tasks_closure_update ON tasks",
+        "TRUNCATE task_closure"
+    ):
+        await conn.execute(text(statement))
+    return True
+
+
+async def check_task_closure(engine: AsyncEngine, config: DBConfig) -> None:
+    """Refuses closure storage while task_closure is not maintained, warns if it is maintained for nothing"""
+    async with engine.connect() as conn:
+        enabled = await task_closure_enabled(conn)
+    if config.task_tree_storage == "closure" and not enabled:
+        raise RuntimeError(
+            "TASK_TREE_STORAGE is closure, but task_closure is not maintained: run python -m src.infra.db.closure"
+        )
+    if config.task_tree_storage != "closure" and enabled:
+        logger.warning("task_closure is maintained but not used: run python -m src.infra.db.closure to stop it")
+
+
+async def main() -> None:
+    """Enables maintenance of task_closure for closure storage and disables it for path storage"""
+    config = DBConfig()  # type: ignore
+    engine = create_async_engine(config.conn_url)
+    try:
+        async with engine.begin() as conn:
+            if config.task_tree_storage == "closure":
+                changed = await enable_task_closure(conn)
+            else:
+                changed = await disable_task_closure(conn)
+        state = "enabled" if config.task_tree_storage == "closure" else "disabled"
+        logger.info(f"Task closure {state}" if changed else f"Task closure is already {state}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.infra.repository import AlchemyTaskRepository
+from src.infra.configs import DBConfig
+from src.logger import logger
+
+
+class CounterRepair:
+    """Recomputes stored counters of all tasks by batches, each in own short transaction"""
+
+    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession], batch_size: int = 1000):
+        self._sessionmaker = sessionmaker
+        self._batch_size = batch_size
+
+    async def repair(self) -> int:
+        """Returns number of tasks whose counters were fixed"""
+        after_id, fixed = 0, 0
+        while True:
+            async with self._sessionmaker() as session:
+                async with session.begin():
+                    last_id, batch_fixed = await AlchemyTaskRepository(session).recount_counters(
+                        after_id, self._batch_size
+                    )
+            if last_id is None:
+                return fixed
+            after_id, fixed = last_id, fixed + batch_fixed
+
+
+async def main() -> None:
+    from src.app import map_tables
+    map_tables()
+    engine = create_async_engine(DBConfig().conn_url)  # type: ignore
+    try:
+        fixed = await CounterRepair(async_sessionmaker(engine)).repair()
+        logger.info(f"Counters of {fixed} tasks fixed")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
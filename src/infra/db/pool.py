@@ -0,0 +1,36 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.infra.metrics import Distribution
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Measures time spent waiting for connection on checkout and counts checkout timeouts"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waits = Distribution()
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waits.observe(time.perf_counter() - start)
+
+    def stats(self) -> dict:
+        capacity = self.size() + max(self._max_overflow, 0)
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "saturation": self.checkedout() / capacity if capacity else 0.0,
+            "timeouts": self.timeouts,
+            "wait": self.waits.stats()
+        }
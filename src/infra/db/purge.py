@@ -0,0 +1,51 @@
+import asyncio
+from time import perf_counter
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.infra.repository import AlchemyTaskRepository
+from src.infra.metrics import Distribution
+from src.logger import logger
+
+
+class TombstonePurger:
+    """
+    Physically deletes tasks hidden by deferred deletion. Each batch is deleted in own short transaction,
+    so row locks are held only for one batch at a time.
+    """
+
+    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession], batch_size: int, interval: float):
+        self._sessionmaker = sessionmaker
+        self._batch_size = batch_size
+        self._interval = interval
+        self.purged = 0
+        self.batches = Distribution()
+
+    async def purge_batch(self) -> int:
+        start = perf_counter()
+        async with self._sessionmaker() as session:
+            async with session.begin():
+                purged = await AlchemyTaskRepository(session).purge_deleted(self._batch_size)
+        self.batches.observe(perf_counter() - start)
+        self.purged += purged
+        return purged
+
+    async def purge(self) -> int:
+        """Purges batches until nothing is left"""
+        total = 0
+        while True:
+            purged = await self.purge_batch()
+            total += purged
+            if purged < self._batch_size:
+                return total
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.purge()
+            except Exception:
+                logger.exception("Unable to purge deleted tasks")
+            await asyncio.sleep(self._interval)
+
+    def stats(self) -> dict:
+        return {"purged": self.purged, "batch_duration": self.batches.stats()}
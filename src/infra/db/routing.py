@@ -0,0 +1,62 @@
+import random
+from typing import Sequence, Optional
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from src.application.interfaces.cache import CacheInterface
+
+USE_REPLICA = "use_replica"
+AUTOCOMMIT = "autocommit"
+
+
+class RoutingSession(Session):
+    """
+    Sends statements to replica while USE_REPLICA flag is set in session info, otherwise to primary.
+    Replica is chosen once per session so all reads of request go to the same replica. While AUTOCOMMIT flag is
+    set connection is taken in autocommit mode. Bind is resolved only by the first statement, so flags cost
+    nothing until db is really queried.
+    """
+
+    def __init__(self, *args, replicas: Sequence[Engine] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self._replica: Optional[Engine] = random.choice(replicas) if replicas else None
+        # session keeps connection per bind, so the same autocommit engine must be returned each time
+        self._autocommit: dict[Engine, Engine] = {}
+
+    @property
+    def has_replica(self) -> bool:
+        return self._replica is not None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._replica is not None and self.info.get(USE_REPLICA):
+            bind = self._replica
+        else:
+            bind = super().get_bind(mapper, clause=clause, **kw)
+        if self.info.get(AUTOCOMMIT) and isinstance(bind, Engine):
+            if bind not in self._autocommit:
+                self._autocommit[bind] = bind.execution_options(isolation_level="AUTOCOMMIT")
+            return self._autocommit[bind]
+        return bind
+
+
+class PrimaryPins:
+    """
+    Remembers clients who wrote recently so their reads are served by primary until replicas catch up.
+    Pins are kept in cache, so with shared cache a write pins client on every worker, not only on the one which
+    served it.
+    """
+
+    def __init__(self, cache: CacheInterface, window: float):
+        self._cache = cache
+        self._window = window
+
+    async def pin(self, key: str) -> None:
+        await self._cache.set(self._key(key), b"1", self._window)
+
+    async def is_pinned(self, key: str) -> bool:
+        return await self._cache.get(self._key(key)) is not None
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return f"pin:{key}"
@@ -1,3 +1,4 @@
 from .tasks import tasks
+from .task_closure import task_closure
 from .users import users
 from .base import metadata
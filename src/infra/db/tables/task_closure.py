@@ -0,0 +1,69 @@
+from sqlalchemy import (
+    Table, Column, Integer,
+    ForeignKey, Index, DDL,
+    event
+)
+from .base import metadata
+
+
+# pair for each task and each of its ancestors including itself with depth 0
+task_closure = Table(
+    "task_closure", metadata,
+    Column("ancestor_id", ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True),
+    Column("descendant_id", ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True),
+    Column("depth", Integer, nullable=False)
+)
+Index("ix_task_closure_descendant_id", task_closure.c.descendant_id, task_closure.c.depth)
+
+# kept in sync by db itself while triggers are installed, deletion is done by cascade. Triggers are installed and
+# table is filled only for closure storage (see src.infra.db.closure), so writes do not pay for both encodings
+MAINTAIN_CLOSURE_FUNCTION = """
+CREATE OR REPLACE FUNCTION maintain_task_closure() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        -- detach subtree of moved task from its old ancestors
+        DELETE FROM task_closure
+        WHERE descendant_id IN (SELECT descendant_id FROM task_closure WHERE ancestor_id = NEW.id)
+          AND ancestor_id IN (SELECT ancestor_id FROM task_closure WHERE descendant_id = NEW.id AND depth > 0);
+    ELSE
+        INSERT INTO task_closure (ancestor_id, descendant_id, depth) VALUES (NEW.id, NEW.id, 0);
+    END IF;
+    IF NEW.parent_id IS NOT NULL THEN
+        -- attach subtree to ancestors of new parent
+        INSERT INTO task_closure (ancestor_id, descendant_id, depth)
+        SELECT sup.ancestor_id, sub.descendant_id, sup.depth + sub.depth + 1
+        FROM task_closure sup, task_closure sub
+        WHERE sup.descendant_id = NEW.parent_id AND sub.ancestor_id = NEW.id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+CLOSURE_INSERT_TRIGGER = """
+CREATE TRIGGER tasks_closure_insert AFTER INSERT ON tasks
+FOR EACH ROW EXECUTE FUNCTION maintain_task_closure()
+"""
+CLOSURE_UPDATE_TRIGGER = """
+CREATE TRIGGER tasks_closure_update AFTER UPDATE OF parent_id ON tasks
+FOR EACH ROW WHEN (OLD.parent_id IS DISTINCT FROM NEW.parent_id) EXECUTE FUNCTION maintain_task_closure()
+"""
+
+FILL_CLOSURE = """
+WITH RECURSIVE closure AS (
+    SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth
+    FROM tasks
+    UNION ALL
+    SELECT closure.ancestor_id, t.id, closure.depth + 1
+    FROM tasks t
+    INNER JOIN closure ON t.parent_id = closure.descendant_id
+)
+INSERT INTO task_closure (ancestor_id, descendant_id, depth)
+SELECT ancestor_id, descendant_id, depth FROM closure
+"""
+
+event.listen(task_closure, "after_create", DDL(MAINTAIN_CLOSURE_FUNCTION).execute_if(dialect="postgresql"))
+event.listen(
+    task_closure,
+    "before_drop",
+    DDL("DROP FUNCTION IF EXISTS maintain_task_closure() CASCADE").execute_if(dialect="postgresql")
+)
@@ -1,7 +1,10 @@
 from sqlalchemy import (
-    Table, Column, String,
-    ForeignKey, DateTime
+    Table, Column, String, Integer,
+    ForeignKey, DateTime, Index,
+    CheckConstraint, DDL, text,
+    event
 )
+from src.domain.services import MAX_DEPTH
 from .base import metadata, id_
 
 
@@ -14,5 +17,122 @@ tasks = Table(
     Column("user_id", ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
     Column("creation_date", DateTime(timezone=True), nullable=False),
     Column("pass_date", DateTime(timezone=True), nullable=True),
-    Column("parent_id", ForeignKey("tasks.id", ondelete="CASCADE"), nullable=True)
+    Column("parent_id", ForeignKey("tasks.id", ondelete="CASCADE"), nullable=True),
+    # ids of ancestors from root, each followed by dot ("" for root, "1.5." for child of task 5 under root 1).
+    # Bytewise collation makes subtree a contiguous range of index
+    Column("path", String(collation="C"), nullable=False, server_default=""),
+    # level of task in tree, 1 for root. Kept equal to number of ancestors in path + 1
+    Column("depth", Integer, nullable=False, server_default="1"),
+    # set when task is deleted in deferred mode, such tasks are hidden and purged by background worker
+    Column("deleted_at", DateTime(timezone=True), nullable=True),
+    # counters of not deleted tasks: unfinished children, all descendants and finished descendants.
+    # Kept by db itself, so task knows whether it can be finished and progress of its subtree
+    Column("open_children", Integer, nullable=False, server_default="0"),
+    Column("descendants", Integer, nullable=False, server_default="0"),
+    Column("finished_descendants", Integer, nullable=False, server_default="0"),
+    CheckConstraint(f"depth BETWEEN 1 AND {MAX_DEPTH}", name="ck_tasks_depth_range"),
+    CheckConstraint("depth = length(path) - length(replace(path, '.', '')) + 1", name="ck_tasks_depth_path")
+)
+
+# pages of root tasks of user by status
+Index(
+    "ix_tasks_user_id_active_roots",
+    tasks.c.user_id, tasks.c.creation_date.desc(), tasks.c.id.desc(),
+    postgresql_where=text("parent_id IS NULL AND pass_date IS NULL")
+)
+Index(
+    "ix_tasks_user_id_finished_roots",
+    tasks.c.user_id, tasks.c.creation_date.desc(), tasks.c.id.desc(),
+    postgresql_where=text("parent_id IS NULL AND pass_date IS NOT NULL")
+)
+# pages of subtasks, walking down the tree and cascade deletes
+Index("ix_tasks_parent_id_creation_date", tasks.c.parent_id, tasks.c.creation_date.desc(), tasks.c.id.desc())
+# subtree lookups
+Index("ix_tasks_path", tasks.c.path)
+# deferred deletion, deepest tasks are purged first
+Index("ix_tasks_tombstones", tasks.c.depth.desc(), tasks.c.id, postgresql_where=text("deleted_at IS NOT NULL"))
+
+# statement level, so bulk changes of subtree update each ancestor once
+MAINTAIN_COUNTERS_FUNCTION = """
+CREATE OR REPLACE FUNCTION maintain_task_counters() RETURNS trigger AS $$
+DECLARE
+    changes text;
+    ids int[];
+    total_deltas int[];
+    finished_deltas int[];
+    open_deltas int[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        changes := 'SELECT path, parent_id, pass_date, deleted_at, 1 AS sign FROM new_rows';
+    ELSIF TG_OP = 'DELETE' THEN
+        changes := 'SELECT path, parent_id, pass_date, deleted_at, -1 AS sign FROM old_rows';
+    ELSE
+        -- updates of counters themselves by this function stop here
+        IF NOT EXISTS (
+            SELECT 1 FROM new_rows n JOIN old_rows o USING (id)
+            WHERE n.pass_date IS DISTINCT FROM o.pass_date OR n.deleted_at IS DISTINCT FROM o.deleted_at
+        ) THEN
+            RETURN NULL;
+        END IF;
+        changes := 'SELECT path, parent_id, pass_date, deleted_at, 1 AS sign FROM new_rows '
+            || 'UNION ALL SELECT path, parent_id, pass_date, deleted_at, -1 FROM old_rows';
+    END IF;
+    EXECUTE 'WITH changes AS (' || changes || ')' || $sql$,
+        deltas AS (
+            SELECT unnest(string_to_array(rtrim(path, '.'), '.')::int[]) AS id, sign AS total,
+                CASE WHEN pass_date IS NULL THEN 0 ELSE sign END AS finished, 0 AS open
+            FROM changes
+            WHERE deleted_at IS NULL AND path != ''
+            UNION ALL
+            SELECT parent_id, 0, 0, sign
+            FROM changes
+            WHERE deleted_at IS NULL AND pass_date IS NULL AND parent_id IS NOT NULL
+        ),
+        sums AS (
+            SELECT id, sum(total)::int AS total, sum(finished)::int AS finished, sum(open)::int AS open
+            FROM deltas
+            GROUP BY id
+            HAVING sum(total) != 0 OR sum(finished) != 0 OR sum(open) != 0
+        )
+        SELECT array_agg(id ORDER BY id DESC), array_agg(total ORDER BY id DESC),
+            array_agg(finished ORDER BY id DESC), array_agg(open ORDER BY id DESC)
+        FROM sums
+    $sql$ INTO ids, total_deltas, finished_deltas, open_deltas;
+    IF ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+    -- rows are locked in fixed order before update, so concurrent statements do not deadlock on common ancestors.
+    -- Deepest first: ancestor is inserted before its descendants and so has smaller id, while rows of subtree
+    -- changed by statement itself are already locked. Lock is the one taken by UPDATE, so that inserts of
+    -- children (foreign key checks) are not blocked
+    PERFORM 1 FROM tasks WHERE id = ANY(ids) ORDER BY id DESC FOR NO KEY UPDATE;
+    UPDATE tasks
+    SET descendants = descendants + d.total,
+        finished_descendants = finished_descendants + d.finished,
+        open_children = open_children + d.open
+    FROM unnest(ids, total_deltas, finished_deltas, open_deltas) AS d(id, total, finished, open)
+    WHERE tasks.id = d.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+COUNTERS_INSERT_TRIGGER = """
+CREATE TRIGGER tasks_counters_insert AFTER INSERT ON tasks
+REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_counters()
+"""
+COUNTERS_UPDATE_TRIGGER = """
+CREATE TRIGGER tasks_counters_update AFTER UPDATE ON tasks
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_counters()
+"""
+COUNTERS_DELETE_TRIGGER = """
+CREATE TRIGGER tasks_counters_delete AFTER DELETE ON tasks
+REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION maintain_task_counters()
+"""
+
+for ddl in (MAINTAIN_COUNTERS_FUNCTION, COUNTERS_INSERT_TRIGGER, COUNTERS_UPDATE_TRIGGER, COUNTERS_DELETE_TRIGGER):
+    event.listen(tasks, "after_create", DDL(ddl).execute_if(dialect="postgresql"))
+event.listen(
+    tasks,
+    "before_drop",
+    DDL("DROP FUNCTION IF EXISTS maintain_task_counters() CASCADE").execute_if(dialect="postgresql")
 )
@@ -0,0 +1,10 @@
+from src.domain.entities import Task
+
+
+def child_path(parent: Task) -> str:
+    return f"{parent.path}{parent.id}."  # type: ignore
+
+
+def set_task_path(mapper, connection, target: Task) -> None:
+    """Path is derived from parent once at insert, tasks are never moved between parents"""
+    target.path = child_path(target.parent) if target.parent is not None else ""  # type: ignore
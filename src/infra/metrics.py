@@ -0,0 +1,41 @@
+from typing import Callable, Any
+
+
+class Distribution:
+    """Aggregates observed values without keeping them"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max
+        }
+
+
+class MetricsRegistry:
+    """
+    In-process registry of metric sources. Each source is a callable returning a dict of current values,
+    so components keep their own counters and the registry only collects them on demand.
+    """
+
+    def __init__(self):
+        self._sources: dict[str, Callable[[], dict[str, Any]]] = {}
+
+    def register(self, name: str, source: Callable[[], dict[str, Any]]) -> None:
+        self._sources[name] = source
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {name: source() for name, source in self._sources.items()}
+
+
+metrics = MetricsRegistry()
@@ -1,2 +1,2 @@
-from .task import AlchemyTaskRepository
-from .user import AlchemyUserRepository
+from .task import AlchemyTaskRepository, ClosureTaskRepository
+from .user import AlchemyUserRepository, CachedUserRepository
@@ -1,45 +1,180 @@
-from typing import Optional, Literal
+from typing import Optional, Literal, AsyncIterator, Iterable
+from datetime import datetime
+from collections import defaultdict
 
-from sqlalchemy import select, delete, desc, text
-from sqlalchemy.orm import selectinload, aliased
+from sqlalchemy import select, update, delete, desc, exists, tuple_, func, true, cast, and_, or_, any_, String, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.domain.entities import Task
-from src.domain.services import MAX_DEPTH
-from src.application.interfaces.repositories import TaskRepositoryInterface
-from src.logger import logger
+from src.domain.entities import Task, User
+from src.domain.services import DeadlineBounds
+from src.infra.db.tables import task_closure
+from src.application.interfaces.repositories import TaskRepositoryInterface, TOTAL_COUNT_LIMIT
+
+
+STREAM_BATCH_SIZE = 500
 
 
 class AlchemyTaskRepository(TaskRepositoryInterface):
     def __init__(self, session: AsyncSession):
         self._session = session
 
+    def _alive(self, of=Task):
+        """Tasks deleted in deferred mode stay in table until purged, but are invisible to all queries"""
+        return of.deleted_at == None  # type: ignore
+
     async def get_by_id(self, task_id: int) -> Optional[Task]:
-        return await self._session.scalar(select(Task).where(Task.id == task_id))  # type: ignore
+        return await self._session.scalar(select(Task).where(Task.id == task_id, self._alive()))  # type: ignore
 
-    async def get_with_parents(self, task_id: int) -> Task:
+    async def get_owner_id(self, task_id: int) -> Optional[int]:
         return await self._session.scalar(
-            select(Task).where(Task.id == task_id).options(  # type: ignore
-                selectinload(Task.parent, recursion_depth=MAX_DEPTH-1)  # type: ignore
-            )
+            select(Task.user_id).where(Task.id == task_id, self._alive())  # type: ignore
         )
 
-    async def get_with_parent_and_subs(self, task_id: int) -> Task:
-        return await self._session.scalar(
-            select(Task).where(Task.id == task_id).options(  # type: ignore
-                selectinload(Task.parent),  # type: ignore
-                selectinload(Task.subtasks, recursion_depth=MAX_DEPTH-1)  # type: ignore
-            )
+    async def get_user_and_owner_ids(self, tg_name: str, task_id: int) -> Optional[tuple[int, Optional[int]]]:
+        row = (await self._session.execute(
+            select(User.id, Task.user_id)  # type: ignore
+            .select_from(User)
+            .outerjoin(Task, and_(Task.id == task_id, self._alive()))  # type: ignore
+            .where(User.tg_name == tg_name)  # type: ignore
+        )).first()
+        return (row[0], row[1]) if row else None
+
+    def _subtree_of(self, task_id: int, of=Task):
+        """
+        Descendants of task are tasks whose path starts with path of task followed by its id. Condition is set on
+        columns of the given entity, so it may be an alias of Task
+        """
+        prefix = Task.path + cast(Task.id, String)  # type: ignore
+        return and_(
+            of.path >= select(prefix + ".").where(Task.id == task_id).scalar_subquery(),  # type: ignore
+            # "/" follows "." in bytewise order, so this bounds all paths with the prefix
+            of.path < select(prefix + "/").where(Task.id == task_id).scalar_subquery()  # type: ignore
         )
 
+    def _ancestors_of(self, task_id: int):
+        path = select(Task.path).where(Task.id == task_id).scalar_subquery()  # type: ignore
+        return Task.id == any_(cast(func.string_to_array(func.rtrim(path, "."), "."), ARRAY(Integer)))  # type: ignore
+
+    def _link(self, tasks: Iterable[Task], task_id: int, with_subtree: bool) -> Optional[Task]:
+        """
+        Sets relationships of tasks loaded by single query. Subtasks are set only for the task and its descendants
+        if they were loaded, collections of ancestors stay unloaded as they are partial
+        """
+        by_id = {task.id: task for task in tasks}
+        children: defaultdict[int, list[Task]] = defaultdict(list)
+        for task in sorted(by_id.values(), key=lambda task: task.id):
+            if task.parent_id is None:
+                set_committed_value(task, "parent", None)
+            elif task.parent_id in by_id:
+                set_committed_value(task, "parent", by_id[task.parent_id])
+                children[task.parent_id].append(task)
+        root = by_id.get(task_id)
+        if root is not None and with_subtree:
+            stack = [root]
+            while stack:
+                current = stack.pop()
+                set_committed_value(current, "subtasks", children[current.id])
+                stack.extend(children[current.id])
+        return root
+
+    async def get_with_parents(self, task_id: int) -> Task:
+        res = await self._session.scalars(select(Task).where(
+            or_(Task.id == task_id, self._ancestors_of(task_id)),  # type: ignore
+            self._alive()
+        ))
+        return self._link(res.all(), task_id, with_subtree=False)  # type: ignore
+
+    async def get_with_parent_and_subs(self, task_id: int) -> Task:
+        res = await self._session.scalars(select(Task).where(
+            or_(
+                Task.id == task_id,  # type: ignore
+                Task.id == select(Task.parent_id).where(Task.id == task_id).scalar_subquery(),  # type: ignore
+                self._subtree_of(task_id)
+            ),
+            self._alive()
+        ))
+        return self._link(res.all(), task_id, with_subtree=True)  # type: ignore
+
+    async def get_deadline_bounds(self, task_id: int) -> DeadlineBounds:
+        parent, sub = aliased(Task), aliased(Task)
+        parent_id = select(Task.parent_id).where(Task.id == task_id).scalar_subquery()  # type: ignore
+        row = (await self._session.execute(select(
+            select(parent._deadline).where(parent.id == parent_id).scalar_subquery(),  # type: ignore
+            select(func.max(sub._deadline)).where(  # type: ignore
+                self._subtree_of(task_id, sub), self._alive(sub)
+            ).scalar_subquery()
+        ))).one()
+        return DeadlineBounds(parent_deadline=row[0], latest_subtask_deadline=row[1])
+
     def _pagination_query(self, page: int = 1, size: int = 5):
         return (
             select(Task)
             .offset((page - 1) * size)
             .limit(size + 1)
-            .order_by(desc(Task.creation_date))  # type: ignore
+            .order_by(desc(Task.creation_date), desc(Task.id))  # type: ignore
         )
 
+    def _keyset_query(self, key: Optional[tuple[datetime, int]], backward: bool, size: int):
+        query = select(Task).limit(size + 1)
+        position = tuple_(Task.creation_date, Task.id)  # type: ignore
+        if backward:
+            # preceding page is read in reversed order starting from key
+            query = query.order_by(Task.creation_date, Task.id)  # type: ignore
+            return query.where(position > key) if key else query
+        query = query.order_by(desc(Task.creation_date), desc(Task.id))  # type: ignore
+        return query.where(position < key) if key else query
+
+    def _tasks_filter(self, user_id: int, status: Literal["active", "finished"]) -> tuple:
+        return (
+            Task.user_id == user_id,
+            Task._pass_date == None if status == "active" else Task._pass_date != None,
+            Task.parent_id == None,
+            self._alive()
+        )
+
+    def _subtasks_filter(self, parent_id: int, status: Literal["active", "finished"]) -> tuple:
+        return (
+            Task.parent_id == parent_id,
+            Task._pass_date == None if status == "active" else Task._pass_date != None,  # type: ignore
+            self._alive()
+        )
+
+    async def _fetch_page(
+        self,
+        query,
+        conditions: tuple,
+        include_total: bool,
+        descending: bool = True
+    ) -> tuple[list[Task], Optional[int]]:
+        query = query.where(*conditions)
+        if not include_total:
+            return list((await self._session.scalars(query)).all()), None
+        # total is counted by the same statement. Page is outer joined to count so total comes even with empty page
+        counted = select(func.count().label("total")).select_from(
+            select(Task.id).where(*conditions).limit(TOTAL_COUNT_LIMIT + 1).subquery()  # type: ignore
+        ).subquery("counted")
+        page = query.subquery("page")
+        rows = (await self._session.execute(
+            select(aliased(Task, page), counted.c.total).select_from(counted).outerjoin(page, true())
+        )).all()
+        # join does not keep order of page
+        tasks = sorted(
+            (task for task, _ in rows if task is not None),
+            key=lambda task: (task.creation_date, task.id),
+            reverse=descending
+        )
+        return tasks, rows[0].total
+
+    def _build_keyset_result(self, tasks: list[Task], key: Optional[tuple[datetime, int]], backward: bool, size: int):
+        has_more = len(tasks) > size
+        tasks = tasks[:size]
+        if backward:
+            return has_more, key is not None, tasks[::-1]
+        return key is not None, has_more, tasks
+
     def _build_paginated_result(self, tasks: list[Task], page: int, size: int):
         has_next = len(tasks) > size
         return page - 1 if page > 1 and tasks else 0, page + 1 if has_next else 0, tasks[:-1] if has_next else tasks
@@ -49,62 +184,209 @@ class AlchemyTaskRepository(TaskRepositoryInterface):
         user_id: int,
         status: Literal["active", "finished"],
         page: int = 1,
-        size: int = 5
-    ) -> tuple[int, int, list[Task]]:
-        res = await self._session.scalars(self._pagination_query(page, size).where(
-            Task.user_id == user_id,
-            Task._pass_date == None if status == "active" else Task._pass_date != None,
-            Task.parent_id == None
-        ))
-        return self._build_paginated_result(res.all(), page, size)
+        size: int = 5,
+        include_total: bool = False
+    ) -> tuple[int, int, list[Task], Optional[int]]:
+        tasks, total = await self._fetch_page(
+            self._pagination_query(page, size), self._tasks_filter(user_id, status), include_total
+        )
+        return *self._build_paginated_result(tasks, page, size), total
 
     async def get_subtasks(
         self,
         parent_id: int,
         status: Literal["active", "finished"],
         page: int = 1,
-        size: int = 5
-    ) -> tuple[int, int, list[Task]]:
-        res = await self._session.scalars(self._pagination_query(page, size).where(
-            Task.parent_id == parent_id,
-            Task._pass_date == None if status == "active" else Task._pass_date != None  # type: ignore
-        ))
-        return self._build_paginated_result(res.all(), page, size)  # type: ignore
+        size: int = 5,
+        include_total: bool = False
+    ) -> tuple[int, int, list[Task], Optional[int]]:
+        tasks, total = await self._fetch_page(
+            self._pagination_query(page, size), self._subtasks_filter(parent_id, status), include_total
+        )
+        return *self._build_paginated_result(tasks, page, size), total
 
-    async def get_task_with_subtasks(self, from_task_id: int) -> Task:
-        return await self._session.scalar(
-            select(Task).where(Task.id == from_task_id).options(  # type: ignore
-                selectinload(Task.subtasks)  # type: ignore
-            )
+    async def get_tasks_by_cursor(
+        self,
+        user_id: int,
+        status: Literal["active", "finished"],
+        key: Optional[tuple[datetime, int]] = None,
+        backward: bool = False,
+        size: int = 5,
+        include_total: bool = False
+    ) -> tuple[bool, bool, list[Task], Optional[int]]:
+        tasks, total = await self._fetch_page(
+            self._keyset_query(key, backward, size),
+            self._tasks_filter(user_id, status),
+            include_total,
+            descending=not backward
+        )
+        return *self._build_keyset_result(tasks, key, backward, size), total
+
+    async def get_subtasks_by_cursor(
+        self,
+        parent_id: int,
+        status: Literal["active", "finished"],
+        key: Optional[tuple[datetime, int]] = None,
+        backward: bool = False,
+        size: int = 5,
+        include_total: bool = False
+    ) -> tuple[bool, bool, list[Task], Optional[int]]:
+        tasks, total = await self._fetch_page(
+            self._keyset_query(key, backward, size),
+            self._subtasks_filter(parent_id, status),
+            include_total,
+            descending=not backward
         )
+        return *self._build_keyset_result(tasks, key, backward, size), total
+
+    async def _stream(self, query, limit: Optional[int]) -> AsyncIterator[Task]:
+        query = query.order_by(desc(Task.creation_date), desc(Task.id)).limit(limit)  # type: ignore
+        # server side cursor, only one batch is kept in memory. Session keeps weak refs to yielded tasks
+        res = await self._session.stream_scalars(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for task in res:
+            yield task
+
+    def stream_tasks(
+        self,
+        user_id: int,
+        status: Literal["active", "finished"],
+        limit: Optional[int] = None
+    ) -> AsyncIterator[Task]:
+        return self._stream(select(Task).where(*self._tasks_filter(user_id, status)), limit)
+
+    def stream_subtasks(
+        self,
+        parent_id: int,
+        status: Literal["active", "finished"],
+        limit: Optional[int] = None
+    ) -> AsyncIterator[Task]:
+        return self._stream(select(Task).where(*self._subtasks_filter(parent_id, status)), limit)
 
     async def get_task_tree(self, from_task_id: int) -> Task:
-        return await self._session.scalar(
-            select(Task).where(Task.id == from_task_id).options(  # type: ignore
-                selectinload(Task.subtasks, recursion_depth=MAX_DEPTH-1)  # type: ignore
+        res = await self._session.scalars(select(Task).where(
+            or_(Task.id == from_task_id, self._subtree_of(from_task_id)),  # type: ignore
+            self._alive()
+        ))
+        return self._link(res.all(), from_task_id, with_subtree=True)  # type: ignore
+
+    async def finish_subtree(self, task_id: int) -> list[int]:
+        # subtree is marked only while the task itself is unfinished
+        root = aliased(Task)
+        res = await self._session.scalars(
+            update(Task)
+            .where(
+                or_(Task.id == task_id, self._subtree_of(task_id)),  # type: ignore
+                Task._pass_date == None,
+                self._alive(),
+                exists().where(root.id == task_id, root._pass_date == None, self._alive(root))  # type: ignore
             )
+            .values(_pass_date=func.now())
+            .returning(Task.id)  # type: ignore
+            .execution_options(synchronize_session=False)
+        )
+        return sorted(res.all())
+
+    async def recount_counters(self, after_id: int, batch_size: int) -> tuple[Optional[int], int]:
+        """
+        Recomputes stored counters of batch of tasks following after_id from their subtrees. Returns id of the last
+        task of batch (None if there are no more tasks) and number of tasks whose counters were wrong
+        """
+        batch = list((await self._session.scalars(
+            select(Task.id).where(Task.id > after_id).order_by(Task.id).limit(batch_size)  # type: ignore
+        )).all())
+        if not batch:
+            return None, 0
+        sub = aliased(Task)
+        prefix = Task.path + cast(Task.id, String)  # type: ignore
+        in_subtree = (sub.path >= prefix + ".", sub.path < prefix + "/", self._alive(sub))  # type: ignore
+        counters = (
+            select(func.count()).where(
+                sub.parent_id == Task.id, sub._pass_date == None, self._alive(sub)  # type: ignore
+            ).scalar_subquery(),
+            select(func.count()).where(*in_subtree).scalar_subquery(),
+            select(func.count()).where(*in_subtree, sub._pass_date != None).scalar_subquery()  # type: ignore
         )
+        stored = (Task.open_children, Task.descendants, Task.finished_descendants)  # type: ignore
+        res = await self._session.execute(
+            update(Task)
+            .where(Task.id.in_(batch), tuple_(*stored).is_distinct_from(tuple_(*counters)))  # type: ignore
+            .values(dict(zip(("open_children", "descendants", "finished_descendants"), counters)))
+            .execution_options(synchronize_session=False)
+        )
+        return batch[-1], res.rowcount  # type: ignore
+
+    def _top_down_ids(self, rows, task_id: int) -> list[int]:
+        return [row.id for row in sorted(rows, key=lambda row: (row.depth, row.id)) if row.id != task_id]
+
+    async def delete_task(self, task_id: int) -> list[int]:
+        # descendants are deleted explicitly rather than by cascade, so RETURNING reports them too
+        rows = (await self._session.execute(
+            delete(Task)
+            .where(or_(Task.id == task_id, self._subtree_of(task_id)))  # type: ignore
+            .returning(Task.id, Task.depth)  # type: ignore
+            .execution_options(synchronize_session=False)
+        )).all()
+        return self._top_down_ids(rows, task_id)
 
-    async def delete_task(self, task_id: int) -> None:
-        return await self._session.execute(delete(Task).where(Task.id == task_id))  # type: ignore
+    async def tombstone_task(self, task_id: int) -> list[int]:
+        rows = (await self._session.execute(
+            update(Task)
+            .where(or_(Task.id == task_id, self._subtree_of(task_id)), self._alive())  # type: ignore
+            .values(deleted_at=func.now())
+            .returning(Task.id, Task.depth)  # type: ignore
+            .execution_options(synchronize_session=False)
+        )).all()
+        return self._top_down_ids(rows, task_id)
+
+    async def purge_deleted(self, batch_size: int) -> int:
+        # deepest first, so cascade from purged task never reaches many rows. Batches taken by other
+        # workers are skipped
+        batch = (
+            select(Task.id)
+            .where(Task.deleted_at != None)  # type: ignore
+            .order_by(desc(Task.depth), Task.id)  # type: ignore
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        res = await self._session.execute(
+            delete(Task).where(Task.id.in_(batch)).execution_options(synchronize_session=False)  # type: ignore
+        )
+        return res.rowcount  # type: ignore
 
     async def get_all_subtask_ids(self, task_id: int) -> list[int]:
-        sql = """
-            WITH RECURSIVE subtasks AS (
-            SELECT id, parent_id
-            FROM tasks
-            WHERE id=:task_id
-            UNION ALL
-            SELECT t.id, t.parent_id
-            FROM tasks t
-            INNER JOIN subtasks s ON t.parent_id=s.id
+        res = await self._session.scalars(
+            select(Task.id).where(self._subtree_of(task_id), self._alive()).order_by(Task.path, Task.id)  # type: ignore
+        )
+        return list(res.all())
+
+
+class ClosureTaskRepository(AlchemyTaskRepository):
+    """Serves tree lookups from task_closure table instead of paths"""
+
+    def _subtree_of(self, task_id: int, of=Task):
+        return of.id.in_(  # type: ignore
+            select(task_closure.c.descendant_id).where(
+                task_closure.c.ancestor_id == task_id,
+                task_closure.c.depth > 0
             )
-            SELECT id FROM subtasks WHERE id!=:task_id
-            """
+        )
 
-        result = await self._session.execute(
-            text(sql.strip()),
-            {"task_id": task_id}
+    def _ancestors_of(self, task_id: int):
+        return Task.id.in_(  # type: ignore
+            select(task_closure.c.ancestor_id).where(
+                task_closure.c.descendant_id == task_id,
+                task_closure.c.depth > 0
+            )
         )
 
-        return [row[0] for row in result.all()]
+    async def get_all_subtask_ids(self, task_id: int) -> list[int]:
+        res = await self._session.scalars(
+            select(task_closure.c.descendant_id)
+            .join(Task, Task.id == task_closure.c.descendant_id)  # type: ignore
+            .where(
+                task_closure.c.ancestor_id == task_id,
+                task_closure.c.depth > 0,
+                self._alive()
+            ).order_by(task_closure.c.depth, task_closure.c.descendant_id)
+        )
+        return list(res.all())
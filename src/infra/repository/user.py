@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.domain.entities.users import User
 from src.application.interfaces.repositories import UserRepositoryInterface
+from src.application.interfaces.cache import CacheInterface
 
 
 class AlchemyUserRepository(UserRepositoryInterface):
@@ -14,7 +15,50 @@ class AlchemyUserRepository(UserRepositoryInterface):
     async def get_by_tg_name(self, tg_name: str) -> Optional[User]:
         return await self._session.scalar(select(User).where(User.tg_name == tg_name))  # type: ignore
 
+    async def get_id_by_tg_name(self, tg_name: str) -> Optional[int]:
+        return await self._session.scalar(select(User.id).where(User.tg_name == tg_name))  # type: ignore
+
     async def count_by_tg_name(self, tg_name: str) -> int:
         return await self._session.scalar(
             select(func.count(User.id)).where(User.tg_name == tg_name)  # type: ignore
         ) or 0
+
+    async def remember(self, user: User) -> None:
+        return None
+
+
+class CachedUserRepository(UserRepositoryInterface):
+    """
+    Serves tg_name -> user id lookups from cache and delegates everything else.
+    Only existing users are cached so that just registered user is visible immediately.
+    """
+
+    def __init__(self, repo: UserRepositoryInterface, cache: CacheInterface, ttl: Optional[float] = None):
+        self._repo = repo
+        self._cache = cache
+        self._ttl = ttl
+
+    async def get_by_tg_name(self, tg_name: str) -> Optional[User]:
+        return await self._repo.get_by_tg_name(tg_name)
+
+    async def get_id_by_tg_name(self, tg_name: str) -> Optional[int]:
+        cached = await self._cache.get(self._key(tg_name))
+        if cached is not None:
+            return int(cached)
+        user_id = await self._repo.get_id_by_tg_name(tg_name)
+        if user_id is not None:
+            await self._cache.set(self._key(tg_name), str(user_id).encode(), self._ttl)
+        return user_id
+
+    async def count_by_tg_name(self, tg_name: str) -> int:
+        if await self._cache.get(self._key(tg_name)) is not None:
+            return 1
+        return await self._repo.count_by_tg_name(tg_name)
+
+    async def remember(self, user: User) -> None:
+        if user.id is not None:
+            await self._cache.set(self._key(user.tg_name), str(user.id).encode(), self._ttl)
+        await self._repo.remember(user)
+
+    def _key(self, tg_name: str) -> str:
+        return f"identity:{tg_name}"
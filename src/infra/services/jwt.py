@@ -1,22 +1,51 @@
+import hashlib
+from typing import Optional
+
 import jwt
 
 from .exceptions import JWTUnauthorizedError
 from src.application.interfaces.services import AuthenticationServiceInterface
+from src.infra.cache import LRUCache
 
 
 class JWTAuthenticationService(AuthenticationServiceInterface):
     def __init__(
         self,
-        secret: str
+        secret: str,
+        cache: Optional[LRUCache[bytes, dict]] = None,
+        trust_uid: bool = False
     ):
         self._secret = secret
+        self._cache = cache
+        self._trust_uid = trust_uid
 
     def get_tg_name_from_token(self, token: str) -> str:
+        return self._get_payload(token)["tg_name"]
+
+    def get_user_id_from_token(self, token: str) -> Optional[int]:
+        if not self._trust_uid:
+            return None
+        uid = self._get_payload(token).get("uid")
+        if isinstance(uid, int) and not isinstance(uid, bool):
+            return uid
+        return None
+
+    def _get_payload(self, token: str) -> dict:
         try:
-            payload = self.decode(token)
+            return self.decode(token)
         except jwt.InvalidTokenError:
             raise JWTUnauthorizedError("Token invalid", status=401)
-        return payload["tg_name"]
 
     def decode(self, token: str) -> dict:
+        if self._cache is None:
+            return self._verify(token)
+        # verified payloads are stored by token digest and live no longer than token itself
+        key = hashlib.sha256(token.encode()).digest()
+        payload = self._cache.get(key)
+        if payload is None:
+            payload = self._verify(token)
+            self._cache.set(key, payload, expires_at=payload["exp"])
+        return dict(payload)
+
+    def _verify(self, token: str) -> dict:
         return jwt.decode(token, self._secret, ["HS256"], options={"require": ["exp", "tg_name"]})
@@ -1,36 +1,98 @@
-from typing import Self
+from typing import Self, Optional, Callable, Awaitable
 
 from sqlalchemy.ext.asyncio import AsyncSession, AsyncSessionTransaction
-from src.application.interfaces.uow import UoWInterface, DomainEnt
+from src.application.interfaces.uow import UoWInterface, ReadOnlyUoWInterface, DomainEnt
+from src.infra.db.routing import USE_REPLICA, AUTOCOMMIT
+from src.infra.exc import RolledBackTransactionError
 from src.logger import logger
 
 
 class AlchemyUoW(UoWInterface):
-    def __init__(self, session: AsyncSession):
+    """
+    Nested blocks join transaction opened by the outer one. In request scoped mode transaction opened by the first
+    block is kept for following blocks of the request too: blocks only flush on exit and transaction is finished
+    by close() at the end of request. on_commit is called after each successful commit, callbacks registered by
+    after_commit() only after commit of transaction they were registered in. Their errors are logged, as
+    transaction is already committed. Failed block rolls back the whole transaction, so if its exception is caught
+    by enclosing block (or by request in request scoped mode), following blocks and commit raise
+    RolledBackTransactionError instead of silently saving nothing.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        request_scoped: bool = False,
+        on_commit: Optional[Callable[[], Awaitable[None]]] = None
+    ):
         self._session = session
-        self._t: AsyncSessionTransaction = None  # type: ignore
+        self._request_scoped = request_scoped
+        self._on_commit = on_commit
+        self._after_commit: list[Callable[[], Awaitable[None]]] = []
+        self._t: Optional[AsyncSessionTransaction] = None
+        self._depth = 0
+        self._failed = False
+        self.transactions = 0
 
     async def __aenter__(self) -> Self:
-        # logger.critical(f"{self._session.in_transaction()}, {self._session.get_transaction()}")
-        self._t = await self._session.begin()
+        if self._failed:
+            raise RolledBackTransactionError("Transaction was rolled back by failed block")
+        if self._t is None:
+            self._t = await self._session.begin()
+            self.transactions += 1
+        self._depth += 1
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> bool:
-        if self._t:
-            if exc_type is not None:
-                await self._t.rollback()
+        self._depth -= 1
+        if exc_type is not None:
+            await self._abort()
+        elif self._depth == 0:
+            if self._failed:
+                # in request scoped mode close() has to fail too
+                self._failed = self._request_scoped
+                raise RolledBackTransactionError("Transaction was rolled back by failed nested block")
+            if self._request_scoped:
+                try:
+                    await self.flush()
+                except Exception:
+                    await self._abort()
+                    raise
             else:
-                await self._t.commit()
-        self._t = None  # type: ignore
+                await self.commit()
         return False
 
+    async def _abort(self) -> None:
+        await self.rollback()
+        # transaction is still expected by enclosing block or by the rest of request
+        self._failed = self._depth > 0 or self._request_scoped
+
     async def commit(self) -> None:
         if self._t:
-            await self._t.commit()
+            t, self._t = self._t, None
+            await t.commit()
+            if self._on_commit:
+                await self._on_commit()
+            callbacks, self._after_commit = self._after_commit, []
+            for callback in callbacks:
+                try:
+                    await callback()
+                except Exception:
+                    logger.exception("After commit callback failed")
 
     async def rollback(self) -> None:
         if self._t:
-            await self._t.rollback()
+            t, self._t = self._t, None
+            self._after_commit.clear()
+            await t.rollback()
+
+    async def close(self, exc: Optional[BaseException] = None) -> None:
+        failed, self._failed = self._failed, False
+        if exc is not None:
+            await self.rollback()
+        elif failed:
+            raise RolledBackTransactionError("Transaction was rolled back by failed block")
+        else:
+            await self.commit()
 
     async def flush(self) -> None:
         return await self._session.flush()
@@ -40,3 +102,47 @@ class AlchemyUoW(UoWInterface):
 
     def in_transaction(self) -> bool:
         return self._session.in_transaction()
+
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self._after_commit.append(callback)
+
+
+class AlchemyReadOnlyUoW(ReadOnlyUoWInterface):
+    """
+    Runs reads on connection in autocommit mode so neither BEGIN nor COMMIT is sent. Connection is taken from pool
+    only by the first query, so block served from cache costs nothing. If session is already in transaction (e.g.
+    deferred one of request scoped AlchemyUoW) reads just join it. With use_replica reads of own transaction are sent
+    to replica by RoutingSession. Without autocommit block runs in real transaction, which server side cursor needs.
+    """
+
+    def __init__(self, session: AsyncSession, use_replica: bool = False, autocommit: bool = True):
+        self._session = session
+        self._use_replica = use_replica
+        self._autocommit = autocommit
+        self._t: Optional[AsyncSessionTransaction] = None
+        self._depth = 0
+
+    async def __aenter__(self) -> Self:
+        if self._depth == 0 and not self._session.in_transaction():
+            self._session.info[USE_REPLICA] = self._use_replica
+            if self._autocommit:
+                self._session.info[AUTOCOMMIT] = True
+            self._t = await self._session.begin()
+        self._depth += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> bool:
+        self._depth -= 1
+        if self._depth == 0 and self._t:
+            t, self._t = self._t, None
+            self._session.info.pop(USE_REPLICA, None)
+            self._session.info.pop(AUTOCOMMIT, None)
+            # releases connection if any was taken, nothing is sent to db in autocommit mode
+            await t.commit()
+        return False
+
+    def in_transaction(self) -> bool:
+        return self._session.in_transaction()
+
+    def holding_transaction(self) -> "AlchemyReadOnlyUoW":
+        return AlchemyReadOnlyUoW(self._session, use_replica=self._use_replica, autocommit=False)
@@ -1,2 +1,3 @@
 from .auth import auth_router
 from .task import task_router
+from .metrics import metrics_router
@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Query
-from dishka.integrations.fastapi import FromDishka, DishkaRoute
+from dishka.integrations.fastapi import FromDishka
 
 from src.application.dto.users import RegisterUserDTO
 from src.application.use_cases import RegisterUser, CheckUserExists
+from .routing import UoWRoute
 
 auth_router = APIRouter(
     prefix='/auth',
     tags=['Auth'],
-    route_class=DishkaRoute
+    route_class=UoWRoute
 )
 
 
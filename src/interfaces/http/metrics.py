@@ -0,0 +1,28 @@
+from hmac import compare_digest
+from typing import Optional
+
+from fastapi import APIRouter, Header
+from dishka.integrations.fastapi import DishkaRoute, FromDishka
+
+from src.domain.exc import HandledError
+from src.infra.configs import AppConfig
+from src.infra.metrics import metrics
+
+metrics_router = APIRouter(
+    prefix='/metrics',
+    tags=['Metrics'],
+    route_class=DishkaRoute
+)
+
+
+@metrics_router.get('')
+async def get_metrics(
+    config: FromDishka[AppConfig],
+    authorization: Optional[str] = Header(default=None)
+) -> dict:
+    # pool, cache and transaction internals are not public: served only with METRICS_TOKEN set and sent
+    if not config.metrics_token:
+        raise HandledError("Not Found", status=404)
+    if authorization is None or not compare_digest(authorization.encode(), f"Bearer {config.metrics_token}".encode()):
+        raise HandledError("Unauthorized", status=401)
+    return metrics.snapshot()
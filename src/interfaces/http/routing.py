@@ -0,0 +1,25 @@
+from typing import Callable, Coroutine, Any, Optional
+
+from fastapi import Request, Response
+from dishka.integrations.fastapi import DishkaRoute
+
+from src.application.interfaces.uow import UoWInterface
+
+
+class UoWRoute(DishkaRoute):
+    """
+    Finishes transaction deferred to the end of request before response is sent. Only UoW created by request in
+    request scoped mode is stored in request state, so other requests neither create nor close one
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            response = await handler(request)
+            uow: Optional[UoWInterface] = getattr(request.state, "deferred_uow", None)
+            if uow is not None:
+                await uow.close()
+            return response
+
+        return route_handler
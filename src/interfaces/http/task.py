@@ -1,7 +1,8 @@
-from typing import Literal, Optional
+from typing import Literal, Optional, AsyncIterator
 
 from fastapi import APIRouter, Query
-from dishka.integrations.fastapi import DishkaRoute, FromDishka
+from fastapi.responses import StreamingResponse
+from dishka.integrations.fastapi import FromDishka
 
 from src.application.use_cases import *
 from src.application.dto.task import (
@@ -9,34 +10,54 @@ from src.application.dto.task import (
     TaskUpdateDTO,
     DeleteResponseDTO,
     TaskViewDTO,
+    TaskPreviewDTO,
     PaginatedTasksDTO,
     ForceFinishResponseDTO
 )
 from src.domain.types import AuthenticatedUserId, AuthenticatedOwnerId
+from src.domain.exc import HandledError
 from src.logger import logger
+from .routing import UoWRoute
 
 
 task_router = APIRouter(
     prefix='/tasks',
     tags=['API to manage tasks'],
-    route_class=DishkaRoute
+    route_class=UoWRoute
 )
 
 
+async def _ndjson(tasks: AsyncIterator[TaskPreviewDTO]) -> AsyncIterator[str]:
+    async for task in tasks:
+        yield task.model_dump_json() + "\n"
+
+
+def _check_stream_params(page: Optional[int], cursor: Optional[str]) -> None:
+    # stream always starts from the newest task, position in list has no meaning for it
+    if page is not None or cursor is not None:
+        raise HandledError("Page and cursor can not be used with stream")
+
+
 @task_router.get('')
 async def get_tasks(
     user_id: FromDishka[AuthenticatedUserId],
     use_case: FromDishka[ShowTasks],
-    page: int = Query(ge=1, default=1),
-    size: int = Query(default=5),
-    status: Literal["active", "finished"] = Query(default="active")
+    stream_use_case: FromDishka[StreamTasks],
+    page: Optional[int] = Query(ge=1, default=None, description="Number of page, the first one by default"),
+    size: int = Query(ge=1, default=5),
+    status: Literal["active", "finished"] = Query(default="active"),
+    cursor: Optional[str] = Query(default=None),
+    stream: bool = Query(default=False, description="Stream tasks as NDJSON without page size limit"),
+    limit: Optional[int] = Query(ge=1, default=None, description="Maximum number of streamed tasks, all by default"),
+    include_total: bool = Query(default=False, description="Count tasks matching the filter")
 ) -> PaginatedTasksDTO:
-    prev_page, next_page, tasks = await use_case.execute(user_id, status, page=page, size=size)
-    return PaginatedTasksDTO(
-        tasks=[TaskViewDTO.model_validate(task) for task in tasks],
-        prev_page=prev_page,
-        next_page=next_page
-    )
+    if stream:
+        _check_stream_params(page, cursor)
+        return StreamingResponse(  # type: ignore
+            _ndjson(stream_use_case.execute(user_id, status, limit=limit)),
+            media_type="application/x-ndjson"
+        )
+    return await use_case.execute(user_id, status, page=page or 1, size=size, cursor=cursor, include_total=include_total)
 
 
 @task_router.get('/{task_id}')
@@ -62,16 +83,22 @@ async def get_subtasks(
     task_id: int,
     user_id: FromDishka[AuthenticatedOwnerId],
     use_case: FromDishka[ShowSubtasks],
-    page: int = Query(ge=1, default=1),
-    size: int = Query(default=5),
-    status: Literal["active", "finished"] = Query(default="active")
+    stream_use_case: FromDishka[StreamSubtasks],
+    page: Optional[int] = Query(ge=1, default=None, description="Number of page, the first one by default"),
+    size: int = Query(ge=1, default=5),
+    status: Literal["active", "finished"] = Query(default="active"),
+    cursor: Optional[str] = Query(default=None),
+    stream: bool = Query(default=False, description="Stream subtasks as NDJSON without page size limit"),
+    limit: Optional[int] = Query(ge=1, default=None, description="Maximum number of streamed subtasks, all by default"),
+    include_total: bool = Query(default=False, description="Count subtasks matching the filter")
 ) -> PaginatedTasksDTO:
-    prev_page, next_page, tasks = await use_case.execute(status, task_id, page=page, size=size)
-    return PaginatedTasksDTO(
-        tasks=[TaskViewDTO.model_validate(task) for task in tasks],
-        prev_page=prev_page,
-        next_page=next_page
-    )
+    if stream:
+        _check_stream_params(page, cursor)
+        return StreamingResponse(  # type: ignore
+            _ndjson(stream_use_case.execute(status, task_id, limit=limit)),
+            media_type="application/x-ndjson"
+        )
+    return await use_case.execute(user_id, status, task_id, page=page or 1, size=size, cursor=cursor, include_total=include_total)
 
 
 @task_router.patch('/{task_id}')
@@ -99,7 +126,7 @@ async def force_finish_task(
     use_case: FromDishka[ForceFinishTask],
     task_id: int
 ) -> ForceFinishResponseDTO:
-    return ForceFinishResponseDTO(subtasks_ids=await use_case.execute(task_id))
+    return ForceFinishResponseDTO(subtasks_ids=await use_case.execute(user_id, task_id))
 
 
 @task_router.delete('/{task_id}')
@@ -108,7 +135,7 @@ async def delete_task(
     use_case: FromDishka[DeleteTask],
     task_id: int
 ) -> DeleteResponseDTO:
-    return DeleteResponseDTO(subtasks_ids=await use_case.execute(task_id))
+    return DeleteResponseDTO(subtasks_ids=await use_case.execute(user_id, task_id))
 
 
 @task_router.get("/{task_id}/is_active")
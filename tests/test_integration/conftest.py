@@ -0,0 +1,42 @@
+import asyncio
+import pytest
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
+
+from src.infra.configs import DBConfig
+from src.infra.db.tables import metadata
+
+
+async def _prepare_db(engine: AsyncEngine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.drop_all)
+        await conn.run_sync(metadata.create_all)
+
+
+@pytest.fixture
+def db_url() -> str:
+    """Creates clean schema in test database. Tests are skipped if database is not configured or unreachable"""
+    try:
+        url = DBConfig().conn_url  # type: ignore
+    except ValidationError:
+        pytest.skip("test database is not configured")
+    engine = create_async_engine(url)
+    try:
+        asyncio.run(_prepare_db(engine))
+    except (OSError, asyncio.TimeoutError):
+        pytest.skip("test database is unreachable")
+    finally:
+        asyncio.run(engine.dispose())
+    return url
+
+
+def pytest_collection_modifyitems(items):
+    """ORM mapping instruments domain entities for the rest of session, so tests requiring it run last"""
+    items.sort(key=lambda item: "mapped" in getattr(item, "fixturenames", ()))
+
+
+@pytest.fixture(scope="session")
+def mapped() -> None:
+    from src.app import map_tables
+    map_tables()
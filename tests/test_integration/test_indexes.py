@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, insert, text, desc, tuple_
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.infra.db.tables import tasks, users
+
+NOW = datetime.now(timezone.utc)
+
+
+async def explain(url: str, query) -> str:
+    engine = create_async_engine(url)
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(insert(users), [{"id": i, "tg_name": f"user{i}"} for i in range(1, 11)])
+            await conn.execute(insert(tasks), [
+                {
+                    "id": i,
+                    "title": "title",
+                    "description": "description",
+                    "deadline": NOW + timedelta(days=1),
+                    "user_id": i % 10 + 1,
+                    "creation_date": NOW + timedelta(seconds=i),
+                    "pass_date": NOW if i % 3 == 0 else None,
+                    "parent_id": i - 10 if i > 10 else None
+                } for i in range(1, 1001)
+            ])
+            await conn.execute(text("ANALYZE tasks"))
+            # table is small so planner would prefer seq scan anyway, only check whether index is applicable
+            await conn.execute(text("SET enable_seqscan = off"))
+            if not isinstance(query, str):
+                query = str(query.compile(conn.sync_connection, compile_kwargs={"literal_binds": True}))
+            plan = await conn.execute(text("EXPLAIN " + query))
+            return "\n".join(plan.scalars())
+    finally:
+        await engine.dispose()
+
+
+def tasks_page(*where):
+    return select(tasks).where(*where).order_by(desc(tasks.c.creation_date)).offset(5).limit(6)
+
+
+@pytest.mark.parametrize("status, index", [
+    ("active", "ix_tasks_user_id_active_roots"),
+    ("finished", "ix_tasks_user_id_finished_roots")
+])
+def test_tasks_page_uses_partial_index(db_url, status, index):
+    """Test that page of root tasks is read by partial index of its status"""
+    query = tasks_page(
+        tasks.c.user_id == 1,
+        tasks.c.pass_date == None if status == "active" else tasks.c.pass_date != None,
+        tasks.c.parent_id == None
+    )
+
+    plan = asyncio.run(explain(db_url, query))
+
+    assert index in plan
+    assert "Sort" not in plan
+
+
+def test_keyset_page_uses_partial_index(db_url):
+    """Test that page following cursor position is read by index without sort"""
+    query = select(tasks).where(
+        tasks.c.user_id == 1,
+        tasks.c.pass_date == None,
+        tasks.c.parent_id == None,
+        tuple_(tasks.c.creation_date, tasks.c.id) < tuple_(NOW + timedelta(seconds=500), 500)
+    ).order_by(desc(tasks.c.creation_date), desc(tasks.c.id)).limit(6)
+
+    plan = asyncio.run(explain(db_url, query))
+
+    assert "ix_tasks_user_id_active_roots" in plan
+    assert "Sort" not in plan
+
+
+def test_subtasks_page_uses_parent_index(db_url):
+    """Test that page of subtasks is read by parent index"""
+    query = tasks_page(tasks.c.parent_id == 1, tasks.c.pass_date == None)
+
+    plan = asyncio.run(explain(db_url, query))
+
+    assert "ix_tasks_parent_id_creation_date" in plan
+    assert "Sort" not in plan
+
+
+def test_subtree_walk_uses_parent_index(db_url):
+    """Test that recursive part of subtree query looks up children by parent index"""
+    query = """
+        WITH RECURSIVE subtasks AS (
+        SELECT id, parent_id FROM tasks WHERE id=1
+        UNION ALL
+        SELECT t.id, t.parent_id FROM tasks t INNER JOIN subtasks s ON t.parent_id=s.id
+        )
+        SELECT id FROM subtasks WHERE id!=1
+    """
+
+    plan = asyncio.run(explain(db_url, query))
+
+    assert "ix_tasks_parent_id_creation_date" in plan
+
+
+def test_purge_batch_uses_tombstones_index(db_url):
+    """Test that batch of tombstoned tasks is taken by partial index in purge order"""
+    query = select(tasks.c.id).where(tasks.c.deleted_at != None).order_by(
+        desc(tasks.c.depth), tasks.c.id
+    ).limit(500)
+
+    plan = asyncio.run(explain(db_url, query))
+
+    assert "ix_tasks_tombstones" in plan
+    assert "Sort" not in plan
@@ -0,0 +1,61 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.infra.cache import MemoryCache, TwoTierCache, PgInvalidationBus
+from src.infra.configs import DBConfig
+
+
+async def wait_for(condition, timeout: float = 5) -> None:
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+def test_deleted_key_evicted_from_local_caches_of_all_workers(db_url):
+    """Test that key deleted by one worker is evicted from local caches of all workers by NOTIFY"""
+    async def run():
+        engine = create_async_engine(db_url)
+        buses = [PgInvalidationBus(engine, DBConfig().formatted_conn_url) for _ in range(2)]  # type: ignore
+        caches = [TwoTierCache(MemoryCache(10), bus=bus) for bus in buses]
+        listeners = [asyncio.create_task(bus.run()) for bus in buses]
+        try:
+            await wait_for(lambda: all(bus.connected for bus in buses))
+            for cache in caches:
+                await cache.set("key", b"1")
+                await cache.set("other", b"1")
+            await caches[0].delete("key")
+            await wait_for(lambda: all(bus.received for bus in buses))
+            return [(await cache.get("key"), await cache.get("other")) for cache in caches], buses
+        finally:
+            for listener in listeners:
+                listener.cancel()
+            await asyncio.gather(*listeners, return_exceptions=True)
+            await engine.dispose()
+
+    values, buses = asyncio.run(run())
+
+    assert values == [(None, b"1"), (None, b"1")]
+    assert [bus.stats()["published"] for bus in buses] == [1, 0]
+    assert not any(bus.connected for bus in buses)
+
+
+def test_local_cache_reset_on_reconnect(db_url):
+    """Test that local cache is cleared when listener reconnects, as notifications could be missed meanwhile"""
+    async def run():
+        engine = create_async_engine(db_url)
+        bus = PgInvalidationBus(engine, DBConfig().formatted_conn_url, reconnect_interval=0)  # type: ignore
+        cache = TwoTierCache(MemoryCache(10), bus=bus)
+        listener = asyncio.create_task(bus.run())
+        try:
+            await wait_for(lambda: bus.connected)
+            await cache.set("key", b"1")
+            bus._connection.terminate()  # type: ignore
+            await wait_for(lambda: bus.connects == 2 and bus.connected)
+            return await cache.get("key")
+        finally:
+            listener.cancel()
+            await asyncio.gather(listener, return_exceptions=True)
+            await engine.dispose()
+
+    assert asyncio.run(run()) is None
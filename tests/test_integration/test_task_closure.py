@@ -0,0 +1,103 @@
+import asyncio
+
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select, update, delete
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.infra.db.closure import enable_task_closure, disable_task_closure, task_closure_enabled
+from src.infra.db.tables import tasks, users, task_closure
+
+
+async def closure_after(url: str, *statements, fill: bool = False) -> set[tuple[int, int, int]]:
+    """
+    Creates tree 1 -> 2 -> 3, 1 -> 4, 5 and returns closure after statements. Closure is enabled before the tree is
+    created, or with fill after statements
+    """
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            if not fill:
+                await enable_task_closure(conn)
+            await conn.execute(insert(users).values(id=1, tg_name="user"))
+            for task_id, parent_id in ((1, None), (2, 1), (3, 2), (4, 1), (5, None)):
+                await conn.execute(insert(tasks).values(
+                    id=task_id,
+                    title="title",
+                    description="description",
+                    deadline=datetime.now(timezone.utc),
+                    creation_date=datetime.now(timezone.utc),
+                    user_id=1,
+                    parent_id=parent_id
+                ))
+            for statement in statements:
+                await conn.execute(statement)
+            if fill:
+                await enable_task_closure(conn)
+            return set(tuple(row) for row in await conn.execute(select(task_closure)))  # type: ignore
+    finally:
+        await engine.dispose()
+
+
+def test_closure_maintained_on_insert(db_url):
+    """Test that inserted task is bound to itself and all its ancestors"""
+    closure = asyncio.run(closure_after(db_url))
+
+    assert closure == {
+        (1, 1, 0), (2, 2, 0), (3, 3, 0), (4, 4, 0), (5, 5, 0),
+        (1, 2, 1), (1, 3, 2), (2, 3, 1), (1, 4, 1)
+    }
+
+
+def test_closure_maintained_on_reparent(db_url):
+    """Test that moved subtree is detached from old ancestors and attached to new ones"""
+    closure = asyncio.run(closure_after(db_url, update(tasks).where(tasks.c.id == 2).values(parent_id=5)))
+
+    assert closure == {
+        (1, 1, 0), (2, 2, 0), (3, 3, 0), (4, 4, 0), (5, 5, 0),
+        (5, 2, 1), (5, 3, 2), (2, 3, 1), (1, 4, 1)
+    }
+
+
+def test_closure_maintained_on_delete(db_url):
+    """Test that pairs of deleted subtree are removed by cascade"""
+    closure = asyncio.run(closure_after(db_url, delete(tasks).where(tasks.c.id == 2)))
+
+    assert closure == {(1, 1, 0), (4, 4, 0), (5, 5, 0), (1, 4, 1)}
+
+
+def test_closure_filled_when_enabled(db_url):
+    """Test that closure of existing tasks is filled when maintenance is enabled"""
+    closure = asyncio.run(closure_after(db_url, fill=True))
+
+    assert closure == {
+        (1, 1, 0), (2, 2, 0), (3, 3, 0), (4, 4, 0), (5, 5, 0),
+        (1, 2, 1), (1, 3, 2), (2, 3, 1), (1, 4, 1)
+    }
+
+
+def test_closure_not_maintained_when_disabled(db_url):
+    """Test that closure is maintained neither by default nor after it is disabled, and is emptied then"""
+    async def run():
+        engine = create_async_engine(db_url)
+        try:
+            async with engine.begin() as conn:
+                by_default = await task_closure_enabled(conn)
+                await enable_task_closure(conn)
+                await conn.execute(insert(users).values(id=1, tg_name="user"))
+                task = dict(
+                    title="title",
+                    description="description",
+                    deadline=datetime.now(timezone.utc),
+                    creation_date=datetime.now(timezone.utc),
+                    user_id=1
+                )
+                await conn.execute(insert(tasks).values(id=1, **task))
+                await disable_task_closure(conn)
+                await conn.execute(insert(tasks).values(id=2, parent_id=1, **task))
+                closure = (await conn.execute(select(task_closure))).all()
+                return by_default, await task_closure_enabled(conn), closure
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) == (False, False, [])
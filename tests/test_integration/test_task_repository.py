@@ -0,0 +1,358 @@
+import asyncio
+import pytest
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from src.domain.entities import Task, User
+from src.domain.entities.exceptions import UnfinishedTaskError
+from src.domain.services import TaskPlannerManagerService
+from src.domain.services.exceptions import InvalidDeadlineError
+from src.infra.db.closure import enable_task_closure
+from src.infra.repository import AlchemyTaskRepository, ClosureTaskRepository
+
+
+@pytest.fixture(params=[AlchemyTaskRepository, ClosureTaskRepository])
+def repo_class(request) -> type[AlchemyTaskRepository]:
+    return request.param
+
+
+def run_with_repo(url: str, work, repo_class: type[AlchemyTaskRepository] = AlchemyTaskRepository):
+    """Creates tree root -> (a -> a1 -> a11, b) of new user and runs work with repository and the tree"""
+    async def run():
+        engine = create_async_engine(url)
+        statements = []
+        event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+        try:
+            if repo_class is ClosureTaskRepository:
+                async with engine.begin() as conn:
+                    await enable_task_closure(conn)
+            async with sessionmaker() as session:
+                user = User("user")
+                session.add(user)
+                await session.flush()
+                tree: dict[str, Task] = {}
+                for name, parent in (("root", None), ("a", "root"), ("b", "root"), ("a1", "a"), ("a11", "a1")):
+                    tree[name] = Task(
+                        name,
+                        datetime.now(timezone.utc) + timedelta(days=1),
+                        user.id,
+                        "description",
+                        parent=tree.get(parent)  # type: ignore
+                    )
+                    session.add(tree[name])
+                    await session.flush()
+                await session.commit()
+            async with sessionmaker() as session:
+                statements.clear()
+                return await work(repo_class(session), {name: task.id for name, task in tree.items()}), statements
+        finally:
+            await engine.dispose()
+    return asyncio.run(run())
+
+
+def test_path_set_on_insert(db_url, mapped):
+    """Test that path of task consists of ids of its ancestors"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        return {name: (await repo.get_by_id(task_id)).path for name, task_id in ids.items()}, ids  # type: ignore
+
+    (paths, ids), _ = run_with_repo(db_url, work)
+
+    assert paths["root"] == ""
+    assert paths["b"] == f"{ids['root']}."
+    assert paths["a11"] == f"{ids['root']}.{ids['a']}.{ids['a1']}."
+
+
+def test_depth_stored_on_insert(db_url, mapped):
+    """Test that depth is stored so loaded task knows it without ancestors"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        return {name: (await repo.get_by_id(task_id)).get_depth() for name, task_id in ids.items()}  # type: ignore
+
+    depths, _ = run_with_repo(db_url, work)
+
+    assert depths == {"root": 1, "a": 2, "b": 2, "a1": 3, "a11": 4}
+
+
+def test_depth_over_limit_rejected_by_db(db_url, mapped):
+    """Test that check constraint rejects depth out of range and depth inconsistent with path"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        rejected = []
+        for values in ("depth = 6", "depth = 3"):
+            try:
+                await repo._session.execute(text(f"UPDATE tasks SET {values} WHERE id = {ids['a11']}"))
+            except IntegrityError:
+                rejected.append(values)
+            await repo._session.rollback()
+        return rejected
+
+    rejected, _ = run_with_repo(db_url, work)
+
+    assert rejected == ["depth = 6", "depth = 3"]
+
+
+def test_task_tree_loaded_by_single_query(db_url, mapped, repo_class):
+    """Test that whole subtree is loaded and linked by one statement"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        task = await repo.get_task_tree(ids["a"])
+        return task.title, [sub.title for sub in task.subtasks], task.subtasks[0].subtasks[0].title, \
+            task.subtasks[0].subtasks[0].subtasks, task.subtasks[0].parent is task
+
+    (title, subs, deepest, deepest_subs, linked), statements = run_with_repo(db_url, work, repo_class)
+
+    assert len(statements) == 1
+    assert (title, subs, deepest, deepest_subs, linked) == ("a", ["a1"], "a11", [], True)
+
+
+def test_parents_loaded_by_single_query(db_url, mapped, repo_class):
+    """Test that chain of ancestors is loaded by one statement"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        task = await repo.get_with_parents(ids["a11"])
+        return task.get_depth(), task.parent.parent.parent.title  # type: ignore
+
+    (depth, root_title), statements = run_with_repo(db_url, work, repo_class)
+
+    assert len(statements) == 1
+    assert (depth, root_title) == (4, "root")
+
+
+def test_parent_and_subtree_loaded_by_single_query(db_url, mapped, repo_class):
+    """Test that direct parent and whole subtree are loaded by one statement"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        task = await repo.get_with_parent_and_subs(ids["a"])
+        return task.parent.title, task.get_subs_ids() == [ids["a1"], ids["a11"]]  # type: ignore
+
+    (parent_title, subs_match), statements = run_with_repo(db_url, work, repo_class)
+
+    assert len(statements) == 1
+    assert parent_title == "root"
+    assert subs_match
+
+
+def test_all_subtask_ids(db_url, mapped, repo_class):
+    """Test that ids of all descendants are returned"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        return await repo.get_all_subtask_ids(ids["root"]), await repo.get_all_subtask_ids(ids["a11"]), ids
+
+    (root_subs, leaf_subs, ids), _ = run_with_repo(db_url, work, repo_class)
+
+    assert sorted(root_subs) == sorted([ids["a"], ids["b"], ids["a1"], ids["a11"]])
+    assert leaf_subs == []
+
+
+def test_finish_subtree_by_single_statement(db_url, mapped, repo_class):
+    """Test that task and its unfinished descendants are marked done by one statement and only once"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        await repo._session.execute(text(f"UPDATE tasks SET pass_date = now() WHERE id = {ids['a11']}"))
+        finished = await repo.finish_subtree(ids["a"])
+        again = await repo.finish_subtree(ids["a"])
+        unfinished = (await repo._session.scalars(
+            text("SELECT title FROM tasks WHERE user_id = :user_id AND pass_date IS NULL ORDER BY title"),
+            {"user_id": (await repo.get_by_id(ids["root"])).user_id}  # type: ignore
+        )).all()
+        return finished, again, unfinished, ids
+
+    (finished, again, unfinished, ids), statements = run_with_repo(db_url, work, repo_class)
+
+    assert finished == sorted([ids["a"], ids["a1"]])
+    assert again == []
+    assert unfinished == ["b", "root"]
+    assert sum(statement.startswith("UPDATE tasks SET pass_date=now()") for statement in statements) == 2
+
+
+def test_deadline_bounds(db_url, mapped, repo_class):
+    """Test that deadline of parent and the latest deadline in subtree come from one statement"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        await repo._session.execute(
+            text(f"UPDATE tasks SET deadline = deadline - interval '1 hour' WHERE id = {ids['a1']}")
+        )
+        tasks = {name: await repo.get_by_id(task_id) for name, task_id in ids.items()}
+        bounds = {name: await repo.get_deadline_bounds(ids[name]) for name in ("root", "a", "a11")}
+        return tasks, bounds
+
+    (tasks, bounds), statements = run_with_repo(db_url, work, repo_class)
+
+    assert bounds["root"].parent_deadline is None
+    assert bounds["root"].latest_subtask_deadline == max(tasks[name].deadline for name in ("a", "b", "a1", "a11"))
+    assert bounds["a"].parent_deadline == tasks["root"].deadline
+    assert bounds["a"].latest_subtask_deadline == tasks["a11"].deadline
+    assert (bounds["a11"].parent_deadline, bounds["a11"].latest_subtask_deadline) == (tasks["a1"].deadline, None)
+    assert len(statements) == 1 + len(tasks) + 3
+
+
+def test_delete_task_with_subtree_by_single_statement(db_url, mapped, repo_class):
+    """Test that task and its subtree are deleted by one statement returning ids of descendants"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        deleted = await repo.delete_task(ids["a"])
+        left = {name: await repo.get_by_id(task_id) is not None for name, task_id in ids.items()}
+        return deleted, left, ids
+
+    (deleted, left, ids), statements = run_with_repo(db_url, work, repo_class)
+
+    assert deleted == [ids["a1"], ids["a11"]]
+    assert left == {"root": True, "a": False, "b": True, "a1": False, "a11": False}
+    assert sum(statement.startswith("DELETE") for statement in statements) == 1
+
+
+def test_total_counted_one_over_limit(db_url, mapped, monkeypatch):
+    """Test that total stops one task over the limit, so that capped total is told from exact one"""
+    monkeypatch.setattr("src.infra.repository.task.TOTAL_COUNT_LIMIT", 1)
+
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        *_, over = await repo.get_subtasks(ids["root"], "active", size=1, include_total=True)
+        *_, exact = await repo.get_subtasks(ids["a"], "active", size=1, include_total=True)
+        return over, exact
+
+    (over, exact), _ = run_with_repo(db_url, work)
+
+    assert (over, exact) == (2, 1)
+
+
+def test_tombstoned_subtree_hidden(db_url, mapped, repo_class):
+    """Test that tombstoned task and its descendants are invisible but stay in table"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        hidden = await repo.tombstone_task(ids["a"])
+        visible = {name: await repo.get_by_id(task_id) is not None for name, task_id in ids.items()}
+        _, _, subtasks, total = await repo.get_subtasks(ids["root"], "active", include_total=True)
+        tree = await repo.get_task_tree(ids["root"])
+        rows = await repo._session.scalar(text(f"SELECT count(*) FROM tasks WHERE path LIKE '{ids['root']}.%'"))
+        return hidden, visible, [task.title for task in subtasks], total, tree.get_subs_ids(), rows, ids
+
+    (hidden, visible, subtasks, total, tree_ids, rows, ids), _ = run_with_repo(db_url, work, repo_class)
+
+    assert hidden == [ids["a1"], ids["a11"]]
+    assert visible == {"root": True, "a": False, "b": True, "a1": False, "a11": False}
+    assert (subtasks, total) == (["b"], 1)
+    assert tree_ids == [ids["b"]]
+    assert rows == 4
+
+
+def test_purge_deleted_by_batches(db_url, mapped):
+    """Test that tombstoned tasks are purged deepest first in batches of given size"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        await repo.tombstone_task(ids["root"])
+        batches = []
+        while purged := await repo.purge_deleted(2):
+            batches.append((purged, await repo._session.scalar(text("SELECT count(*) FROM tasks"))))
+        return batches
+
+    batches, statements = run_with_repo(db_url, work)
+
+    assert batches == [(2, 3), (2, 1), (1, 0)]
+    assert "FOR UPDATE SKIP LOCKED" in statements[1]
+
+
+def test_linked_tree_serves_domain_services(db_url, mapped, repo_class):
+    """Test that domain services walk hydrated relationships without further queries"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        task = await repo.get_with_parent_and_subs(ids["a1"])
+        service = TaskPlannerManagerService(task)
+        errors = []
+        for deadline in (task.parent.deadline + timedelta(hours=1), task.subtasks[0].deadline - timedelta(hours=1)):
+            try:
+                service.set_deadline(deadline)
+            except InvalidDeadlineError as e:
+                errors.append(str(e))
+        return errors, task.mark_as_done
+
+    (errors, mark_as_done), statements = run_with_repo(db_url, work, repo_class)
+
+    assert "later than deadline of parent task" in errors[0]
+    assert "earlier than deadline of subtasks" in errors[1]
+    with pytest.raises(UnfinishedTaskError):
+        mark_as_done()
+    assert len(statements) == 1
+
+
+def counters_of(repo: AlchemyTaskRepository, ids: dict[str, int]):
+    async def read():
+        rows = (await repo._session.execute(
+            text("SELECT id, open_children, descendants, finished_descendants FROM tasks WHERE id = ANY(:ids)"),
+            {"ids": list(ids.values())}
+        )).all()
+        by_id = {row.id: tuple(row[1:]) for row in rows}
+        return {name: by_id[task_id] for name, task_id in ids.items() if task_id in by_id}
+    return read()
+
+
+def test_counters_maintained_by_triggers(db_url, mapped, repo_class):
+    """Test that counters of ancestors follow inserts, finishing, tombstoning and deletion of tasks"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        created = await counters_of(repo, ids)
+        await repo.finish_subtree(ids["a1"])
+        finished = await counters_of(repo, ids)
+        await repo.tombstone_task(ids["a1"])
+        tombstoned = await counters_of(repo, ids)
+        await repo.delete_task(ids["b"])
+        deleted = await counters_of(repo, ids)
+        return created, finished, tombstoned, deleted
+
+    (created, finished, tombstoned, deleted), _ = run_with_repo(db_url, work, repo_class)
+
+    assert created == {"root": (2, 4, 0), "a": (1, 2, 0), "b": (0, 0, 0), "a1": (1, 1, 0), "a11": (0, 0, 0)}
+    assert finished == {"root": (2, 4, 2), "a": (0, 2, 2), "b": (0, 0, 0), "a1": (0, 1, 1), "a11": (0, 0, 0)}
+    assert (tombstoned["root"], tombstoned["a"]) == ((2, 2, 0), (0, 0, 0))
+    assert deleted["root"] == (1, 1, 0)
+    assert "b" not in deleted
+
+
+def test_concurrent_changes_of_one_tree_do_not_deadlock(db_url, mapped):
+    """
+    Test that ancestors are locked by counters trigger deepest first, not in order rows are found in table, so
+    transactions changing the same ancestors do not deadlock
+    """
+    rename = text("UPDATE tasks SET title = title || '!' WHERE id = :id")
+
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        # new row versions are appended, so root is found before its child a now
+        for name in ("root", "a"):
+            await repo._session.execute(rename, {"id": ids[name]})
+        await repo._session.commit()
+        engine = create_async_engine(db_url)
+        try:
+            await repo._session.execute(rename, {"id": ids["a"]})
+            async with engine.begin() as conn:
+                insert = asyncio.create_task(conn.execute(
+                    text(
+                        "INSERT INTO tasks (title, description, deadline, user_id, creation_date, parent_id, path, depth) "
+                        "SELECT 'child', description, deadline, user_id, creation_date, id, path || id || '.', depth + 1 "
+                        "FROM tasks WHERE id = :id"
+                    ),
+                    {"id": ids["a11"]}
+                ))
+                # trigger of insert waits for row of a now
+                await asyncio.sleep(0.5)
+                await repo._session.execute(rename, {"id": ids["root"]})
+                await repo._session.commit()
+                await insert
+            return await counters_of(repo, ids)
+        finally:
+            await engine.dispose()
+
+    counters, _ = run_with_repo(db_url, work)
+
+    assert counters == {"root": (2, 5, 0), "a": (1, 3, 0), "b": (0, 0, 0), "a1": (1, 2, 0), "a11": (1, 1, 0)}
+
+
+def test_recount_counters_repairs_drift(db_url, mapped):
+    """Test that repair recomputes broken counters by batches and leaves correct ones untouched"""
+    async def work(repo: AlchemyTaskRepository, ids: dict[str, int]):
+        expected = await counters_of(repo, ids)
+        await repo._session.execute(text(
+            f"UPDATE tasks SET descendants = 7, open_children = 0 WHERE id IN ({ids['root']}, {ids['a1']})"
+        ))
+        after_id, fixed = min(ids.values()) - 1, 0
+        while True:
+            last_id, batch_fixed = await repo.recount_counters(after_id, 2)
+            if last_id is None:
+                break
+            after_id, fixed = last_id, fixed + batch_fixed
+        return expected, await counters_of(repo, ids), fixed
+
+    (expected, repaired, fixed), _ = run_with_repo(db_url, work)
+
+    assert repaired == expected
+    assert fixed == 2
@@ -1,6 +1,7 @@
 import pytest
 
 from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
 
 from src.domain.entities import Task
 from src.domain.entities.exceptions import UnfinishedTaskError, HasNoDirectAccessError
@@ -210,6 +211,22 @@ def test_mark_as_done_failure_unfinished_subtasks():
     assert parent.pass_date is None
 
 
+def test_mark_as_done_with_known_subtasks_state():
+    """Test mark_as_done trusts given state of subtasks and does not walk them."""
+    deadline = datetime.now(timezone.utc) + timedelta(days=1)
+
+    task = Task(title="Task", _deadline=deadline, user_id=1, description="")
+    # subtasks are not loaded, state is known from storage
+    task.subtasks = Mock(__iter__=Mock(side_effect=AssertionError("subtasks walked")))
+
+    with pytest.raises(UnfinishedTaskError):
+        task.mark_as_done(has_unfinished_subtasks=True)
+    assert not task.is_done
+
+    task.mark_as_done(has_unfinished_subtasks=False)
+    assert task.is_done
+
+
 def test_mark_as_done_nested_hierarchy():
     """Test mark_as_done with nested hierarchy."""
     deadline = datetime.now(timezone.utc) + timedelta(days=1)
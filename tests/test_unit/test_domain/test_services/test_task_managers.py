@@ -11,6 +11,7 @@ from src.domain.services.exceptions import (
 from src.domain.services import (
     TaskProducerService,
     TaskPlannerManagerService,
+    DeadlineBounds,
     MAX_DEPTH
 )
 from src.domain.services.task import BaseTaskManagerService
@@ -269,6 +270,37 @@ def test_set_deadline_calls_all_validations_in_order():
         mock_base_val.assert_called_once_with(new_deadline)
 
 
+def test_set_deadline_validates_against_bounds():
+    """Test that given bounds are used instead of parent and subtasks of task"""
+    task = Task(title="Task", _deadline=datetime.now(timezone.utc) + timedelta(days=3), user_id=1, description="")
+    # relations are not loaded
+    task.subtasks = Mock(__iter__=Mock(side_effect=AssertionError("subtasks walked")))
+    bounds = DeadlineBounds(
+        parent_deadline=datetime.now(timezone.utc) + timedelta(days=10),
+        latest_subtask_deadline=datetime.now(timezone.utc) + timedelta(days=5)
+    )
+    service = TaskPlannerManagerService(task, bounds)
+
+    with pytest.raises(InvalidDeadlineError, match="later than deadline of parent task"):
+        service.set_deadline(datetime.now(timezone.utc) + timedelta(days=11))
+    with pytest.raises(InvalidDeadlineError, match="earlier than deadline of subtasks"):
+        service.set_deadline(datetime.now(timezone.utc) + timedelta(days=4))
+
+    new_deadline = datetime.now(timezone.utc) + timedelta(days=7)
+    service.set_deadline(new_deadline)
+    assert task.deadline == new_deadline
+
+
+def test_set_deadline_with_empty_bounds():
+    """Test that root task without subtasks is limited only by current time"""
+    task = Task(title="Task", _deadline=datetime.now(timezone.utc) + timedelta(days=3), user_id=1, description="")
+    service = TaskPlannerManagerService(task, DeadlineBounds())
+
+    new_deadline = datetime.now(timezone.utc) + timedelta(days=365)
+    service.set_deadline(new_deadline)
+    assert task.deadline == new_deadline
+
+
 def test_validate_subs_deadlines_with_no_subtasks():
     """Test _validate_subs_deadlines with empty subtasks list"""
     mock_task = Mock()
@@ -0,0 +1,156 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from src.infra.cache import LRUCache, MemoryCache, TaskListCache
+from src.application.dto.task import PaginatedTasksDTO
+from src.application.interfaces.cache import CacheUnavailableError
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_get_returns_stored_value_and_counts_hits():
+    """Test that stored value is returned and counted as hit"""
+    cache = LRUCache(2)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_least_recently_used_entry_evicted():
+    """Test that the least recently used entry is dropped when maxsize exceeded"""
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" becomes least recently used
+    cache.set("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_entry_expires_at_given_moment():
+    """Test that entry is not served after its own expiration moment"""
+    clock = FakeClock()
+    cache = LRUCache(10, clock=clock)
+    cache.set("a", 1, expires_at=clock.now + 5)
+
+    clock.now += 4
+    assert cache.get("a") == 1
+    clock.now += 1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_bounds_entry_expiration():
+    """Test that ttl is used as upper bound for entry expiration"""
+    clock = FakeClock()
+    cache = LRUCache(10, ttl=10, clock=clock)
+    cache.set("a", 1, expires_at=clock.now + 100)
+    cache.set("b", 2)
+
+    clock.now += 10
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+
+
+def test_already_expired_entry_not_stored():
+    """Test that entry expired before insertion is not kept"""
+    clock = FakeClock()
+    cache = LRUCache(10, clock=clock)
+    cache.set("a", 1)
+    cache.set("a", 2, expires_at=clock.now - 1)
+
+    assert "a" not in cache
+
+
+def test_stats():
+    """Test stats contain counters and sizes"""
+    cache = LRUCache(3)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("x")
+
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1, "maxsize": 3}
+
+
+
+def test_memory_cache_entry_expires_after_ttl():
+    """Test that entry set with ttl is not served after ttl passes while entry without ttl is"""
+    clock = FakeClock()
+    cache = MemoryCache(10, clock=clock)
+
+    async def run():
+        await cache.set("a", b"1", ttl=5)
+        await cache.set("b", b"2")
+        clock.now += 5
+        return await cache.get("a"), await cache.get("b")
+
+    assert asyncio.run(run()) == (None, b"2")
+
+
+def test_invalidated_task_list_pages_not_served():
+    """Test that pages of user are not served after invalidation while pages of others are"""
+    cache = TaskListCache(MemoryCache(10))
+    page = PaginatedTasksDTO(prev_page=0, next_page=0, tasks=[])
+
+    async def run():
+        for user_id in (1, 2):
+            await cache.set(user_id, await cache.generation(user_id), ("page",), page)
+        await cache.invalidate(1)
+        return (
+            await cache.get(1, await cache.generation(1), ("page",)),
+            await cache.get(2, await cache.generation(2), ("page",))
+        )
+
+    assert asyncio.run(run()) == (None, page)
+
+
+def test_task_list_generation_not_reused_after_eviction():
+    """Test that user whose generation was evicted gets new one and can not reach old pages"""
+    cache = TaskListCache(MemoryCache(3))
+    page = PaginatedTasksDTO(prev_page=0, next_page=0, tasks=[])
+
+    async def run():
+        generation = await cache.generation(1)
+        await cache.set(1, generation, ("page",), page)
+        for user_id in (2, 3):
+            await cache.generation(user_id)
+        return generation, await cache.generation(1)
+
+    old, new = asyncio.run(run())
+
+    assert old != new
+
+
+def test_failed_task_list_invalidation_kept_pending():
+    """Test that lists of user whose invalidation failed are not served from cache until deletion succeeds"""
+    backend = MemoryCache(10)
+    cache = TaskListCache(backend, retries=1, retry_delay=0)
+    page = PaginatedTasksDTO(prev_page=0, next_page=0, tasks=[])
+
+    async def run():
+        await cache.set(1, await cache.generation(1), ("page",), page)
+        with patch.object(backend, "delete", AsyncMock(side_effect=CacheUnavailableError("down"))) as delete:
+            await cache.invalidate(1)
+            attempts = delete.await_count
+            pending = await cache.get(1, await cache.generation(1), ("page",))
+        recovered = await cache.get(1, await cache.generation(1), ("page",))
+        return attempts, pending, recovered, await backend.get("task_lists:1")
+
+    attempts, pending, recovered, generation = asyncio.run(run())
+
+    assert attempts == 2
+    assert (pending, recovered) == (None, None)
+    assert generation is not None
+    assert cache.stats() == {"failed_invalidations": 1, "pending_invalidations": 0}
@@ -0,0 +1,20 @@
+import asyncio
+
+from unittest.mock import MagicMock, AsyncMock, patch
+
+from src.infra.db.counters import CounterRepair
+
+
+def test_repair_walks_batches_until_no_tasks_left():
+    """Test that each batch starts after the last id of previous one and fixed counts are summed"""
+    sessionmaker = MagicMock()
+    sessionmaker.return_value.__aenter__.return_value = MagicMock()
+    repair = CounterRepair(sessionmaker, batch_size=2)
+    recount = AsyncMock(side_effect=[(2, 1), (5, 0), (6, 2), (None, 0)])
+
+    with patch("src.infra.db.counters.AlchemyTaskRepository") as repo_class:
+        repo_class.return_value.recount_counters = recount
+        fixed = asyncio.run(repair.repair())
+
+    assert fixed == 3
+    assert [call.args for call in recount.await_args_list] == [(0, 2), (2, 2), (5, 2), (6, 2)]
@@ -0,0 +1,122 @@
+import time
+import pytest
+import jwt
+
+from unittest.mock import patch
+from datetime import datetime, timedelta, timezone
+from freezegun import freeze_time
+
+from src.infra.cache import LRUCache
+from src.infra.services import JWTAuthenticationService
+from src.infra.services.exceptions import JWTUnauthorizedError
+
+SECRET = "test_secret_key_of_recommended_length"
+
+
+def make_token(tg_name: str = "user", exp_in: int = 60, secret: str = SECRET, **claims) -> str:
+    return jwt.encode({"tg_name": tg_name, "exp": int(time.time()) + exp_in, **claims}, secret, "HS256")
+
+
+def test_get_tg_name_from_token_without_cache():
+    """Test that service works without cache"""
+    service = JWTAuthenticationService(SECRET)
+
+    assert service.get_tg_name_from_token(make_token("test_user")) == "test_user"
+
+
+def test_repeated_token_verified_once():
+    """Test that repeated token is served from cache without verification"""
+    cache = LRUCache(10)
+    service = JWTAuthenticationService(SECRET, cache)
+    token = make_token("test_user")
+
+    with patch("src.infra.services.jwt.jwt.decode", wraps=jwt.decode) as decode:
+        assert service.get_tg_name_from_token(token) == "test_user"
+        assert service.get_tg_name_from_token(token) == "test_user"
+        assert service.get_tg_name_from_token(token) == "test_user"
+
+    decode.assert_called_once()
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+
+def test_cache_key_is_token_digest():
+    """Test that raw token is not stored in cache"""
+    cache = LRUCache(10)
+    service = JWTAuthenticationService(SECRET, cache)
+    token = make_token()
+
+    service.decode(token)
+
+    assert token not in cache
+    assert token.encode() not in cache
+    assert len(cache) == 1
+
+
+def test_cached_entry_evicted_at_token_exp():
+    """Test that cached payload is not served after token expiration"""
+    cache = LRUCache(10)
+    service = JWTAuthenticationService(SECRET, cache)
+    token = make_token(exp_in=30)
+    service.decode(token)
+
+    with freeze_time(datetime.now(timezone.utc) + timedelta(seconds=31)):
+        with pytest.raises(JWTUnauthorizedError) as exc_info:
+            service.get_tg_name_from_token(token)
+
+    assert exc_info.value.status == 401
+
+
+def test_invalid_token_not_cached():
+    """Test that token with invalid signature is rejected and not cached"""
+    cache = LRUCache(10)
+    service = JWTAuthenticationService(SECRET, cache)
+
+    for _ in range(2):
+        with pytest.raises(JWTUnauthorizedError):
+            service.get_tg_name_from_token(make_token(secret="other_secret_key_of_recommended_length"))
+
+    assert len(cache) == 0
+
+
+def test_decoded_payload_copy_returned():
+    """Test that mutating returned payload does not affect cached one"""
+    service = JWTAuthenticationService(SECRET, LRUCache(10))
+    token = make_token("test_user")
+
+    service.decode(token)["tg_name"] = "changed"
+
+    assert service.get_tg_name_from_token(token) == "test_user"
+
+
+def test_uid_claim_ignored_when_not_trusted():
+    """Test that uid claim is not used unless stateless mode enabled"""
+    service = JWTAuthenticationService(SECRET)
+
+    assert service.get_user_id_from_token(make_token(uid=42)) is None
+
+
+def test_uid_claim_returned_when_trusted():
+    """Test that uid claim is returned in stateless mode"""
+    service = JWTAuthenticationService(SECRET, trust_uid=True)
+
+    assert service.get_user_id_from_token(make_token(uid=42)) == 42
+
+
+def test_token_without_uid_falls_back():
+    """Test that token without uid or with malformed uid gives no user id"""
+    service = JWTAuthenticationService(SECRET, trust_uid=True)
+
+    assert service.get_user_id_from_token(make_token()) is None
+    assert service.get_user_id_from_token(make_token(uid="42")) is None
+    assert service.get_user_id_from_token(make_token(uid=True)) is None
+
+
+def test_uid_from_invalid_token_rejected():
+    """Test that uid is not trusted if token signature invalid"""
+    service = JWTAuthenticationService(SECRET, trust_uid=True)
+
+    with pytest.raises(JWTUnauthorizedError) as exc_info:
+        service.get_user_id_from_token(make_token(uid=42, secret="other_secret_key_of_recommended_length"))
+
+    assert exc_info.value.status == 401
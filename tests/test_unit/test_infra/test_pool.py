@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+
+from unittest.mock import Mock
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from src.infra.db.pool import InstrumentedPool
+
+
+def run_in_pool(pool: InstrumentedPool, work):
+    return asyncio.run(greenlet_spawn(work, pool))
+
+
+def test_checkout_wait_observed():
+    """Test that each checkout is timed and saturation reflects checked out connections"""
+    pool = InstrumentedPool(Mock, pool_size=2, max_overflow=2)
+
+    def work(pool):
+        conns = [pool.connect() for _ in range(3)]
+        stats = pool.stats()
+        for conn in conns:
+            conn.close()
+        return stats
+
+    stats = run_in_pool(pool, work)
+
+    assert stats["checked_out"] == 3
+    assert stats["overflow"] == 1
+    assert stats["saturation"] == 0.75
+    assert stats["wait"]["count"] == 3
+    assert pool.stats()["checked_out"] == 0
+
+
+def test_checkout_timeout_counted():
+    """Test that checkout failed by timeout is counted and its wait observed"""
+    pool = InstrumentedPool(Mock, pool_size=1, max_overflow=0, timeout=0.05)
+
+    def work(pool):
+        conn = pool.connect()
+        try:
+            pool.connect()
+        finally:
+            conn.close()
+
+    with pytest.raises(exc.TimeoutError):
+        run_in_pool(pool, work)
+
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["wait"]["max"] >= 0.05
@@ -0,0 +1,29 @@
+import asyncio
+import pytest
+
+from unittest.mock import Mock, AsyncMock, patch
+
+from src.infra.db.purge import TombstonePurger
+
+
+def test_purge_stops_after_incomplete_batch():
+    """Test that batches are purged until one comes smaller than batch size"""
+    purger = TombstonePurger(Mock(), batch_size=2, interval=0)
+
+    with patch.object(purger, "purge_batch", AsyncMock(side_effect=[2, 2, 1, 2])) as purge_batch:
+        total = asyncio.run(purger.purge())
+
+    assert total == 5
+    assert purge_batch.await_count == 3
+
+
+def test_run_survives_failed_purge():
+    """Test that worker keeps running after error and purges on next round"""
+    purger = TombstonePurger(Mock(), batch_size=2, interval=0)
+    purge = AsyncMock(side_effect=[ValueError("db is down"), 0, asyncio.CancelledError()])
+
+    with patch.object(purger, "purge", purge):
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(purger.run())
+
+    assert purge.await_count == 3
@@ -0,0 +1,94 @@
+import asyncio
+
+from sqlalchemy import create_engine, text
+
+from src.infra.cache import MemoryCache
+from src.infra.db.routing import RoutingSession, PrimaryPins, USE_REPLICA, AUTOCOMMIT
+
+
+def make_engine(name: str):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE instance (name TEXT)"))
+        conn.execute(text("INSERT INTO instance VALUES (:name)"), {"name": name})
+    return engine
+
+
+def current_instance(session: RoutingSession) -> str:
+    return session.execute(text("SELECT name FROM instance")).scalar_one()
+
+
+def test_reads_routed_to_replica_by_flag():
+    """Test that statements go to replica only while flag set"""
+    session = RoutingSession(bind=make_engine("primary"), replicas=[make_engine("replica")])
+
+    assert current_instance(session) == "primary"
+    session.close()
+    session.info[USE_REPLICA] = True
+    assert current_instance(session) == "replica"
+    session.close()
+    session.info.pop(USE_REPLICA)
+    assert current_instance(session) == "primary"
+
+
+def test_without_replicas_primary_used():
+    """Test that flag is ignored if no replicas configured"""
+    session = RoutingSession(bind=make_engine("primary"))
+    session.info[USE_REPLICA] = True
+
+    assert not session.has_replica
+    assert current_instance(session) == "primary"
+
+
+def test_same_replica_used_within_session():
+    """Test that session sticks to one replica"""
+    replicas = [make_engine(f"replica{i}") for i in range(5)]
+    session = RoutingSession(bind=make_engine("primary"), replicas=replicas)
+    session.info[USE_REPLICA] = True
+
+    names = set()
+    for _ in range(10):
+        names.add(current_instance(session))
+        session.close()
+
+    assert len(names) == 1
+
+
+def test_autocommit_connection_taken_by_first_statement():
+    """Test that autocommit flag makes no connection until statement and the same one is used by later ones"""
+    session = RoutingSession(bind=make_engine("primary"))
+    session.info[AUTOCOMMIT] = True
+    session.begin()
+
+    assert session.get_bind() is session.get_bind()
+    assert not session.get_transaction()._connections  # type: ignore
+    assert current_instance(session) == "primary"
+    assert session.connection().get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+    session.commit()
+    session.info.pop(AUTOCOMMIT)
+
+    assert session.connection().get_execution_options().get("isolation_level") is None
+
+
+def test_client_pinned_within_window():
+    """Test that client is pinned to primary only for window after write"""
+    now = [100.0]
+    pins = PrimaryPins(MemoryCache(100, clock=lambda: now[0]), window=5)
+
+    asyncio.run(pins.pin("user"))
+    assert asyncio.run(pins.is_pinned("user"))
+    assert not asyncio.run(pins.is_pinned("other"))
+
+    now[0] += 6
+    assert not asyncio.run(pins.is_pinned("user"))
+
+
+def test_client_pinned_for_all_pins_sharing_cache():
+    """Test that pin made by one worker is seen by other worker using the same shared cache"""
+    shared = MemoryCache(100)
+    worker1 = PrimaryPins(shared, window=5)
+    worker2 = PrimaryPins(shared, window=5)
+
+    asyncio.run(worker1.pin("user"))
+
+    assert asyncio.run(worker2.is_pinned("user"))
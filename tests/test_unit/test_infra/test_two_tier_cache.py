@@ -0,0 +1,178 @@
+import asyncio
+import pytest
+
+from typing import Optional
+from unittest.mock import AsyncMock
+
+from src.infra.cache import MemoryCache, TwoTierCache, listener_dsn
+from src.infra.configs import DBConfig, AppConfig
+
+
+class FakeBus:
+    def __init__(self, connected: bool = True):
+        self.connected = connected
+        self.publish = AsyncMock()
+        self.subscribers = []
+
+    def subscribe(self, on_key, on_reset):
+        self.subscribers.append((on_key, on_reset))
+
+    def evict(self, key: str):
+        for on_key, _ in self.subscribers:
+            on_key(key)
+
+    def reset(self):
+        for _, on_reset in self.subscribers:
+            on_reset()
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(bus=None):
+    shared = MemoryCache(10)
+    return TwoTierCache(MemoryCache(10), shared, bus), shared  # type: ignore
+
+
+def test_value_from_shared_cache_served_locally():
+    """Test that value read from shared cache once is then served by local cache"""
+    cache, shared = make_cache(FakeBus())
+
+    async def run():
+        await shared.set("key", b"1")
+        values = [await cache.get("key") for _ in range(3)]
+        await shared.delete("key")
+        return values, await cache.get("key")
+
+    values, local = asyncio.run(run())
+
+    assert values == [b"1"] * 3
+    assert local == b"1"
+    assert shared.stats()["hits"] == 1
+
+
+def test_eviction_from_other_worker_drops_local_copy():
+    """Test that key evicted by bus is read from shared cache again"""
+    bus = FakeBus()
+    cache, shared = make_cache(bus)
+
+    async def run():
+        await cache.set("key", b"1")
+        await shared.set("key", b"2")
+        bus.evict("key")
+        return await cache.get("key")
+
+    assert asyncio.run(run()) == b"2"
+
+
+def test_delete_broadcast_to_other_workers():
+    """Test that deleted key is removed from both tiers and published by bus"""
+    bus = FakeBus()
+    cache, shared = make_cache(bus)
+
+    async def run():
+        await cache.set("key", b"1")
+        await cache.delete("key")
+        return await cache.get("key"), await shared.get("key")
+
+    assert asyncio.run(run()) == (None, None)
+    bus.publish.assert_awaited_once_with("key")
+
+
+def test_failed_broadcast_not_raised():
+    """Test that error of bus is counted and not raised, as value is already deleted from both tiers"""
+    bus = FakeBus()
+    bus.publish.side_effect = OSError("db is down")
+    cache, _ = make_cache(bus)
+
+    asyncio.run(cache.delete("key"))
+
+    assert cache.stats()["publish_errors"] == 1
+
+
+def test_local_cache_bypassed_while_bus_disconnected():
+    """Test that local cache is not used while evictions could be missed and is cleared on reconnect"""
+    bus = FakeBus()
+    cache, shared = make_cache(bus)
+
+    async def run():
+        await cache.set("key", b"1")
+        bus.connected = False
+        await shared.set("key", b"2")
+        while_disconnected = await cache.get("key")
+        bus.connected = True
+        bus.reset()
+        return while_disconnected, await cache.get("key")
+
+    assert asyncio.run(run()) == (b"2", b"2")
+    assert cache.stats()["bypassed"] == 1
+
+
+def test_value_evicted_during_shared_read_not_stored_locally():
+    """Test that value read from shared cache concurrently with eviction does not stay in local cache"""
+    bus = FakeBus()
+    cache, shared = make_cache(bus)
+    read = shared.get_with_ttl
+
+    async def get_and_evict(key: str):
+        value = await read(key)
+        await shared.delete(key)
+        bus.evict(key)
+        return value
+
+    async def run():
+        await shared.set("key", b"stale")
+        shared.get_with_ttl = get_and_evict  # type: ignore
+        first = await cache.get("key")
+        shared.get_with_ttl = read  # type: ignore
+        return first, await cache.get("key")
+
+    assert asyncio.run(run()) == (b"stale", None)
+
+
+def test_local_copy_expires_with_shared_value():
+    """Test that copy of shared value does not outlive it, so lost broadcast can not leave it stale forever"""
+    clock = FakeClock()
+    shared = MemoryCache(10, clock=clock)
+    cache = TwoTierCache(MemoryCache(10, clock=clock), shared, FakeBus())  # type: ignore
+
+    async def run():
+        await shared.set("key", b"1", ttl=5)
+        copied = await cache.get("key")
+        clock.now += 5
+        return copied, await cache.get("key")
+
+    assert asyncio.run(run()) == (b"1", None)
+
+def test_local_only_cache_without_bus():
+    """Test that without shared cache and bus values live in local cache of process"""
+    cache = TwoTierCache(MemoryCache(10))
+
+    async def run():
+        await cache.set("key", b"1", ttl=10)
+        value = await cache.get("key")
+        await cache.delete("key")
+        return value, await cache.get("key")
+
+    assert asyncio.run(run()) == (b"1", None)
+
+
+def make_configs(pgbouncer: bool, bus: bool, bus_url: Optional[str] = None):
+    db_config = DBConfig(
+        postgres_user="user", postgres_password="pass", postgres_db="db", postgres_host="pgbouncer", pgbouncer=pgbouncer
+    )
+    return db_config, AppConfig(secret="secret", cache_invalidation_bus=bus, cache_bus_url=bus_url)
+
+
+def test_listener_behind_pgbouncer_requires_direct_dsn():
+    """Test that bus refuses to listen through PgBouncer and uses direct dsn when it is given"""
+    with pytest.raises(ValueError):
+        listener_dsn(*make_configs(pgbouncer=True, bus=True))
+
+    assert listener_dsn(*make_configs(pgbouncer=True, bus=True, bus_url="postgresql://db")) == "postgresql://db"
+    assert listener_dsn(*make_configs(pgbouncer=False, bus=True)).endswith("@pgbouncer:5432/db")
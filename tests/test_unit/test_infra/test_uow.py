@@ -0,0 +1,281 @@
+import pytest
+import asyncio
+
+from unittest.mock import Mock, AsyncMock
+
+from src.infra.uow import AlchemyUoW, AlchemyReadOnlyUoW
+from src.infra.exc import RolledBackTransactionError
+from src.infra.db.routing import USE_REPLICA, AUTOCOMMIT
+
+
+def make_session():
+    session = Mock()
+    transaction = Mock()
+    transaction.commit = AsyncMock()
+    transaction.rollback = AsyncMock()
+    session.begin = AsyncMock(return_value=transaction)
+    session.flush = AsyncMock()
+    session.connection = AsyncMock()
+    session.in_transaction.return_value = False
+    session.info = {}
+    return session, transaction
+
+
+def test_block_commits_on_exit():
+    """Test that transaction is committed after each block by default"""
+    session, transaction = make_session()
+    uow = AlchemyUoW(session)
+
+    async def run():
+        async with uow:
+            pass
+        async with uow:
+            pass
+    asyncio.run(run())
+
+    assert session.begin.await_count == 2
+    assert transaction.commit.await_count == 2
+    assert uow.transactions == 2
+
+
+def test_nested_blocks_join_outer_transaction():
+    """Test that nested block does not open own transaction"""
+    session, transaction = make_session()
+    uow = AlchemyUoW(session)
+
+    async def run():
+        async with uow:
+            async with uow:
+                pass
+            transaction.commit.assert_not_awaited()
+    asyncio.run(run())
+
+    session.begin.assert_awaited_once()
+    transaction.commit.assert_awaited_once()
+
+
+def test_exception_rolls_back():
+    """Test that exception inside nested block rolls back the whole transaction"""
+    session, transaction = make_session()
+    uow = AlchemyUoW(session)
+
+    async def run():
+        async with uow:
+            async with uow:
+                raise ValueError("error")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+    transaction.rollback.assert_awaited_once()
+    transaction.commit.assert_not_awaited()
+
+
+def test_caught_nested_failure_fails_outer_block():
+    """Test that outer block catching exception of nested one neither commits nor opens new transaction"""
+    session, transaction = make_session()
+    uow = AlchemyUoW(session)
+
+    async def run():
+        with pytest.raises(RolledBackTransactionError):
+            async with uow:
+                with pytest.raises(ValueError):
+                    async with uow:
+                        raise ValueError("error")
+                with pytest.raises(RolledBackTransactionError):
+                    async with uow:
+                        pass
+        async with uow:
+            pass
+    asyncio.run(run())
+
+    transaction.rollback.assert_awaited_once()
+    # only the next independent block is committed
+    assert session.begin.await_count == 2
+    transaction.commit.assert_awaited_once()
+
+
+def test_request_scoped_caught_failure_fails_close():
+    """Test that request scoped transaction rolled back by caught failure of block is not reported as committed"""
+    session, transaction = make_session()
+    uow = AlchemyUoW(session, request_scoped=True)
+
+    async def run():
+        async with uow:
+            pass
+        with pytest.raises(ValueError):
+            async with uow:
+                raise ValueError("error")
+        with pytest.raises(RolledBackTransactionError):
+            await uow.close()
+    asyncio.run(run())
+
+    transaction.rollback.assert_awaited_once()
+    transaction.commit.assert_not_awaited()
+
+
+def test_request_scoped_blocks_share_transaction():
+    """Test that in request scoped mode blocks only flush and commit is done by close"""
+    session, transaction = make_session()
+    uow = AlchemyUoW(session, request_scoped=True)
+
+    async def run():
+        async with uow:
+            pass
+        async with uow:
+            pass
+        transaction.commit.assert_not_awaited()
+        await uow.close()
+    asyncio.run(run())
+
+    session.begin.assert_awaited_once()
+    assert session.flush.await_count == 2
+    transaction.commit.assert_awaited_once()
+    assert uow.transactions == 1
+
+
+def test_request_scoped_close_with_exception_rolls_back():
+    """Test that request failed outside of block rolls back deferred transaction"""
+    session, transaction = make_session()
+    uow = AlchemyUoW(session, request_scoped=True)
+
+    async def run():
+        async with uow:
+            pass
+        await uow.close(ValueError("error"))
+    asyncio.run(run())
+
+    transaction.rollback.assert_awaited_once()
+    transaction.commit.assert_not_awaited()
+
+
+def test_request_scoped_flush_error_rolls_back():
+    """Test that failed flush at the end of block rolls back and reraises"""
+    session, transaction = make_session()
+    session.flush.side_effect = ValueError("constraint violated")
+    uow = AlchemyUoW(session, request_scoped=True)
+
+    async def run():
+        async with uow:
+            pass
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+    transaction.rollback.assert_awaited_once()
+
+
+def test_close_without_transaction():
+    """Test that close does nothing if no transaction was opened"""
+    session, transaction = make_session()
+    uow = AlchemyUoW(session, request_scoped=True)
+
+    asyncio.run(uow.close())
+
+    session.begin.assert_not_awaited()
+    transaction.commit.assert_not_awaited()
+
+
+def test_read_only_block_uses_autocommit_connection():
+    """Test that read only block asks for autocommit connection without taking it and releases it on exit"""
+    session, transaction = make_session()
+    uow = AlchemyReadOnlyUoW(session)
+    seen = []
+
+    async def run():
+        async with uow:
+            async with uow:
+                seen.append(session.info.get(AUTOCOMMIT))
+    asyncio.run(run())
+
+    assert seen == [True]
+    assert AUTOCOMMIT not in session.info
+    session.begin.assert_awaited_once()
+    session.connection.assert_not_awaited()
+    transaction.commit.assert_awaited_once()
+
+
+def test_read_only_block_joins_open_transaction():
+    """Test that read only block does not touch transaction opened by someone else"""
+    session, transaction = make_session()
+    session.in_transaction.return_value = True
+    uow = AlchemyReadOnlyUoW(session)
+
+    async def run():
+        async with uow:
+            pass
+    asyncio.run(run())
+
+    session.begin.assert_not_awaited()
+    session.connection.assert_not_awaited()
+    transaction.commit.assert_not_awaited()
+
+
+def test_read_only_block_sets_replica_flag():
+    """Test that replica flag is set only for own transaction of read only block"""
+    session, transaction = make_session()
+    uow = AlchemyReadOnlyUoW(session, use_replica=True)
+    seen = []
+
+    async def run():
+        async with uow:
+            seen.append(session.info.get(USE_REPLICA))
+    asyncio.run(run())
+
+    assert seen == [True]
+    assert USE_REPLICA not in session.info
+
+
+def test_on_commit_called_after_commit_only():
+    """Test that commit callback is not called on rollback"""
+    session, transaction = make_session()
+    on_commit = AsyncMock()
+    uow = AlchemyUoW(session, on_commit=on_commit)
+
+    async def run():
+        async with uow:
+            pass
+        async with uow:
+            raise ValueError("error")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
+    on_commit.assert_awaited_once()
+
+
+def test_after_commit_callbacks_wait_for_deferred_commit():
+    """Test that registered callback is called once after commit by close and dropped on rollback"""
+    session, transaction = make_session()
+    uow = AlchemyUoW(session, request_scoped=True)
+    committed, rolled_back = AsyncMock(), AsyncMock()
+
+    async def run():
+        async with uow:
+            uow.after_commit(committed)
+        committed.assert_not_called()
+        await uow.close()
+        await uow.close()
+        async with uow:
+            uow.after_commit(rolled_back)
+        await uow.close(ValueError("error"))
+    asyncio.run(run())
+
+    committed.assert_awaited_once()
+    rolled_back.assert_not_awaited()
+
+
+def test_failed_after_commit_callback_does_not_break_committed_uow():
+    """Test that error of callback is not raised, as transaction is already committed, and other callbacks run"""
+    session, transaction = make_session()
+    uow = AlchemyUoW(session)
+    failed, committed = AsyncMock(side_effect=ConnectionError("cache is down")), AsyncMock()
+
+    async def run():
+        async with uow:
+            uow.after_commit(failed)
+            uow.after_commit(committed)
+    asyncio.run(run())
+
+    transaction.commit.assert_awaited_once()
+    committed.assert_awaited_once()
@@ -0,0 +1,59 @@
+import asyncio
+
+from unittest.mock import AsyncMock
+
+from src.domain.entities import User
+from src.infra.cache import MemoryCache
+from src.infra.repository import CachedUserRepository
+
+
+def test_id_lookup_cached_after_first_call():
+    """Test that second lookup of the same tg_name does not reach wrapped repository"""
+    inner = AsyncMock()
+    inner.get_id_by_tg_name.return_value = 42
+    cache = MemoryCache(10)
+    repo = CachedUserRepository(inner, cache)
+
+    assert asyncio.run(repo.get_id_by_tg_name("test_user")) == 42
+    assert asyncio.run(repo.get_id_by_tg_name("test_user")) == 42
+
+    inner.get_id_by_tg_name.assert_awaited_once_with("test_user")
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_unknown_user_not_cached():
+    """Test that missing user is looked up every time"""
+    inner = AsyncMock()
+    inner.get_id_by_tg_name.return_value = None
+    repo = CachedUserRepository(inner, MemoryCache(10))
+
+    assert asyncio.run(repo.get_id_by_tg_name("unknown")) is None
+    assert asyncio.run(repo.get_id_by_tg_name("unknown")) is None
+
+    assert inner.get_id_by_tg_name.await_count == 2
+
+
+def test_remembered_user_served_from_cache():
+    """Test that remembered user is resolved without wrapped repository"""
+    inner = AsyncMock()
+    repo = CachedUserRepository(inner, MemoryCache(10))
+    user = User("test_user")
+    user.id = 7
+
+    asyncio.run(repo.remember(user))
+
+    assert asyncio.run(repo.get_id_by_tg_name("test_user")) == 7
+    assert asyncio.run(repo.count_by_tg_name("test_user")) == 1
+    inner.get_id_by_tg_name.assert_not_awaited()
+    inner.count_by_tg_name.assert_not_awaited()
+
+
+def test_count_delegated_on_cache_miss():
+    """Test that count is delegated when user is not cached"""
+    inner = AsyncMock()
+    inner.count_by_tg_name.return_value = 0
+    repo = CachedUserRepository(inner, MemoryCache(10))
+
+    assert asyncio.run(repo.count_by_tg_name("test_user")) == 0
+    inner.count_by_tg_name.assert_awaited_once_with("test_user")
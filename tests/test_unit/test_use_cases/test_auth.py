@@ -278,6 +278,32 @@ def test_execute_repository_raises_exception():
     # Verify save was NOT called
     mock_uow.save.assert_not_called()
 
+
+def test_execute_registered_user_remembered():
+    """Test that registered user is passed to repository after transaction"""
+    # Arrange
+    mock_uow = AsyncMock()
+    mock_user_repo = AsyncMock()
+
+    async def aenter(self):
+        return mock_uow
+
+    async def aexit(self, *args):
+        return False
+    mock_uow.__aenter__ = aenter
+    mock_uow.__aexit__ = aexit
+    mock_user_repo.count_by_tg_name.return_value = 0
+
+    register_use_case = RegisterUser(mock_uow, mock_user_repo)
+
+    # Act
+    asyncio.run(register_use_case.execute(RegisterUserDTO(tg_name="test_user")))
+
+    # Assert
+    saved_user = mock_uow.save.call_args[0][0]
+    mock_user_repo.remember.assert_awaited_once_with(saved_user)
+
+
 # ================= test auth use case ==========================#
 
 
@@ -287,6 +313,7 @@ def test_execute_successful_authentication():
     mock_uow = AsyncMock()
     mock_user_repo = AsyncMock()
     mock_auth_service = Mock()  # Not async
+    mock_auth_service.get_user_id_from_token.return_value = None
 
     # Setup mocks
     valid_token = "valid_token_123"
@@ -294,7 +321,7 @@ def test_execute_successful_authentication():
     user_id = 42
 
     mock_auth_service.get_tg_name_from_token.return_value = tg_name
-    mock_user_repo.get_by_tg_name.return_value = Mock(id=user_id)
+    mock_user_repo.get_id_by_tg_name.return_value = user_id
 
     authenticate_use_case = AuthenticateUser(mock_uow, mock_user_repo, mock_auth_service)
 
@@ -303,7 +330,7 @@ def test_execute_successful_authentication():
 
     # Assert
     mock_auth_service.get_tg_name_from_token.assert_called_once_with(valid_token)
-    mock_user_repo.get_by_tg_name.assert_called_once_with(tg_name)
+    mock_user_repo.get_id_by_tg_name.assert_called_once_with(tg_name)
 
     assert result == user_id
 
@@ -314,6 +341,7 @@ def test_execute_no_token_raises_error():
     mock_uow = AsyncMock()
     mock_user_repo = AsyncMock()
     mock_auth_service = Mock()
+    mock_auth_service.get_user_id_from_token.return_value = None
 
     authenticate_use_case = AuthenticateUser(mock_uow, mock_user_repo, mock_auth_service)
 
@@ -326,7 +354,7 @@ def test_execute_no_token_raises_error():
 
     # Verify no other calls were made
     mock_auth_service.get_tg_name_from_token.assert_not_called()
-    mock_user_repo.get_by_tg_name.assert_not_called()
+    mock_user_repo.get_id_by_tg_name.assert_not_called()
 
 
 def test_execute_empty_token_raises_error():
@@ -335,6 +363,7 @@ def test_execute_empty_token_raises_error():
     mock_uow = AsyncMock()
     mock_user_repo = AsyncMock()
     mock_auth_service = Mock()
+    mock_auth_service.get_user_id_from_token.return_value = None
 
     authenticate_use_case = AuthenticateUser(mock_uow, mock_user_repo, mock_auth_service)
 
@@ -347,7 +376,7 @@ def test_execute_empty_token_raises_error():
 
     # Verify auth service was called but returned empty
     mock_auth_service.get_tg_name_from_token.assert_not_called()
-    mock_user_repo.get_by_tg_name.assert_not_called()
+    mock_user_repo.get_id_by_tg_name.assert_not_called()
 
 
 def test_execute_user_not_found_raises_error():
@@ -356,12 +385,13 @@ def test_execute_user_not_found_raises_error():
     mock_uow = AsyncMock()
     mock_user_repo = AsyncMock()
     mock_auth_service = Mock()
+    mock_auth_service.get_user_id_from_token.return_value = None
 
     valid_token = "valid_token"
     tg_name = "non_existent_user"
 
     mock_auth_service.get_tg_name_from_token.return_value = tg_name
-    mock_user_repo.get_by_tg_name.return_value = None
+    mock_user_repo.get_id_by_tg_name.return_value = None
 
     authenticate_use_case = AuthenticateUser(mock_uow, mock_user_repo, mock_auth_service)
 
@@ -373,7 +403,7 @@ def test_execute_user_not_found_raises_error():
     assert exc_info.value.status == 401
 
     mock_auth_service.get_tg_name_from_token.assert_called_once_with(valid_token)
-    mock_user_repo.get_by_tg_name.assert_called_once_with(tg_name)
+    mock_user_repo.get_id_by_tg_name.assert_called_once_with(tg_name)
 
 
 def test_execute_uow_context_manager_used():
@@ -382,12 +412,13 @@ def test_execute_uow_context_manager_used():
     mock_uow = AsyncMock()
     mock_user_repo = AsyncMock()
     mock_auth_service = Mock()
+    mock_auth_service.get_user_id_from_token.return_value = None
 
     valid_token = "valid_token"
     tg_name = "test_user"
 
     mock_auth_service.get_tg_name_from_token.return_value = tg_name
-    mock_user_repo.get_by_tg_name.return_value = Mock(id=1)
+    mock_user_repo.get_id_by_tg_name.return_value = 1
 
     authenticate_use_case = AuthenticateUser(mock_uow, mock_user_repo, mock_auth_service)
 
@@ -405,6 +436,7 @@ def test_execute_different_tg_names():
     mock_uow = AsyncMock()
     mock_user_repo = AsyncMock()
     mock_auth_service = Mock()
+    mock_auth_service.get_user_id_from_token.return_value = None
 
     test_cases = [
         ("token1", "user1", 1),
@@ -420,14 +452,14 @@ def test_execute_different_tg_names():
         mock_user_repo.reset_mock()
 
         mock_auth_service.get_tg_name_from_token.return_value = tg_name
-        mock_user_repo.get_by_tg_name.return_value = Mock(id=user_id)
+        mock_user_repo.get_id_by_tg_name.return_value = user_id
 
         # Act
         result = asyncio.run(authenticate_use_case.execute(token))
 
         # Assert
         mock_auth_service.get_tg_name_from_token.assert_called_once_with(token)
-        mock_user_repo.get_by_tg_name.assert_called_once_with(tg_name)
+        mock_user_repo.get_id_by_tg_name.assert_called_once_with(tg_name)
         assert result == user_id
 
 
@@ -437,12 +469,13 @@ def test_execute_repository_raises_exception():
     mock_uow = AsyncMock()
     mock_user_repo = AsyncMock()
     mock_auth_service = Mock()
+    mock_auth_service.get_user_id_from_token.return_value = None
 
     valid_token = "valid_token"
     tg_name = "test_user"
 
     mock_auth_service.get_tg_name_from_token.return_value = tg_name
-    mock_user_repo.get_by_tg_name.side_effect = Exception("Database error")
+    mock_user_repo.get_id_by_tg_name.side_effect = Exception("Database error")
 
     authenticate_use_case = AuthenticateUser(mock_uow, mock_user_repo, mock_auth_service)
 
@@ -452,7 +485,7 @@ def test_execute_repository_raises_exception():
 
     assert "Database error" in str(exc_info.value)
     mock_auth_service.get_tg_name_from_token.assert_called_once_with(valid_token)
-    mock_user_repo.get_by_tg_name.assert_called_once_with(tg_name)
+    mock_user_repo.get_id_by_tg_name.assert_called_once_with(tg_name)
 
 
 def test_execute_auth_service_raises_exception():
@@ -461,6 +494,7 @@ def test_execute_auth_service_raises_exception():
     mock_uow = AsyncMock()
     mock_user_repo = AsyncMock()
     mock_auth_service = Mock()
+    mock_auth_service.get_user_id_from_token.return_value = None
 
     valid_token = "valid_token"
     mock_auth_service.get_tg_name_from_token.side_effect = Exception("Token validation failed")
@@ -473,7 +507,28 @@ def test_execute_auth_service_raises_exception():
 
     assert "Token validation failed" in str(exc_info.value)
     mock_auth_service.get_tg_name_from_token.assert_called_once_with(valid_token)
-    mock_user_repo.get_by_tg_name.assert_not_called()
+    mock_user_repo.get_id_by_tg_name.assert_not_called()
+
+
+def test_execute_user_id_from_token_skips_lookup():
+    """Test that user id carried by token is returned without db lookup"""
+    # Arrange
+    mock_uow = AsyncMock()
+    mock_user_repo = AsyncMock()
+    mock_auth_service = Mock()
+    mock_auth_service.get_user_id_from_token.return_value = 42
+
+    authenticate_use_case = AuthenticateUser(mock_uow, mock_user_repo, mock_auth_service)
+
+    # Act
+    result = asyncio.run(authenticate_use_case.execute("valid_token"))
+
+    # Assert
+    assert result == 42
+    mock_auth_service.get_user_id_from_token.assert_called_once_with("valid_token")
+    mock_auth_service.get_tg_name_from_token.assert_not_called()
+    mock_user_repo.get_id_by_tg_name.assert_not_called()
+    mock_uow.__aenter__.assert_not_called()
 
 
 def test_execute_successful_authentication():
@@ -675,3 +730,144 @@ def test_execute_task_user_id_different_but_falsy():
 
     assert "User has no access the task" in str(exc_info.value)
     mock_task_repo.get_by_id.assert_called_once_with(task_id)
+
+# ================= test authenticate user as task owner use case ==========================#
+
+
+def test_owner_resolved_with_single_query():
+    """Test that user and task owner are resolved by one repository call"""
+    # Arrange
+    mock_uow = AsyncMock()
+    mock_task_repo = AsyncMock()
+    mock_auth_service = Mock()  # Not async
+    mock_auth_service.get_user_id_from_token.return_value = None
+    mock_auth_service.get_tg_name_from_token.return_value = "test_user"
+    mock_task_repo.get_user_and_owner_ids.return_value = (42, 42)
+
+    authenticate_use_case = AuthenticateUserAsTaskOwner(mock_uow, mock_task_repo, mock_auth_service)
+
+    # Act
+    result = asyncio.run(authenticate_use_case.execute("valid_token", 123))
+
+    # Assert
+    assert result == 42
+    mock_task_repo.get_user_and_owner_ids.assert_awaited_once_with("test_user", 123)
+    mock_task_repo.get_by_id.assert_not_called()
+    mock_uow.__aenter__.assert_called_once()
+
+
+def test_owner_no_token():
+    """Test that missing token gives 401 without db access"""
+    # Arrange
+    mock_uow = AsyncMock()
+    mock_task_repo = AsyncMock()
+    mock_auth_service = Mock()  # Not async
+    mock_auth_service.get_user_id_from_token.return_value = None
+    mock_auth_service.get_tg_name_from_token.return_value = "test_user"
+
+    authenticate_use_case = AuthenticateUserAsTaskOwner(mock_uow, mock_task_repo, mock_auth_service)
+
+    # Act & Assert
+    with pytest.raises(UndefinedUserError) as exc_info:
+        asyncio.run(authenticate_use_case.execute(None, 123))
+
+    assert exc_info.value.status == 401
+    mock_uow.__aenter__.assert_not_called()
+
+
+def test_owner_unknown_user():
+    """Test that unknown user gives 401"""
+    # Arrange
+    mock_uow = AsyncMock()
+    mock_task_repo = AsyncMock()
+    mock_auth_service = Mock()  # Not async
+    mock_auth_service.get_user_id_from_token.return_value = None
+    mock_auth_service.get_tg_name_from_token.return_value = "test_user"
+    mock_task_repo.get_user_and_owner_ids.return_value = None
+
+    authenticate_use_case = AuthenticateUserAsTaskOwner(mock_uow, mock_task_repo, mock_auth_service)
+
+    # Act & Assert
+    with pytest.raises(UndefinedUserError) as exc_info:
+        asyncio.run(authenticate_use_case.execute("valid_token", 123))
+
+    assert exc_info.value.status == 401
+
+
+def test_owner_task_not_found():
+    """Test that missing task gives 404"""
+    # Arrange
+    mock_uow = AsyncMock()
+    mock_task_repo = AsyncMock()
+    mock_auth_service = Mock()  # Not async
+    mock_auth_service.get_user_id_from_token.return_value = None
+    mock_auth_service.get_tg_name_from_token.return_value = "test_user"
+    mock_task_repo.get_user_and_owner_ids.return_value = (42, None)
+
+    authenticate_use_case = AuthenticateUserAsTaskOwner(mock_uow, mock_task_repo, mock_auth_service)
+
+    # Act & Assert
+    with pytest.raises(UndefinedTaskError) as exc_info:
+        asyncio.run(authenticate_use_case.execute("valid_token", 123))
+
+    assert exc_info.value.status == 404
+
+
+def test_owner_task_of_other_user():
+    """Test that task of other user gives 403"""
+    # Arrange
+    mock_uow = AsyncMock()
+    mock_task_repo = AsyncMock()
+    mock_auth_service = Mock()  # Not async
+    mock_auth_service.get_user_id_from_token.return_value = None
+    mock_auth_service.get_tg_name_from_token.return_value = "test_user"
+    mock_task_repo.get_user_and_owner_ids.return_value = (42, 99)
+
+    authenticate_use_case = AuthenticateUserAsTaskOwner(mock_uow, mock_task_repo, mock_auth_service)
+
+    # Act & Assert
+    with pytest.raises(HasNoAccessError) as exc_info:
+        asyncio.run(authenticate_use_case.execute("valid_token", 123))
+
+    assert exc_info.value.status == 403
+
+
+def test_owner_with_user_id_from_token():
+    """Test that only task owner is queried when token carries user id"""
+    # Arrange
+    mock_uow = AsyncMock()
+    mock_task_repo = AsyncMock()
+    mock_auth_service = Mock()  # Not async
+    mock_auth_service.get_user_id_from_token.return_value = 42
+    mock_auth_service.get_tg_name_from_token.return_value = "test_user"
+    mock_task_repo.get_owner_id.return_value = 42
+
+    authenticate_use_case = AuthenticateUserAsTaskOwner(mock_uow, mock_task_repo, mock_auth_service)
+
+    # Act
+    result = asyncio.run(authenticate_use_case.execute("valid_token", 123))
+
+    # Assert
+    assert result == 42
+    mock_task_repo.get_owner_id.assert_awaited_once_with(123)
+    mock_task_repo.get_user_and_owner_ids.assert_not_called()
+    mock_auth_service.get_tg_name_from_token.assert_not_called()
+
+
+def test_owner_with_user_id_from_token_task_not_found():
+    """Test that missing task gives 404 when token carries user id"""
+    # Arrange
+    mock_uow = AsyncMock()
+    mock_task_repo = AsyncMock()
+    mock_auth_service = Mock()  # Not async
+    mock_auth_service.get_user_id_from_token.return_value = 42
+    mock_auth_service.get_tg_name_from_token.return_value = "test_user"
+    mock_task_repo.get_owner_id.return_value = None
+
+    authenticate_use_case = AuthenticateUserAsTaskOwner(mock_uow, mock_task_repo, mock_auth_service)
+
+    # Act & Assert
+    with pytest.raises(UndefinedTaskError) as exc_info:
+        asyncio.run(authenticate_use_case.execute("valid_token", 123))
+
+    assert exc_info.value.status == 404
@@ -5,9 +5,16 @@ from unittest.mock import Mock, AsyncMock, patch
 from datetime import datetime, timezone, timedelta
 
 from src.application.use_cases.tasks import *
-from src.application.use_cases.exceptions import TaskAlreadyFinishedError, UndefinedTaskError
-from src.application.dto.task import TaskCreateDTO, TaskUpdateDTO
+from src.application.use_cases.exceptions import (
+    TaskAlreadyFinishedError,
+    UndefinedTaskError,
+    InvalidCursorError,
+    PageSizeLimitError
+)
+from src.application.dto.task import TaskCreateDTO, TaskUpdateDTO, TaskCursor
+from src.application.interfaces.repositories import TOTAL_COUNT_LIMIT
 from src.domain.entities import Task
+from src.infra.cache import MemoryCache, TaskListCache
 from src.domain.entities.exceptions import UnfinishedTaskError
 from src.domain.services.task import TaskProducerService, MAX_DEPTH, TaskPlannerManagerService
 from src.domain.services.exceptions import MaxDepthError, ParentFinishedError, InvalidDeadlineError
@@ -37,14 +44,14 @@ def test_execute_create_root_task_success():
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
 
-    create_use_case = CreateTask(mock_uow, mock_task_repo)
+    create_use_case = CreateTask(mock_uow, mock_task_repo, Mock())
 
     # Act
     result = asyncio.run(create_use_case.execute(user_id, dto))
 
     # Assert
-    # Should not call get_with_parents since parent_id is None
-    mock_task_repo.get_with_parents.assert_not_called()
+    # Should not call get_by_id since parent_id is None
+    mock_task_repo.get_by_id.assert_not_called()
     # Should save a task
     mock_uow.save.assert_called_once()
     saved_task = mock_uow.save.call_args[0][0]
@@ -85,15 +92,15 @@ def test_execute_create_subtask_success():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_with_parents.return_value = mock_parent
+    mock_task_repo.get_by_id.return_value = mock_parent
 
-    create_use_case = CreateTask(mock_uow, mock_task_repo)
+    create_use_case = CreateTask(mock_uow, mock_task_repo, Mock())
 
     # Act
     result = asyncio.run(create_use_case.execute(user_id, dto))
 
     # Assert
-    mock_task_repo.get_with_parents.assert_called_once_with(parent_id)
+    mock_task_repo.get_by_id.assert_called_once_with(parent_id)
     mock_uow.save.assert_called_once()
     saved_task = mock_uow.save.call_args[0][0]
     assert saved_task.parent is mock_parent
@@ -122,16 +129,16 @@ def test_execute_parent_not_found():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_with_parents.return_value = None
+    mock_task_repo.get_by_id.return_value = None
 
-    create_use_case = CreateTask(mock_uow, mock_task_repo)
+    create_use_case = CreateTask(mock_uow, mock_task_repo, Mock())
 
     # Act & Assert
     with pytest.raises(UndefinedTaskError) as exc_info:
         asyncio.run(create_use_case.execute(user_id, dto))
 
     assert "Unable to bind to unexistent parent task" in str(exc_info.value)
-    mock_task_repo.get_with_parents.assert_called_once_with(parent_id)
+    mock_task_repo.get_by_id.assert_called_once_with(parent_id)
     mock_uow.save.assert_not_called()
 
 
@@ -164,16 +171,16 @@ def test_execute_parent_exceeds_max_depth():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_with_parents.return_value = mock_parent
+    mock_task_repo.get_by_id.return_value = mock_parent
 
-    create_use_case = CreateTask(mock_uow, mock_task_repo)
+    create_use_case = CreateTask(mock_uow, mock_task_repo, Mock())
 
     # Act & Assert
     with pytest.raises(MaxDepthError) as exc_info:
         asyncio.run(create_use_case.execute(user_id, dto))
 
     assert f"Depth of task tree couldn't be more than {MAX_DEPTH}" in str(exc_info.value)
-    mock_task_repo.get_with_parents.assert_called_once_with(parent_id)
+    mock_task_repo.get_by_id.assert_called_once_with(parent_id)
     mock_uow.save.assert_not_called()
 
 
@@ -206,16 +213,16 @@ def test_execute_parent_is_done():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_with_parents.return_value = mock_parent
+    mock_task_repo.get_by_id.return_value = mock_parent
 
-    create_use_case = CreateTask(mock_uow, mock_task_repo)
+    create_use_case = CreateTask(mock_uow, mock_task_repo, Mock())
 
     # Act & Assert
     with pytest.raises(ParentFinishedError) as exc_info:
         asyncio.run(create_use_case.execute(user_id, dto))
 
     assert "Unable to create subtasks of fnished parent task" in str(exc_info.value)
-    mock_task_repo.get_with_parents.assert_called_once_with(parent_id)
+    mock_task_repo.get_by_id.assert_called_once_with(parent_id)
     mock_uow.save.assert_not_called()
 
 
@@ -248,9 +255,9 @@ def test_execute_subtask_deadline_exceeds_parent():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_with_parents.return_value = mock_parent
+    mock_task_repo.get_by_id.return_value = mock_parent
 
-    create_use_case = CreateTask(mock_uow, mock_task_repo)
+    create_use_case = CreateTask(mock_uow, mock_task_repo, Mock())
 
     # Act & Assert
     with pytest.raises(InvalidDeadlineError) as exc_info:
@@ -258,7 +265,7 @@ def test_execute_subtask_deadline_exceeds_parent():
 
     assert "Deadline of creating task cannot be later than deadline of parent task" in str(
         exc_info.value)
-    mock_task_repo.get_with_parents.assert_called_once_with(parent_id)
+    mock_task_repo.get_by_id.assert_called_once_with(parent_id)
     mock_uow.save.assert_not_called()
 
 
@@ -285,14 +292,14 @@ def test_execute_past_deadline():
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
 
-    create_use_case = CreateTask(mock_uow, mock_task_repo)
+    create_use_case = CreateTask(mock_uow, mock_task_repo, Mock())
 
     # Act & Assert
     with pytest.raises(InvalidDeadlineError) as exc_info:
         asyncio.run(create_use_case.execute(user_id, dto))
 
     assert "Deadline cannot be less or equal than now" in str(exc_info.value)
-    mock_task_repo.get_with_parents.assert_not_called()
+    mock_task_repo.get_by_id.assert_not_called()
     mock_uow.save.assert_not_called()
 
 
@@ -320,14 +327,14 @@ def test_execute_current_deadline():
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
 
-    create_use_case = CreateTask(mock_uow, mock_task_repo)
+    create_use_case = CreateTask(mock_uow, mock_task_repo, Mock())
 
     # Act & Assert
     with pytest.raises(InvalidDeadlineError) as exc_info:
         asyncio.run(create_use_case.execute(user_id, dto))
 
     assert "Deadline cannot be less or equal than now" in str(exc_info.value)
-    mock_task_repo.get_with_parents.assert_not_called()
+    mock_task_repo.get_by_id.assert_not_called()
     mock_uow.save.assert_not_called()
 
 
@@ -354,16 +361,16 @@ def test_execute_repository_raises_exception():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_with_parents.side_effect = Exception("Database error")
+    mock_task_repo.get_by_id.side_effect = Exception("Database error")
 
-    create_use_case = CreateTask(mock_uow, mock_task_repo)
+    create_use_case = CreateTask(mock_uow, mock_task_repo, Mock())
 
     # Act & Assert
     with pytest.raises(Exception) as exc_info:
         asyncio.run(create_use_case.execute(user_id, dto))
 
     assert "Database error" in str(exc_info.value)
-    mock_task_repo.get_with_parents.assert_called_once_with(parent_id)
+    mock_task_repo.get_by_id.assert_called_once_with(parent_id)
     mock_uow.save.assert_not_called()
 
 
@@ -390,7 +397,7 @@ def test_execute_task_producer_service_used():
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
 
-    create_use_case = CreateTask(mock_uow, mock_task_repo)
+    create_use_case = CreateTask(mock_uow, mock_task_repo, Mock())
 
     # Act
     with patch.object(TaskProducerService, 'create_task') as mock_create_task:
@@ -436,15 +443,17 @@ def test_execute_update_title_only():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_with_parent_and_subs.return_value = mock_task
+    mock_task_repo.get_by_id.return_value = mock_task
 
-    update_use_case = UpdateTask(mock_uow, mock_task_repo)
+    update_use_case = UpdateTask(mock_uow, mock_task_repo, Mock())
 
     # Act
     result = asyncio.run(update_use_case.execute(task_id, dto))
 
     # Assert
-    mock_task_repo.get_with_parent_and_subs.assert_called_once_with(task_id)
+    mock_task_repo.get_by_id.assert_called_once_with(task_id)
+    # tree is not touched without deadline
+    mock_task_repo.get_deadline_bounds.assert_not_called()
     assert mock_task.title == "Updated Title"
     assert mock_task.description == "Original Description"  # Unchanged
 
@@ -474,15 +483,15 @@ def test_execute_update_description_only():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_with_parent_and_subs.return_value = mock_task
+    mock_task_repo.get_by_id.return_value = mock_task
 
-    update_use_case = UpdateTask(mock_uow, mock_task_repo)
+    update_use_case = UpdateTask(mock_uow, mock_task_repo, Mock())
 
     # Act
     result = asyncio.run(update_use_case.execute(task_id, dto))
 
     # Assert
-    mock_task_repo.get_with_parent_and_subs.assert_called_once_with(task_id)
+    mock_task_repo.get_by_id.assert_called_once_with(task_id)
     assert mock_task.title == "Original Title"  # Unchanged
     assert mock_task.description == "Updated Description"
 
@@ -514,16 +523,17 @@ def test_execute_update_deadline_only():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_with_parent_and_subs.return_value = mock_task
+    mock_task_repo.get_by_id.return_value = mock_task
 
-    update_use_case = UpdateTask(mock_uow, mock_task_repo)
+    update_use_case = UpdateTask(mock_uow, mock_task_repo, Mock())
 
     # Act
     with patch.object(TaskPlannerManagerService, 'set_deadline') as mock_set_deadline:
         asyncio.run(update_use_case.execute(task_id, dto))
 
         # Assert
-        mock_task_repo.get_with_parent_and_subs.assert_called_once_with(task_id)
+        mock_task_repo.get_by_id.assert_called_once_with(task_id)
+        mock_task_repo.get_deadline_bounds.assert_awaited_once_with(task_id)
         mock_set_deadline.assert_called_once_with(new_deadline)
         assert mock_task.title == "Original Title"
         assert mock_task.description == "Original Description"
@@ -556,16 +566,16 @@ def test_execute_update_all_fields():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_with_parent_and_subs.return_value = mock_task
+    mock_task_repo.get_by_id.return_value = mock_task
 
-    update_use_case = UpdateTask(mock_uow, mock_task_repo)
+    update_use_case = UpdateTask(mock_uow, mock_task_repo, Mock())
 
     # Act
     with patch.object(TaskPlannerManagerService, 'set_deadline') as mock_set_deadline:
         asyncio.run(update_use_case.execute(task_id, dto))
 
         # Assert
-        mock_task_repo.get_with_parent_and_subs.assert_called_once_with(task_id)
+        mock_task_repo.get_by_id.assert_called_once_with(task_id)
         assert mock_task.title == "New Title"
         assert mock_task.description == "New Description"
         mock_set_deadline.assert_called_once_with(new_deadline)
@@ -597,9 +607,9 @@ def test_execute_manager_raises_invalid_deadline():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_with_parent_and_subs.return_value = mock_task
+    mock_task_repo.get_by_id.return_value = mock_task
 
-    update_use_case = UpdateTask(mock_uow, mock_task_repo)
+    update_use_case = UpdateTask(mock_uow, mock_task_repo, Mock())
 
     # Mock TaskPlannerManagerService to raise error
     with patch.object(TaskPlannerManagerService, 'set_deadline',
@@ -609,7 +619,7 @@ def test_execute_manager_raises_invalid_deadline():
             asyncio.run(update_use_case.execute(task_id, dto))
 
         assert "Deadline cannot be in past" in str(exc_info.value)
-        mock_task_repo.get_with_parent_and_subs.assert_called_once_with(task_id)
+        mock_task_repo.get_by_id.assert_called_once_with(task_id)
 
 
 def test_execute_no_fields_to_update():
@@ -638,15 +648,15 @@ def test_execute_no_fields_to_update():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_with_parent_and_subs.return_value = mock_task
+    mock_task_repo.get_by_id.return_value = mock_task
 
-    update_use_case = UpdateTask(mock_uow, mock_task_repo)
+    update_use_case = UpdateTask(mock_uow, mock_task_repo, Mock())
 
     # Act
     result = asyncio.run(update_use_case.execute(task_id, dto))
 
     # Assert
-    mock_task_repo.get_with_parent_and_subs.assert_called_once_with(task_id)
+    mock_task_repo.get_by_id.assert_called_once_with(task_id)
     assert mock_task.title == "Original Title"
     assert mock_task.description == "Original Description"
 
@@ -688,16 +698,16 @@ def test_execute_partial_updates():
 
         mock_uow.__aenter__ = aenter
         mock_uow.__aexit__ = aexit
-        mock_task_repo.get_with_parent_and_subs.return_value = mock_task
+        mock_task_repo.get_by_id.return_value = mock_task
 
-        update_use_case = UpdateTask(mock_uow, mock_task_repo)
+        update_use_case = UpdateTask(mock_uow, mock_task_repo, Mock())
 
         # Act
         with patch.object(TaskPlannerManagerService, 'set_deadline') as mock_set_deadline:
             asyncio.run(update_use_case.execute(task_id, dto))
 
             # Assert
-            mock_task_repo.get_with_parent_and_subs.assert_called_once_with(task_id)
+            mock_task_repo.get_by_id.assert_called_once_with(task_id)
 
             if title:
                 assert mock_task.title == title
@@ -750,9 +760,9 @@ def test_execute_uow_aexit_returns_false_on_exception():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_with_parent_and_subs.side_effect = Exception("DB error")
+    mock_task_repo.get_by_id.side_effect = Exception("DB error")
 
-    update_use_case = UpdateTask(mock_uow, mock_task_repo)
+    update_use_case = UpdateTask(mock_uow, mock_task_repo, Mock())
 
     # Act & Assert
     with pytest.raises(Exception) as exc_info:
@@ -788,15 +798,15 @@ def test_finish_task_success():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_task_tree.return_value = task
+    mock_task_repo.get_by_id.return_value = task
 
-    finish_use_case = FinishTask(mock_uow, mock_task_repo)
+    finish_use_case = FinishTask(mock_uow, mock_task_repo, Mock())
 
     # Act
     result = asyncio.run(finish_use_case.execute(task_id))
 
     # Assert
-    mock_task_repo.get_task_tree.assert_called_once_with(task_id)
+    mock_task_repo.get_by_id.assert_called_once_with(task_id)
     assert task.is_done == True
     assert task._pass_date is not None
 
@@ -820,16 +830,16 @@ def test_finish_task_already_finished():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_task_tree.return_value = task
+    mock_task_repo.get_by_id.return_value = task
 
-    finish_use_case = FinishTask(mock_uow, mock_task_repo)
+    finish_use_case = FinishTask(mock_uow, mock_task_repo, Mock())
 
     # Act & Assert
     with pytest.raises(TaskAlreadyFinishedError) as exc_info:
         asyncio.run(finish_use_case.execute(task_id))
 
     assert "Task already finished" in str(exc_info.value)
-    mock_task_repo.get_task_tree.assert_called_once_with(task_id)
+    mock_task_repo.get_by_id.assert_called_once_with(task_id)
 
 
 def test_finish_task_with_unfinished_subtasks():
@@ -855,16 +865,19 @@ def test_finish_task_with_unfinished_subtasks():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_task_tree.return_value = task
+    # one of descendants is unfinished
+    task.descendants = 2
+    task.finished_descendants = 1
+    mock_task_repo.get_by_id.return_value = task
 
-    finish_use_case = FinishTask(mock_uow, mock_task_repo)
+    finish_use_case = FinishTask(mock_uow, mock_task_repo, Mock())
 
     # Act & Assert
     with pytest.raises(UnfinishedTaskError) as exc_info:
         asyncio.run(finish_use_case.execute(task_id))
 
     assert "Unable finish task while subtasks not fininshed" in str(exc_info.value)
-    mock_task_repo.get_task_tree.assert_called_once_with(task_id)
+    mock_task_repo.get_by_id.assert_called_once_with(task_id)
     assert task.is_done == False  # Should not be marked as done
 
 
@@ -896,16 +909,19 @@ def test_finish_task_nested_subtasks_unfinished():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_task_tree.return_value = task
+    # one of descendants is unfinished
+    task.descendants = 2
+    task.finished_descendants = 1
+    mock_task_repo.get_by_id.return_value = task
 
-    finish_use_case = FinishTask(mock_uow, mock_task_repo)
+    finish_use_case = FinishTask(mock_uow, mock_task_repo, Mock())
 
     # Act & Assert
     with pytest.raises(UnfinishedTaskError) as exc_info:
         asyncio.run(finish_use_case.execute(task_id))
 
     assert "Unable finish task while subtasks not fininshed" in str(exc_info.value)
-    mock_task_repo.get_task_tree.assert_called_once_with(task_id)
+    mock_task_repo.get_by_id.assert_called_once_with(task_id)
     assert task.is_done == False
 
 
@@ -917,16 +933,6 @@ def test_force_finish_task_success():
 
     task_id = 123
 
-    # Create task with unfinished subtasks (should still work with force)
-    subtask1 = Task("Subtask 1", datetime.now(timezone.utc) + timedelta(days=1), user_id=1, description="")
-    # Not marked as done
-
-    subtask2 = Task("Subtask 2", datetime.now(timezone.utc) + timedelta(days=2), user_id=1, description="")
-    subtask2._pass_date = datetime.now(timezone.utc)  # Already done
-
-    task = Task("Main Task", datetime.now(timezone.utc) + timedelta(days=3), user_id=1, description="")
-    task.subtasks = [subtask1, subtask2]
-
     async def aenter(self):
         return mock_uow
 
@@ -935,20 +941,18 @@ def test_force_finish_task_success():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_task_tree.return_value = task
+    # unfinished subtasks are marked along with the task
+    mock_task_repo.finish_subtree.return_value = [123, 124, 125]
 
-    force_finish_use_case = ForceFinishTask(mock_uow, mock_task_repo)
+    force_finish_use_case = ForceFinishTask(mock_uow, mock_task_repo, Mock())
 
     # Act
-    result = asyncio.run(force_finish_use_case.execute(task_id))
+    result = asyncio.run(force_finish_use_case.execute(1, task_id))
 
     # Assert
-    mock_task_repo.get_task_tree.assert_called_once_with(task_id)
-    assert task.is_done == True
-    assert task._pass_date is not None
-    # All subtasks should be force marked as done
-    assert subtask1.is_done == True
-    assert subtask2.is_done == True  # Was already done, still True
+    mock_task_repo.finish_subtree.assert_awaited_once_with(task_id)
+    mock_task_repo.get_task_tree.assert_not_called()
+    assert result == [124, 125]
 
 
 def test_force_finish_task_already_finished():
@@ -959,9 +963,6 @@ def test_force_finish_task_already_finished():
 
     task_id = 123
 
-    task = Task("Main Task", datetime.now(timezone.utc) + timedelta(days=1), user_id=1, description="")
-    task._pass_date = datetime.now(timezone.utc)  # Already done
-
     async def aenter(self):
         return mock_uow
 
@@ -970,38 +971,27 @@ def test_force_finish_task_already_finished():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_task_tree.return_value = task
+    # nothing is marked if the task is already done
+    mock_task_repo.finish_subtree.return_value = []
 
-    force_finish_use_case = ForceFinishTask(mock_uow, mock_task_repo)
+    force_finish_use_case = ForceFinishTask(mock_uow, mock_task_repo, Mock())
 
     # Act & Assert
     with pytest.raises(TaskAlreadyFinishedError) as exc_info:
-        asyncio.run(force_finish_use_case.execute(task_id))
+        asyncio.run(force_finish_use_case.execute(1, task_id))
 
     assert "Task already finished" in str(exc_info.value)
-    mock_task_repo.get_task_tree.assert_called_once_with(task_id)
+    mock_task_repo.finish_subtree.assert_awaited_once_with(task_id)
 
 
 def test_force_finish_task_nested_subtasks():
-    """Test force finishing propagates to nested subtasks"""
+    """Test force finishing returns only newly finished nested subtasks and repeated call raises error"""
     # Arrange
     mock_uow = Mock()
     mock_task_repo = AsyncMock()
 
     task_id = 123
 
-    # Create deep nested structure
-    deep_nested = Task("Deep Nested", datetime.now(timezone.utc) + timedelta(days=1), user_id=1, description="")
-
-    nested = Task("Nested", datetime.now(timezone.utc) + timedelta(days=2), user_id=1, description="")
-    nested.subtasks = [deep_nested]
-
-    subtask = Task("Subtask", datetime.now(timezone.utc) + timedelta(days=3), user_id=1, description="")
-    subtask.subtasks = [nested]
-
-    task = Task("Main Task", datetime.now(timezone.utc) + timedelta(days=4), user_id=1, description="")
-    task.subtasks = [subtask]
-
     async def aenter(self):
         return mock_uow
 
@@ -1010,19 +1000,19 @@ def test_force_finish_task_nested_subtasks():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_task_tree.return_value = task
+    # subtask 124 with nested 125 and deep nested 126 are marked, subtask finished earlier is not returned
+    mock_task_repo.finish_subtree.side_effect = [[123, 124, 125, 126], []]
 
-    force_finish_use_case = ForceFinishTask(mock_uow, mock_task_repo)
+    force_finish_use_case = ForceFinishTask(mock_uow, mock_task_repo, Mock())
 
     # Act
-    result = asyncio.run(force_finish_use_case.execute(task_id))
+    result = asyncio.run(force_finish_use_case.execute(1, task_id))
 
     # Assert
-    mock_task_repo.get_task_tree.assert_called_once_with(task_id)
-    assert task.is_done == True
-    assert subtask.is_done == True
-    assert nested.is_done == True
-    assert deep_nested.is_done == True
+    assert result == [124, 125, 126]
+    with pytest.raises(TaskAlreadyFinishedError):
+        asyncio.run(force_finish_use_case.execute(1, task_id))
+    assert mock_task_repo.finish_subtree.await_count == 2
 
 
 def test_finish_task_no_subtasks():
@@ -1044,15 +1034,15 @@ def test_finish_task_no_subtasks():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_task_tree.return_value = task
+    mock_task_repo.get_by_id.return_value = task
 
-    finish_use_case = FinishTask(mock_uow, mock_task_repo)
+    finish_use_case = FinishTask(mock_uow, mock_task_repo, Mock())
 
     # Act
     result = asyncio.run(finish_use_case.execute(task_id))
 
     # Assert
-    mock_task_repo.get_task_tree.assert_called_once_with(task_id)
+    mock_task_repo.get_by_id.assert_called_once_with(task_id)
     assert task.is_done == True
     assert task._pass_date is not None
 
@@ -1065,9 +1055,6 @@ def test_force_finish_task_no_subtasks():
 
     task_id = 123
 
-    task = Task("Main Task", datetime.now(timezone.utc) + timedelta(days=1), user_id=1, description="")
-    task.subtasks = []  # No subtasks
-
     async def aenter(self):
         return mock_uow
 
@@ -1076,17 +1063,16 @@ def test_force_finish_task_no_subtasks():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_task_tree.return_value = task
+    mock_task_repo.finish_subtree.return_value = [task_id]
 
-    force_finish_use_case = ForceFinishTask(mock_uow, mock_task_repo)
+    force_finish_use_case = ForceFinishTask(mock_uow, mock_task_repo, Mock())
 
     # Act
-    result = asyncio.run(force_finish_use_case.execute(task_id))
+    result = asyncio.run(force_finish_use_case.execute(1, task_id))
 
     # Assert
-    mock_task_repo.get_task_tree.assert_called_once_with(task_id)
-    assert task.is_done == True
-    assert task._pass_date is not None
+    mock_task_repo.finish_subtree.assert_awaited_once_with(task_id)
+    assert result == []
 
 
 def test_uow_exception_propagation():
@@ -1113,14 +1099,341 @@ def test_uow_exception_propagation():
 
     mock_uow.__aenter__ = aenter
     mock_uow.__aexit__ = aexit
-    mock_task_repo.get_task_tree.return_value = task
+    # one of descendants is unfinished
+    task.descendants = 2
+    task.finished_descendants = 1
+    mock_task_repo.get_by_id.return_value = task
 
-    finish_use_case = FinishTask(mock_uow, mock_task_repo)
+    finish_use_case = FinishTask(mock_uow, mock_task_repo, Mock())
 
     # Act & Assert
     with pytest.raises(UnfinishedTaskError) as exc_info:
         asyncio.run(finish_use_case.execute(task_id))
 
     assert "Unable finish task while subtasks not fininshed" in str(exc_info.value)
-    mock_task_repo.get_task_tree.assert_called_once_with(task_id)
+    mock_task_repo.get_by_id.assert_called_once_with(task_id)
     assert task.is_done == False
+
+
+def test_delete_task_returns_deleted_subtask_ids():
+    """Test that deletion is done by one repository call which reports deleted subtasks"""
+    # Arrange
+    mock_uow = Mock()
+    mock_uow.__aenter__ = AsyncMock(return_value=mock_uow)
+    mock_uow.__aexit__ = AsyncMock(return_value=False)
+    mock_task_repo = AsyncMock()
+    mock_task_repo.delete_task.return_value = [124, 125]
+
+    # Act
+    result = asyncio.run(DeleteTask(mock_uow, mock_task_repo, Mock(), False).execute(1, 123))
+
+    # Assert
+    mock_task_repo.delete_task.assert_awaited_once_with(123)
+    mock_task_repo.get_all_subtask_ids.assert_not_called()
+    assert result == [124, 125]
+
+
+def test_deferred_delete_task_only_hides_subtree():
+    """Test that in deferred mode task is tombstoned instead of being deleted"""
+    # Arrange
+    mock_uow = Mock()
+    mock_uow.__aenter__ = AsyncMock(return_value=mock_uow)
+    mock_uow.__aexit__ = AsyncMock(return_value=False)
+    mock_task_repo = AsyncMock()
+    mock_task_repo.tombstone_task.return_value = [124]
+
+    # Act
+    result = asyncio.run(DeleteTask(mock_uow, mock_task_repo, Mock(), True).execute(1, 123))
+
+    # Assert
+    mock_task_repo.tombstone_task.assert_awaited_once_with(123)
+    mock_task_repo.delete_task.assert_not_called()
+    assert result == [124]
+
+
+def test_cursor_roundtrip():
+    """Test that decoded cursor equals encoded one"""
+    # Arrange
+    cursor = TaskCursor(creation_date=datetime(2026, 1, 1, tzinfo=timezone.utc), id=10, backward=True)
+
+    # Act & Assert
+    assert TaskCursor.decode(cursor.encode()) == cursor
+
+
+def test_show_tasks_by_page_returns_cursors():
+    """Test that numbered page also provides cursors of its edges"""
+    # Arrange
+    mock_uow = Mock()
+    mock_uow.__aenter__ = AsyncMock(return_value=mock_uow)
+    mock_uow.__aexit__ = AsyncMock(return_value=False)
+    mock_cache = AsyncMock()
+    mock_cache.get.return_value = None
+    tasks = []
+    for i in range(3, 0, -1):
+        task = Task(f"Task {i}", datetime.now(timezone.utc) + timedelta(days=1), user_id=1, description="")
+        task.id = i
+        task.creation_date = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+        tasks.append(task)
+    mock_task_repo = AsyncMock()
+    mock_task_repo.get_tasks.return_value = (1, 3, tasks, None)
+
+    # Act
+    result = asyncio.run(ShowTasks(mock_uow, mock_task_repo, 100, mock_cache).execute(
+        1, "active", page=2, size=3
+    ))
+
+    # Assert
+    mock_task_repo.get_tasks.assert_awaited_once_with(1, "active", page=2, size=3, include_total=False)
+    mock_task_repo.get_tasks_by_cursor.assert_not_called()
+    assert (result.prev_page, result.next_page) == (1, 3)
+    assert [t.id for t in result.tasks] == [3, 2, 1]
+    assert TaskCursor.decode(result.next_cursor) == TaskCursor.from_task(tasks[-1])
+    assert TaskCursor.decode(result.prev_cursor) == TaskCursor.from_task(tasks[0], backward=True)
+    assert result.total is None
+
+
+def test_show_tasks_by_cursor():
+    """Test that cursor is passed to repository as key and direction"""
+    # Arrange
+    mock_uow = Mock()
+    mock_uow.__aenter__ = AsyncMock(return_value=mock_uow)
+    mock_uow.__aexit__ = AsyncMock(return_value=False)
+    mock_cache = AsyncMock()
+    mock_cache.get.return_value = None
+    tasks = []
+    for i in range(2, 0, -1):
+        task = Task(f"Task {i}", datetime.now(timezone.utc) + timedelta(days=1), user_id=1, description="")
+        task.id = i
+        task.creation_date = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+        tasks.append(task)
+    mock_task_repo = AsyncMock()
+    mock_task_repo.get_tasks_by_cursor.return_value = (True, False, tasks, None)
+    cursor = TaskCursor(creation_date=datetime(2026, 1, 2, tzinfo=timezone.utc), id=7)
+
+    # Act
+    result = asyncio.run(ShowTasks(mock_uow, mock_task_repo, 100, mock_cache).execute(
+        1, "finished", size=2, cursor=cursor.encode()
+    ))
+
+    # Assert
+    mock_task_repo.get_tasks_by_cursor.assert_awaited_once_with(
+        1, "finished", key=(cursor.creation_date, 7), backward=False, size=2, include_total=False
+    )
+    mock_task_repo.get_tasks.assert_not_called()
+    assert result.next_cursor is None
+    assert result.prev_cursor is not None
+    assert (result.prev_page, result.next_page) == (0, 0)
+
+
+def test_show_tasks_total_capped():
+    """Test that total of list longer than the limit is reported as the limit with capped flag"""
+    # Arrange
+    mock_uow = Mock()
+    mock_uow.__aenter__ = AsyncMock(return_value=mock_uow)
+    mock_uow.__aexit__ = AsyncMock(return_value=False)
+    mock_cache = AsyncMock()
+    mock_cache.get.return_value = None
+    tasks = []
+    for i in range(2, 0, -1):
+        task = Task(f"Task {i}", datetime.now(timezone.utc) + timedelta(days=1), user_id=1, description="")
+        task.id = i
+        task.creation_date = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+        tasks.append(task)
+    mock_task_repo = AsyncMock()
+    mock_task_repo.get_tasks.return_value = (0, 2, tasks, TOTAL_COUNT_LIMIT + 1)
+
+    # Act
+    result = asyncio.run(ShowTasks(mock_uow, mock_task_repo, 100, mock_cache).execute(
+        1, "active", page=1, size=2, include_total=True
+    ))
+
+    # Assert
+    assert (result.total, result.total_capped) == (TOTAL_COUNT_LIMIT, True)
+
+
+def test_show_subtasks_backward_cursor():
+    """Test that backward cursor requests preceding page of subtasks"""
+    # Arrange
+    mock_uow = Mock()
+    mock_uow.__aenter__ = AsyncMock(return_value=mock_uow)
+    mock_uow.__aexit__ = AsyncMock(return_value=False)
+    mock_cache = AsyncMock()
+    mock_cache.get.return_value = None
+    tasks = []
+    for i in range(2, 0, -1):
+        task = Task(f"Task {i}", datetime.now(timezone.utc) + timedelta(days=1), user_id=1, description="")
+        task.id = i
+        task.creation_date = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+        tasks.append(task)
+    mock_task_repo = AsyncMock()
+    mock_task_repo.get_subtasks_by_cursor.return_value = (False, True, tasks, 12)
+    cursor = TaskCursor(creation_date=datetime(2026, 1, 2, tzinfo=timezone.utc), id=7, backward=True)
+
+    # Act
+    result = asyncio.run(ShowSubtasks(mock_uow, mock_task_repo, 100, mock_cache).execute(
+        1, "active", 5, size=2, cursor=cursor.encode(), include_total=True
+    ))
+
+    # Assert
+    mock_task_repo.get_subtasks_by_cursor.assert_awaited_once_with(
+        5, "active", key=(cursor.creation_date, 7), backward=True, size=2, include_total=True
+    )
+    assert (result.total, result.total_capped) == (12, False)
+    assert result.prev_cursor is None
+    assert result.next_cursor is not None
+
+
+@pytest.mark.parametrize("cursor", ["garbage!", "Zm9v", TaskCursor.model_construct(id=1).model_dump_json()])
+def test_show_tasks_invalid_cursor(cursor):
+    """Test that malformed cursor is rejected before touching database"""
+    # Arrange
+    mock_uow = Mock()
+    mock_uow.__aenter__ = AsyncMock(return_value=mock_uow)
+    mock_uow.__aexit__ = AsyncMock(return_value=False)
+    mock_cache = AsyncMock()
+    mock_cache.get.return_value = None
+    mock_task_repo = AsyncMock()
+
+    # Act & Assert
+    with pytest.raises(InvalidCursorError):
+        asyncio.run(ShowTasks(mock_uow, mock_task_repo, 100, mock_cache).execute(1, "active", cursor=cursor))
+
+    mock_uow.__aenter__.assert_not_awaited()
+    mock_task_repo.get_tasks_by_cursor.assert_not_called()
+
+
+def test_show_tasks_page_size_limited():
+    """Test that page larger than configured limit is rejected"""
+    # Arrange
+    mock_uow = Mock()
+    mock_uow.__aenter__ = AsyncMock(return_value=mock_uow)
+    mock_uow.__aexit__ = AsyncMock(return_value=False)
+    mock_cache = AsyncMock()
+    mock_cache.get.return_value = None
+    mock_task_repo = AsyncMock()
+
+    # Act & Assert
+    with pytest.raises(PageSizeLimitError):
+        asyncio.run(ShowTasks(mock_uow, mock_task_repo, 10, mock_cache).execute(1, "active", size=11))
+
+    mock_task_repo.get_tasks.assert_not_called()
+
+
+def test_stream_tasks_yields_previews():
+    """Test that streamed tasks are converted one by one inside transaction held for the whole stream"""
+    # Arrange
+    mock_uow = Mock()
+    mock_uow.__aenter__ = AsyncMock(return_value=mock_uow)
+    mock_uow.__aexit__ = AsyncMock(return_value=False)
+    mock_uow.holding_transaction.return_value = mock_uow
+    tasks = []
+    for i in range(3, 0, -1):
+        task = Task(f"Task {i}", datetime.now(timezone.utc) + timedelta(days=1), user_id=1, description="")
+        task.id = i
+        task.creation_date = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+        tasks.append(task)
+    mock_task_repo = Mock()
+
+    async def stream(*args, **kwargs):
+        mock_uow.__aexit__.assert_not_awaited()
+        for task in tasks:
+            yield task
+    mock_task_repo.stream_tasks = Mock(side_effect=stream)
+
+    # Act
+    async def run():
+        return [dto async for dto in StreamTasks(mock_uow, mock_task_repo).execute(1, "finished", limit=1000)]
+    result = asyncio.run(run())
+
+    # Assert
+    mock_uow.holding_transaction.assert_called_once()
+    mock_task_repo.stream_tasks.assert_called_once_with(1, "finished", limit=1000)
+    mock_uow.__aexit__.assert_awaited_once()
+    assert [dto.id for dto in result] == [3, 2, 1]
+
+
+def test_show_tasks_served_from_cache():
+    """Test that page cached under current generation of user is returned without reading db"""
+    # Arrange
+    mock_uow = Mock()
+    mock_uow.__aenter__ = AsyncMock(return_value=mock_uow)
+    mock_uow.__aexit__ = AsyncMock(return_value=False)
+    tasks = []
+    for i in range(2, 0, -1):
+        task = Task(f"Task {i}", datetime.now(timezone.utc) + timedelta(days=1), user_id=1, description="")
+        task.id = i
+        task.creation_date = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+        tasks.append(task)
+    mock_task_repo = AsyncMock()
+    mock_task_repo.get_tasks.return_value = (0, 0, tasks, None)
+    use_case = ShowTasks(mock_uow, mock_task_repo, 100, TaskListCache(MemoryCache(10)))
+
+    # Act
+    first = asyncio.run(use_case.execute(1, "active", page=1, size=5))
+    second = asyncio.run(use_case.execute(1, "active", page=1, size=5))
+    asyncio.run(use_case.execute(1, "finished", page=1, size=5))
+    asyncio.run(use_case.execute(2, "active", page=1, size=5))
+
+    # Assert
+    assert second == first
+    assert mock_task_repo.get_tasks.await_count == 3
+
+
+def test_page_read_during_write_not_served():
+    """Test that page is stored under generation taken before reading, so invalidation during read is not lost"""
+    # Arrange
+    mock_uow = Mock()
+    mock_uow.__aenter__ = AsyncMock(return_value=mock_uow)
+    mock_uow.__aexit__ = AsyncMock(return_value=False)
+    tasks = []
+    for i in range(2, 0, -1):
+        task = Task(f"Task {i}", datetime.now(timezone.utc) + timedelta(days=1), user_id=1, description="")
+        task.id = i
+        task.creation_date = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=i)
+        tasks.append(task)
+    mock_task_repo = AsyncMock()
+    cache = TaskListCache(MemoryCache(10))
+
+    async def get_tasks(*args, **kwargs):
+        await cache.invalidate(1)
+        return 0, 0, tasks, None
+    mock_task_repo.get_tasks.side_effect = get_tasks
+    use_case = ShowTasks(mock_uow, mock_task_repo, 100, cache)
+
+    # Act
+    asyncio.run(use_case.execute(1, "active"))
+    asyncio.run(use_case.execute(1, "active"))
+
+    # Assert
+    assert mock_task_repo.get_tasks.await_count == 2
+
+
+@pytest.mark.parametrize("make_use_case, run", [
+    (CreateTask, lambda use_case: use_case.execute(
+        1, TaskCreateDTO(title="Task", deadline=datetime.now(timezone.utc) + timedelta(days=1), description="")
+    )),
+    (UpdateTask, lambda use_case: use_case.execute(10, TaskUpdateDTO(title="New"))),
+    (FinishTask, lambda use_case: use_case.execute(10)),
+    (ForceFinishTask, lambda use_case: use_case.execute(1, 10)),
+    (lambda *args: DeleteTask(*args, False), lambda use_case: use_case.execute(1, 10)),
+])
+def test_changes_invalidate_lists_of_owner_after_commit(make_use_case, run):
+    """Test that every change of tasks invalidates cached lists of owner by after commit callback"""
+    # Arrange
+    mock_uow = Mock()
+    mock_uow.__aenter__ = AsyncMock(return_value=mock_uow)
+    mock_uow.__aexit__ = AsyncMock(return_value=False)
+    mock_task_repo = AsyncMock()
+    task = Task("Task", datetime.now(timezone.utc) + timedelta(days=1), user_id=1, description="")
+    mock_task_repo.get_by_id.return_value = task
+    mock_task_repo.finish_subtree.return_value = [10]
+    cache = AsyncMock()
+
+    # Act
+    asyncio.run(run(make_use_case(mock_uow, mock_task_repo, cache)))
+
+    # Assert
+    cache.invalidate.assert_not_called()
+    mock_uow.after_commit.assert_called_once()
+    asyncio.run(mock_uow.after_commit.call_args[0][0]())
+    cache.invalidate.assert_awaited_once_with(1)